@@ -1,9 +1,12 @@
+import json
 import logging
 import azure.functions as func
 
 import sun_tracker as sun
 import iss_tracker as iss
 import email_util as em
+import iss_api as api
+from http_client import METRICS
 
 app = func.FunctionApp()
 
@@ -28,4 +31,22 @@ def iss_tracker_timer(mytimer: func.TimerRequest) -> None:
             logging.info("🛰️ ISS not within range right now.")
 
     except Exception as e:
-        logging.exception("🚨 iss_tracker run failed: %s", e)
\ No newline at end of file
+        logging.exception("🚨 iss_tracker run failed: %s", e)
+    finally:
+        # Per-endpoint calls, cache hits, errors and latency since the host started
+        for endpoint, stats in METRICS.snapshot().items():
+            logging.info("📈 %s: %s", endpoint, stats)
+
+
+@app.function_name(name="iss_api")
+@app.route(route="iss/{action}", methods=["GET"], auth_level=func.AuthLevel.FUNCTION)
+def iss_api_http(req: func.HttpRequest) -> func.HttpResponse:
+    """
+    GET /api/iss/position | darkness | passes | stats (see iss_api.handle).
+    Answers come from the shared single-flight cache, so bursts of requests
+    don't multiply calls to open-notify or sunrise-sunset.
+    """
+    status, body = api.handle(req.route_params.get("action", ""), dict(req.params))
+    if status >= 500:
+        logging.warning("🛰️ iss_api %s: %s", req.route_params.get("action"), body.get("error"))
+    return func.HttpResponse(json.dumps(body), status_code=status, mimetype="application/json")
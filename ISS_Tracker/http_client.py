@@ -0,0 +1,262 @@
+import copy
+import json
+import logging
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Pooled HTTP client shared by every outbound call in a function app.
+# Each project deploys on its own, so this file is copied as-is into
+# ISS_Tracker/ and LinkedIn_Daily_Quiz/ - keep the copies identical
+# (LinkedIn_Daily_Quiz/http_client_local_test.py checks this).
+#
+#     from http_client import RetryPolicy, default_client
+#
+#     data = default_client().get_json("https://api.example.com/now", endpoint="example.now",
+#                                      cache_ttl=30, retry=RetryPolicy(attempts=3))
+#
+# - One requests.Session per client, with a keep-alive connection pool.
+# - RetryPolicy: attempts, jittered exponential backoff, Retry-After, which statuses retry.
+# - get_json(cache_ttl=...): parsed JSON cached per URL + params for that many seconds.
+# - METRICS: per-endpoint calls, errors, retries, cache hits, status codes and latency.
+
+DEFAULT_TIMEOUT = 20
+POOL_SIZE = 10
+RETRY_STATUSES = (408, 429, 500, 502, 503, 504)
+MAX_CACHE_ENTRIES = 256
+
+
+class RetryPolicy:
+    """
+        When and how long to wait before trying a request again.
+        - attempts: total tries (1 = no retries).
+        - backoff / max_backoff: wait is uniform(0, min(max_backoff, backoff * 2**attempt)).
+        - retry_on: status codes worth another try; network errors always are.
+        - Retry-After on a response is honoured (capped at max_backoff).
+        Subclass and override wait() to e.g. stop at a deadline; returning False
+        gives up and hands back the last response (or raises the last error).
+    """
+    def __init__(self, attempts=3, backoff=0.5, max_backoff=30.0, retry_on=RETRY_STATUSES):
+        self.attempts = max(1, attempts)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_on = tuple(retry_on)
+
+    def should_retry(self, attempt, resp=None, exc=None):
+        if attempt >= self.attempts:
+            return False
+        if exc is not None:
+            return isinstance(exc, (requests.Timeout, requests.ConnectionError))
+        return resp is not None and resp.status_code in self.retry_on
+
+    def delay(self, attempt, resp=None):
+        retry_after = resp.headers.get("Retry-After") if resp is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def wait(self, attempt, resp=None):
+        """Sleep before the next attempt; return False to stop retrying."""
+        time.sleep(self.delay(attempt, resp))
+        return True
+
+
+NO_RETRY = RetryPolicy(attempts=1)
+
+
+def _percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+class Metrics:
+    """
+        Per-endpoint counters for this process; safe to update from several threads.
+        snapshot() -> {endpoint: {calls, errors, retries, cache_hits, status, p50_ms, p95_ms, max_ms}}.
+        Latencies keep the most recent `keep` samples per endpoint.
+    """
+    def __init__(self, keep=1000):
+        self.keep = keep
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = {}
+
+    def _entry(self, endpoint):
+        return self._endpoints.setdefault(endpoint, {
+            "calls": 0, "errors": 0, "retries": 0, "cache_hits": 0, "status": {}, "latencies": [],
+        })
+
+    def record(self, endpoint, seconds, status=None, error=None):
+        with self._lock:
+            e = self._entry(endpoint)
+            e["calls"] += 1
+            if error is not None or (status is not None and status >= 400):
+                e["errors"] += 1
+            key = str(status) if status is not None else type(error).__name__
+            e["status"][key] = e["status"].get(key, 0) + 1
+            e["latencies"].append(seconds)
+            del e["latencies"][:-self.keep]
+
+    def count(self, endpoint, field):
+        with self._lock:
+            self._entry(endpoint)[field] += 1
+
+    def snapshot(self):
+        with self._lock:
+            out = {}
+            for name, e in self._endpoints.items():
+                lat = sorted(e["latencies"])
+                out[name] = {k: copy.copy(v) for k, v in e.items() if k != "latencies"}
+                if lat:
+                    out[name].update({
+                        "p50_ms": round(_percentile(lat, 0.50) * 1000, 1),
+                        "p95_ms": round(_percentile(lat, 0.95) * 1000, 1),
+                        "max_ms": round(lat[-1] * 1000, 1),
+                    })
+            return out
+
+
+METRICS = Metrics()
+
+
+class TTLCache:
+    """
+        Small thread-safe cache whose entries expire `ttl` seconds after they were set.
+        When full, the entry closest to expiring is dropped.
+    """
+    def __init__(self, max_entries=MAX_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._items = {}
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            if item[0] <= time.monotonic():
+                del self._items[key]
+                return None
+            return copy.deepcopy(item[1])
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            if key not in self._items and len(self._items) >= self.max_entries:
+                del self._items[min(self._items, key=lambda k: self._items[k][0])]
+            self._items[key] = (time.monotonic() + ttl, copy.deepcopy(value))
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+class HttpClient:
+    """
+        requests.Session wrapper with a keep-alive pool, retries, a TTL cache for
+        JSON GETs and per-endpoint metrics. Build one per process (default_client())
+        so every call reuses the same connections.
+    """
+    def __init__(self, timeout=DEFAULT_TIMEOUT, retry=NO_RETRY, pool_size=POOL_SIZE, headers=None,
+                 metrics=METRICS):
+        self.timeout = timeout
+        self.retry = retry
+        self.pool_size = pool_size
+        self.headers = dict(headers or {})
+        self.metrics = metrics
+        self.cache = TTLCache()
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        """The pooled requests.Session (created on first use)."""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    s = requests.Session()
+                    # Retries are done by request(), so the adapter itself never retries
+                    adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size,
+                                          max_retries=0)
+                    s.mount("https://", adapter)
+                    s.mount("http://", adapter)
+                    s.headers.update(self.headers)
+                    self._session = s
+        return self._session
+
+    def request(self, method, url, *, endpoint=None, retry=None, timeout=None, **kwargs):
+        """
+            Send a request, retrying as `retry` (default: the client's policy) allows.
+            - endpoint: name the call is counted under in metrics (default: the URL).
+            - Returns the final requests.Response, which may still be an error status;
+              raises the last requests.RequestException if no response came back.
+        """
+        endpoint = endpoint or url
+        retry = retry or self.retry
+        timeout = timeout if timeout is not None else self.timeout
+        attempt = 0
+        while True:
+            attempt += 1
+            start = time.perf_counter()
+            try:
+                resp = self.session.request(method, url, timeout=timeout, **kwargs)
+            except requests.RequestException as e:
+                self.metrics.record(endpoint, time.perf_counter() - start, error=e)
+                if retry.should_retry(attempt, exc=e) and retry.wait(attempt):
+                    self.metrics.count(endpoint, "retries")
+                    continue
+                raise
+            self.metrics.record(endpoint, time.perf_counter() - start, status=resp.status_code)
+            if retry.should_retry(attempt, resp=resp) and retry.wait(attempt, resp):
+                logging.warning("%s %s: HTTP %s, retrying (attempt %s/%s)", method, endpoint,
+                                resp.status_code, attempt, retry.attempts)
+                self.metrics.count(endpoint, "retries")
+                continue
+            return resp
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def get_json(self, url, *, params=None, cache_ttl=0, endpoint=None, **kwargs):
+        """
+            GET a JSON document; raises requests.HTTPError on an error status.
+            With cache_ttl > 0 the parsed body is reused for that many seconds
+            for the same URL and params (a copy is returned each time).
+        """
+        endpoint = endpoint or url
+        key = (url, json.dumps(params, sort_keys=True, default=str)) if cache_ttl > 0 else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.metrics.count(endpoint, "cache_hits")
+                return cached
+        resp = self.request("GET", url, params=params, endpoint=endpoint, **kwargs)
+        resp.raise_for_status()
+        data = resp.json()
+        if key is not None:
+            self.cache.set(key, data, cache_ttl)
+        return data
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_client():
+    """Process-wide HttpClient (created on first use), reused by every warm invocation."""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = HttpClient()
+    return _default
@@ -0,0 +1,373 @@
+import argparse
+import datetime as dt
+import json
+import math
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import requests as r
+
+import iss_tracker as iss
+import sun_tracker as sun
+from http_client import METRICS
+
+# Read-only HTTP API over the trackers: where the ISS is, whether it's dark at a
+# place, and when the next passes over it are. Every answer comes from a shared
+# cache, and concurrent misses for the same key wait for one upstream fetch
+# (single-flight), so any request rate costs at most one open-notify call per
+# POSITION_TTL. Served by the iss_api function (function_app.py) or locally:
+#
+#     python iss_api.py --port 8080
+#     curl "http://127.0.0.1:8080/iss/passes?lat=33.45&lon=-112.07"
+
+POSITION_TTL = 5
+# Keep answering with the last good value for this long if open-notify is down
+POSITION_STALE_FOR = 60
+DARKNESS_TTL = 3600
+PASSES_TTL = 60
+MAX_KEYS = 4096
+
+# Pass prediction: open-notify no longer offers iss-pass.json, so future positions
+# are sampled from a circular-orbit model fitted to the two latest fixes. Good to a
+# few minutes over a day; fine for "look up around 21:14", not for astrophotography.
+INCLINATION = math.radians(51.64)
+PERIOD_S = 92.68 * 60
+EARTH_ROTATION = 7.2921159e-5                  # rad/s
+NODAL_PRECESSION = math.radians(-4.98) / 86400  # rad/s, from Earth's oblateness
+EARTH_RADIUS_KM = 6371.0
+ALTITUDE_KM = 420.0
+MIN_FIX_GAP = 3
+SAMPLE_STEP_S = 30
+DEFAULT_HOURS = 24
+MAX_HOURS = 72
+DEFAULT_MIN_ELEVATION = 10.0
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlightCache:
+    """
+    TTL cache where concurrent misses for one key share a single load.
+    get() returns a fresh value, waits for a load already in flight, or runs
+    `load` itself. On a failed load, a value that expired less than `stale_for`
+    seconds ago is returned instead of the error.
+    """
+    def __init__(self, max_keys=MAX_KEYS):
+        self.max_keys = max_keys
+        self.stats = Counter()
+        self._lock = threading.Lock()
+        self._values = {}
+        self._inflight = {}
+
+    def _prune(self, now):
+        if len(self._values) >= self.max_keys:
+            for key in [k for k, (expires, _) in self._values.items() if expires <= now]:
+                del self._values[key]
+            while len(self._values) >= self.max_keys:
+                del self._values[min(self._values, key=lambda k: self._values[k][0])]
+
+    def get(self, key, load, ttl, stale_for=0):
+        now = time.monotonic()
+        with self._lock:
+            item = self._values.get(key)
+            if item and item[0] > now:
+                self.stats["hits"] += 1
+                return item[1]
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+                self.stats["loads"] += 1
+            else:
+                self.stats["coalesced"] += 1
+
+        if leader:
+            try:
+                call.value = load()
+                with self._lock:
+                    self._prune(time.monotonic())
+                    self._values[key] = (time.monotonic() + ttl, call.value)
+            except Exception as e:
+                if item and time.monotonic() - item[0] <= stale_for:
+                    call.value = item[1]
+                    self.stats["stale"] += 1
+                else:
+                    call.error = e
+                    self.stats["errors"] += 1
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+                call.done.set()
+        else:
+            call.done.wait()
+
+        if call.error is not None:
+            raise call.error
+        return call.value
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats, keys=len(self._values), in_flight=len(self._inflight))
+
+
+CACHE = SingleFlightCache()
+
+# The latest open-notify fixes, newest last (pass prediction needs two)
+_fixes = deque(maxlen=4)
+_fixes_lock = threading.Lock()
+
+
+def _fetch_fix():
+    # The single-flight cache owns the TTL here, so skip http_client's own cache
+    fix = iss.fetch_iss(cache_ttl=0)
+    with _fixes_lock:
+        if not _fixes or _fixes[-1]["timestamp"] != fix["timestamp"]:
+            _fixes.append(fix)
+    return fix
+
+
+def position():
+    """Current ISS fix {"lat", "lon", "timestamp"} (at most POSITION_TTL seconds old)."""
+    return CACHE.get("position", _fetch_fix, POSITION_TTL, stale_for=POSITION_STALE_FOR)
+
+
+def _fix_pair():
+    """Two fixes at least MIN_FIX_GAP seconds apart: (older, newer)."""
+    newest = position()
+    with _fixes_lock:
+        older = [f for f in _fixes if f["timestamp"] <= newest["timestamp"] - MIN_FIX_GAP]
+    if older:
+        return older[-1], newest
+
+    # Fresh start: take a second fix a few seconds later (once, shared by every waiting request)
+    def _second():
+        time.sleep(MIN_FIX_GAP)
+        return _fetch_fix()
+    return newest, CACHE.get("second_fix", _second, POSITION_TTL)
+
+
+# --- Orbit model ---
+
+def _wrap_deg(angle):
+    return (angle + 180.0) % 360.0 - 180.0
+
+
+class GroundTrack:
+    """
+    Circular-orbit ground track through one fix: sub-satellite (lat, lon) at any
+    unix time. `ascending` picks which half of the orbit the fix was on.
+    """
+    def __init__(self, fix, ascending):
+        self.t0 = fix["timestamp"]
+        x = max(-1.0, min(1.0, math.sin(math.radians(fix["lat"])) / math.sin(INCLINATION)))
+        self.u0 = math.asin(x) if ascending else math.pi - math.asin(x)
+        self.node = math.radians(fix["lon"]) - self._lon_offset(self.u0)
+
+    @staticmethod
+    def _lon_offset(u):
+        return math.atan2(math.cos(INCLINATION) * math.sin(u), math.cos(u))
+
+    def at(self, t):
+        elapsed = t - self.t0
+        u = self.u0 + 2 * math.pi * elapsed / PERIOD_S
+        lat = math.asin(math.sin(INCLINATION) * math.sin(u))
+        lon = self.node + self._lon_offset(u) + (NODAL_PRECESSION - EARTH_ROTATION) * elapsed
+        return math.degrees(lat), _wrap_deg(math.degrees(lon))
+
+    @classmethod
+    def from_fixes(cls, older, newer):
+        """Track through `newer`, on whichever half of the orbit also explains `older`."""
+        def miss(track):
+            lat, lon = track.at(older["timestamp"])
+            return _central_angle(lat, lon, older["lat"], older["lon"])
+        return min((cls(newer, True), cls(newer, False)), key=miss)
+
+
+def _central_angle(lat1, lon1, lat2, lon2):
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dlat, dlon = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dlon / 2) ** 2
+    return 2 * math.asin(min(1.0, math.sqrt(a)))
+
+
+def elevation(obs_lat, obs_lon, sat_lat, sat_lon):
+    """Degrees above the observer's horizon of a satellite over (sat_lat, sat_lon)."""
+    gamma = _central_angle(obs_lat, obs_lon, sat_lat, sat_lon)
+    ratio = EARTH_RADIUS_KM / (EARTH_RADIUS_KM + ALTITUDE_KM)
+    return math.degrees(math.atan2(math.cos(gamma) - ratio, math.sin(gamma)))
+
+
+def _iso(t):
+    return dt.datetime.fromtimestamp(t, dt.timezone.utc).isoformat()
+
+
+def predict_passes(track, lat, lon, start, hours=DEFAULT_HOURS, min_elevation=DEFAULT_MIN_ELEVATION):
+    """
+    Passes over (lat, lon) in the next `hours`, sampled every SAMPLE_STEP_S seconds:
+    [{"start", "peak", "end" (unix seconds), "max_elevation"}].
+    """
+    passes, current = [], None
+    t, end = start, start + hours * 3600
+    while t <= end:
+        el = elevation(lat, lon, *track.at(t))
+        if el >= min_elevation:
+            if current is None:
+                current = {"start": t, "peak": t, "end": t, "max_elevation": el}
+            current["end"] = t
+            if el > current["max_elevation"]:
+                current.update(peak=t, max_elevation=el)
+        elif current is not None:
+            passes.append(current)
+            current = None
+        t += SAMPLE_STEP_S
+    if current is not None:
+        passes.append(current)
+    return passes
+
+
+# --- Answers ---
+
+def _sun_times(lat, lon):
+    key = ("sun", round(lat, 2), round(lon, 2), dt.datetime.now(dt.timezone.utc).date())
+    return CACHE.get(key, lambda: sun.sun_times_utc(lat, lon, cache_ttl=0), DARKNESS_TTL)
+
+
+def darkness(lat, lon):
+    sunrise, sunset = _sun_times(lat, lon)
+    now = dt.datetime.now(dt.timezone.utc)
+    return {"lat": lat, "lon": lon, "dark": sun.is_dark_at(now, sunrise, sunset),
+            "sunrise": sunrise.isoformat(), "sunset": sunset.isoformat()}
+
+
+def passes(lat, lon, hours=DEFAULT_HOURS, min_elevation=DEFAULT_MIN_ELEVATION):
+    def _compute():
+        older, newer = _fix_pair()
+        track = GroundTrack.from_fixes(older, newer)
+        try:
+            sunrise, sunset = _sun_times(lat, lon)
+        except Exception:
+            sunrise = sunset = None
+        found = []
+        for p in predict_passes(track, lat, lon, int(time.time()), hours, min_elevation):
+            peak = dt.datetime.fromtimestamp(p["peak"], dt.timezone.utc)
+            found.append({
+                "start": _iso(p["start"]), "peak": _iso(p["peak"]), "end": _iso(p["end"]),
+                "max_elevation": round(p["max_elevation"], 1),
+                "dark": sun.is_dark_at(peak, sunrise, sunset) if sunrise else None,
+            })
+        return {"lat": lat, "lon": lon, "hours": hours, "min_elevation": min_elevation,
+                "fix_timestamp": newer["timestamp"], "passes": found}
+
+    key = ("passes", round(lat, 1), round(lon, 1), hours, min_elevation)
+    return CACHE.get(key, _compute, PASSES_TTL)
+
+
+class BadRequest(Exception):
+    """A query parameter is missing, not a number or out of range (HTTP 400)."""
+
+
+def _float(params, name, default, low, high):
+    raw = params.get(name)
+    if raw in (None, ""):
+        if default is None:
+            raise BadRequest(f"'{name}' is required")
+        return default
+    try:
+        value = float(raw)
+    except ValueError:
+        raise BadRequest(f"'{name}' must be a number (got '{raw}')")
+    if not low <= value <= high:
+        raise BadRequest(f"'{name}' must be between {low} and {high}")
+    return value
+
+
+def handle(action, params):
+    """
+    Answer one API request; returns (HTTP status, JSON-able body).
+    Actions: position, darkness?lat&lon, passes?lat&lon&hours&min_elevation, stats.
+    lat/lon default to MY_LAT/MY_LONG.
+    """
+    try:
+        if action == "position":
+            fix = position()
+            return 200, dict(fix, age_s=round(time.time() - fix["timestamp"], 1))
+        if action == "stats":
+            return 200, {"cache": CACHE.snapshot(), "http": METRICS.snapshot()}
+        if action not in ("darkness", "passes"):
+            return 404, {"error": f"Unknown action '{action}' (use position, darkness, passes or stats)"}
+        lat = _float(params, "lat", iss.MY_LAT, -90, 90)
+        lon = _float(params, "lon", iss.MY_LONG, -180, 180)
+        if action == "darkness":
+            return 200, darkness(lat, lon)
+        hours = _float(params, "hours", DEFAULT_HOURS, 1, MAX_HOURS)
+        min_el = _float(params, "min_elevation", DEFAULT_MIN_ELEVATION, 0, 90)
+        return 200, passes(lat, lon, hours, min_el)
+    except BadRequest as e:
+        return 400, {"error": str(e)}
+    # Any other ValueError is upstream too: a non-JSON error page or a malformed fix
+    except (r.RequestException, KeyError, ValueError) as e:
+        return 502, {"error": f"Upstream request failed: {e}"}
+
+
+# --- Local server ---
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        action = url.path.strip("/").split("/")[-1]
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        status, body = handle(action, params)
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def serve(port=8080, host="127.0.0.1"):
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    print(f"ISS API on http://{host}:{server.server_address[1]}/iss/(position|darkness|passes|stats)")
+    server.serve_forever()
+
+
+def burst(action="position", count=1000, workers=100):
+    """Fire `count` concurrent lookups and print how many reached the upstream API."""
+    before = CACHE.snapshot().get("loads", 0)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        statuses = Counter(s for s, _ in pool.map(lambda _: handle(action, {}), range(count)))
+    elapsed = time.perf_counter() - start
+    print(f"{count} x {action} in {elapsed:.2f}s: {dict(statuses)}, "
+          f"upstream loads: {CACHE.snapshot().get('loads', 0) - before}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local ISS position/darkness/passes API")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--burst", type=int, metavar="N", help="send N concurrent position requests and exit")
+    args = parser.parse_args()
+    if args.burst:
+        burst(count=args.burst)
+        return
+    serve(args.port, args.host)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 import os
 import requests as r
 
+from http_client import RetryPolicy, default_client
+
 def _env_float(name: str) -> float:
     val = os.getenv(name)
     if val is None or val.strip() == "":
@@ -15,16 +17,31 @@ MY_LAT  = _env_float("MY_LAT")
 MY_LONG = _env_float("MY_LONG")
 PROX_DEG = float(os.getenv("PROX_DEG", "45"))
 
+ISS_URL = "http://api.open-notify.org/iss-now.json"
+# The station moves ~8 km/s; reuse a position for a few seconds at most
+ISS_CACHE_TTL = 5
+# Worst case 5 s + 2 s backoff + 5 s per lookup, well inside the one-minute timer
+ISS_TIMEOUT = 5
+ISS_RETRY = RetryPolicy(attempts=2, backoff=1, max_backoff=2)
+
+def fetch_iss(cache_ttl=ISS_CACHE_TTL):
+    """
+    Return the current ISS fix as {"lat", "lon", "timestamp"} (unix seconds).
+    Raises requests exceptions, KeyError or ValueError on failure.
+    """
+    data = default_client().get_json(ISS_URL, endpoint="iss.position", cache_ttl=cache_ttl,
+                                     retry=ISS_RETRY, timeout=ISS_TIMEOUT)
+    return {
+        "lat": float(data["iss_position"]["latitude"]),
+        "lon": float(data["iss_position"]["longitude"]),
+        "timestamp": int(data["timestamp"]),
+    }
+
 def iss_position():
     """Return (lat, lon) of the ISS as floats, or (0.0, 0.0) on error."""
     try:
-        resp = r.get("http://api.open-notify.org/iss-now.json", timeout=20)
-        resp.raise_for_status()
-        data = resp.json()
-
-        lat = float(data["iss_position"]["latitude"])
-        lon = float(data["iss_position"]["longitude"])
-        return lat, lon
+        fix = fetch_iss()
+        return fix["lat"], fix["lon"]
 
     except r.Timeout:
         print("Error: ISS API request timed out.")
@@ -3,6 +3,8 @@ import requests as r
 import datetime as dt
 from zoneinfo import ZoneInfo
 
+from http_client import RetryPolicy, default_client
+
 
 def _env_float(name: str) -> float:
     val = os.getenv(name)
@@ -22,6 +24,41 @@ TZ = ZoneInfo(TZ_NAME)
 
 ZERO_TIME = dt.time(0, 0)
 
+SUN_URL = "https://api.sunrise-sunset.org/json"
+# Sunrise and sunset move by a minute or two a day; one lookup an hour is plenty
+SUN_CACHE_TTL = 3600
+# Same bound as the ISS lookup: at most ~12 s, so a timer run never overlaps the next
+SUN_TIMEOUT = 5
+SUN_RETRY = RetryPolicy(attempts=2, backoff=1, max_backoff=2)
+
+def sun_times_utc(lat, lon, cache_ttl=SUN_CACHE_TTL):
+    """
+    Return (sunrise, sunset) for today at (lat, lon) as aware UTC datetimes.
+    Raises requests exceptions, KeyError or ValueError on failure.
+    """
+    params = {
+        "lat": lat,
+        "lng": lon,
+        "formatted": 0,
+    }
+    data = default_client().get_json(SUN_URL, params=params, endpoint="sun.sunrise_sunset",
+                                     cache_ttl=cache_ttl, retry=SUN_RETRY,
+                                     timeout=SUN_TIMEOUT)["results"]
+    sr_utc = dt.datetime.fromisoformat(data["sunrise"].replace("Z", "+00:00"))
+    ss_utc = dt.datetime.fromisoformat(data["sunset"].replace("Z", "+00:00"))
+    return sr_utc, ss_utc
+
+def is_dark_at(when, sunrise_utc, sunset_utc):
+    """
+    True if `when` (aware datetime) falls outside daylight, using one day's
+    sunrise/sunset shifted by whole days (good to a few minutes for the next day or two).
+    """
+    for shift in (-1, 0, 1):
+        delta = dt.timedelta(days=shift)
+        if sunrise_utc + delta <= when <= sunset_utc + delta:
+            return False
+    return True
+
 # The sunrise-sunset api is default to the utc timezone. You need to go to the
 # api docs to find the proper wording for your timezone.
 def sunrise_sunset():
@@ -30,19 +67,8 @@ def sunrise_sunset():
     in the configured timezone. Uses sunrise-sunset.org which returns UTC;
     we convert to local time.
     """
-    params = {
-        "lat": MY_LAT,
-        "lng": MY_LONG,
-        "formatted": 0,
-    }
     try:
-        resp = r.get("https://api.sunrise-sunset.org/json", params=params, timeout=20)
-        resp.raise_for_status()
-        data = resp.json()["results"]
-
-        # Parse UTC timestamps and convert to local TZ
-        sr_utc = dt.datetime.fromisoformat(data["sunrise"].replace("Z", "+00:00"))
-        ss_utc = dt.datetime.fromisoformat(data["sunset"].replace("Z", "+00:00"))
+        sr_utc, ss_utc = sun_times_utc(MY_LAT, MY_LONG)
 
         sr_local = sr_utc.astimezone(TZ).time()
         ss_local = ss_utc.astimezone(TZ).time()
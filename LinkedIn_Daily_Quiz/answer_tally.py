@@ -0,0 +1,227 @@
+import hashlib
+import logging
+import re
+from datetime import date, timedelta
+from urllib.parse import quote
+
+import requests
+
+import send_it
+import tracing
+from deadline import as_deadline
+from http_client import NO_RETRY, default_client
+from quiz_store import _shard_prefix, load_json, update_json
+
+# Reads the replies to each posted quiz back from LinkedIn and keeps running
+# per-post answer counts, so the next post can say how many people got it right.
+#
+# questions/tallies.json:
+#   {"2025-01-31": {"urn": "urn:li:share:1", "answer": "B", "start": 42,
+#                   "counts": {"A": 3, "B": 9}, "voters": ["3fa9c1d2", ...]}, ...}
+# "start" is the paging cursor: the next refresh asks for comments from there on,
+# so comments already counted are never downloaded again.
+
+PAGE_SIZE = 50
+COMMENTS_ENDPOINT = "linkedin.comments"
+DEFAULT_CHOICES = 4
+# Posts younger than this keep being refreshed; older ones drop their voter list
+REFRESH_DAYS = 7
+KEEP_VOTERS_DAYS = 30
+
+LABELS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+# "B", "(b)", "B.", "C!" - the whole comment is one letter
+_ONLY_LETTER = re.compile(r"^\W*([A-Za-z])\W*$")
+# "B) because ...", "C: it returns ...", "[D] ..."
+_LEADING_LETTER = re.compile(r"^\W*[\(\[]?([A-Za-z])[\)\]\.:]\s")
+# "answer is C", "Option b", "I'd go with (D)", "it's A"
+_PHRASE = re.compile(
+    r"\b(?:answer|option|choice|pick|going with|go with|it'?s|is)\s*(?:is|:|=)?\s*[\(\[]?([A-Za-z])\b[\)\]]?",
+    re.IGNORECASE,
+)
+_CAPITAL = re.compile(r"(?<![A-Za-z'])([A-Z])(?![A-Za-z'])")
+
+
+def tally_name(blob):
+    return f"{_shard_prefix(blob)}tallies.json"
+
+
+def extract_answer(text, choices=DEFAULT_CHOICES):
+    """
+        The answer letter a comment gives, or None if it doesn't clearly give one.
+        Tries, in order: a comment that is only a letter, a leading "B)"-style
+        label, a phrase like "answer is C", then a single stand-alone capital
+        letter ("A" and "I" only count in very short comments, since they are words).
+    """
+    valid = LABELS[:choices]
+    text = (text or "").strip()
+    for pattern in (_ONLY_LETTER, _LEADING_LETTER):
+        m = pattern.match(text)
+        if m and m.group(1).upper() in valid:
+            return m.group(1).upper()
+    for m in _PHRASE.finditer(text):
+        letter = m.group(1)
+        if letter.upper() in valid and (letter.isupper() or m.group(0)[-1] in ")]"
+                                        or len(text.split()) <= 4):
+            return letter.upper()
+    capitals = {c for c in _CAPITAL.findall(text) if c in valid}
+    if len(capitals) == 1:
+        letter = capitals.pop()
+        if letter not in "AI" or len(text.split()) <= 3:
+            return letter
+    return None
+
+
+def correct_letter(entry):
+    """
+        Label of the right answer for a stored question, or None.
+    """
+    choices = entry.get("choices") or []
+    try:
+        return LABELS[choices.index(entry.get("answer"))]
+    except (ValueError, IndexError):
+        return None
+
+
+def _voter(actor):
+    # Short hash: enough to count each reader once without storing who they are
+    return hashlib.sha256(str(actor).encode("utf-8")).hexdigest()[:10]
+
+
+def comments_url(urn):
+    return f"{send_it.LINKEDIN_API_BASE}/v2/socialActions/{quote(urn, safe='')}/comments"
+
+
+def iter_comments(access_token, urn, start=0, page_size=PAGE_SIZE, client=None, deadline=None):
+    """
+        Stream the comments on a post, oldest first, as (position, comment) pairs.
+        - Pages are fetched lazily, `page_size` at a time, starting at `start`.
+        - Rate limits (429 + Retry-After) and 5xx are retried within the deadline.
+        - Stops at the first short or empty page.
+    """
+    client = client or default_client()
+    deadline = as_deadline(deadline)
+    url = comments_url(urn)
+    headers = {"Authorization": f"Bearer {access_token}", "X-Restli-Protocol-Version": "2.0.0"}
+    position = start
+    while True:
+        with tracing.span("linkedin.comments_page", urn=urn, start=position) as span:
+            for attempt in range(1, send_it.MAX_RETRIES + 1):
+                resp = client.get(url, endpoint=COMMENTS_ENDPOINT, retry=NO_RETRY, headers=headers,
+                                  params={"start": position, "count": page_size},
+                                  timeout=deadline.timeout(send_it.REQUEST_TIMEOUT))
+                if not (send_it._retryable(resp.status_code) and attempt < send_it.MAX_RETRIES
+                        and send_it._sleep_retry(attempt, resp, deadline)):
+                    break
+            span.set_attribute("http.status_code", resp.status_code)
+            resp.raise_for_status()
+            elements = resp.json().get("elements") or []
+            span.set_attribute("comments", len(elements))
+        for comment in elements:
+            yield position, comment
+            position += 1
+        if len(elements) < page_size:
+            return
+
+
+def register_post(container, blob, the_date, urn, entry, deadline=None):
+    """
+        Start tracking replies to the post for `the_date` (called once it is published).
+    """
+    def _add(tallies):
+        tallies.setdefault(the_date.isoformat(), {
+            "urn": urn,
+            "answer": correct_letter(entry),
+            "choices": len(entry.get("choices") or []) or DEFAULT_CHOICES,
+            "start": 0,
+            "counts": {},
+            "voters": [],
+        })
+    update_json(container, tally_name(blob), _add, default={}, deadline=deadline)
+
+
+def _count(tally, comments):
+    """
+        Fold (position, comment) pairs into a tally; each reader counts once (first answer).
+    """
+    voters = set(tally.get("voters") or [])
+    counts = tally.setdefault("counts", {})
+    for position, comment in comments:
+        if position < tally.get("start", 0):
+            continue
+        tally["start"] = position + 1
+        voter = _voter(comment.get("actor"))
+        if voter in voters:
+            continue
+        letter = extract_answer((comment.get("message") or {}).get("text"), tally.get("choices", DEFAULT_CHOICES))
+        if letter:
+            counts[letter] = counts.get(letter, 0) + 1
+            voters.add(voter)
+    tally["voters"] = sorted(voters)
+    return tally
+
+
+def refresh_tallies(access_token, container, blob, today=None, days=REFRESH_DAYS, deadline=None):
+    """
+        Read new comments on every post from the last `days` days and update the tallies.
+        Each post resumes from its saved cursor. Returns {date: tally} for the posts refreshed.
+    """
+    today = today or date.today()
+    first = (today - timedelta(days=days)).isoformat()
+    tallies = load_tallies(container, blob)
+    refreshed = {}
+    for day, tally in sorted(tallies.items()):
+        if day < first or not tally.get("urn"):
+            continue
+        try:
+            comments = list(iter_comments(access_token, tally["urn"], start=tally.get("start", 0),
+                                          deadline=deadline))
+        except (requests.RequestException, TimeoutError) as e:
+            logging.warning("Could not read comments for %s (%s): %s", day, tally["urn"], e)
+            continue
+        refreshed[day] = comments
+
+    cutoff = (today - timedelta(days=KEEP_VOTERS_DAYS)).isoformat()
+
+    def _merge(latest):
+        for day, comments in refreshed.items():
+            if day in latest:
+                _count(latest[day], comments)
+        for day, tally in latest.items():
+            if day < cutoff:
+                tally.pop("voters", None)
+
+    if refreshed:
+        saved = update_json(container, tally_name(blob), _merge, default={}, deadline=deadline)
+        return {day: saved[day] for day in refreshed if day in saved}
+    return {}
+
+
+def load_tallies(container, blob):
+    """
+        All stored tallies, {ISO date: tally}.
+    """
+    return load_json(container, tally_name(blob), {}) or {}
+
+
+def accuracy(tally):
+    """
+        (answers counted, share correct 0-1) for a tally; share is None if nobody answered.
+    """
+    if not tally:
+        return 0, None
+    counts = tally.get("counts") or {}
+    total = sum(counts.values())
+    if not total or not tally.get("answer"):
+        return total, None
+    return total, counts.get(tally["answer"], 0) / total
+
+
+def summary_line(tally):
+    """
+        "📊 12 answers, 58% correct" for the next post, or "" if there is nothing to report.
+    """
+    total, share = accuracy(tally)
+    if share is None:
+        return ""
+    return f"📊 {total} answer{'s' if total != 1 else ''}, {share:.0%} correct"
@@ -0,0 +1,104 @@
+import bisect
+
+
+class ArchiveIndex:
+    """
+        Secondary index over the sharded question history.
+        - dates: "YYYY-MM-DD" -> [shard month "YYYY-MM", byte offset, byte length,
+          topic, difficulty], so one record can be fetched with a ranged read of its
+          shard and a re-run can take the date out of its old topic/difficulty lists.
+        - topics / difficulties: name -> sorted list of dates.
+        - order: every indexed date, sorted, for range and "last N" lookups.
+        Date lookups are O(1); range, topic and difficulty lookups are O(log n)
+        plus the size of the answer.
+        Stored as JSON: {"dates": {...}, "topics": {...}, "difficulties": {...}}.
+    """
+    def __init__(self, dates=None, topics=None, difficulties=None):
+        self.dates = dates or {}
+        self.topics = topics or {}
+        self.difficulties = difficulties or {}
+        self.order = sorted(self.dates)
+
+    @classmethod
+    def from_dict(cls, d):
+        d = d or {}
+        return cls(d.get("dates"), d.get("topics"), d.get("difficulties"))
+
+    def to_dict(self):
+        return {"version": 1, "dates": self.dates, "topics": self.topics, "difficulties": self.difficulties}
+
+    @staticmethod
+    def _insert(sorted_list, value):
+        i = bisect.bisect_left(sorted_list, value)
+        if i == len(sorted_list) or sorted_list[i] != value:
+            sorted_list.insert(i, value)
+
+    @staticmethod
+    def _remove(sorted_list, value):
+        i = bisect.bisect_left(sorted_list, value)
+        if i < len(sorted_list) and sorted_list[i] == value:
+            del sorted_list[i]
+
+    def _unlist(self, day, entry):
+        # Entries written before topic/difficulty were stored don't say where the date
+        # is listed, so those are taken out of every list
+        if len(entry) >= 5:
+            lists = [(self.topics, entry[3]), (self.difficulties, entry[4])]
+        else:
+            lists = [(self.topics, name) for name in self.topics] + \
+                    [(self.difficulties, name) for name in self.difficulties]
+        for lists_by_name, name in lists:
+            dates = lists_by_name.get(name)
+            if dates is not None:
+                self._remove(dates, day)
+                if not dates:
+                    del lists_by_name[name]
+
+    def add(self, record, month, offset, length):
+        """
+            Index one stored record found at `offset`/`length` in shard `month`.
+            A date written again (a re-run or backfill) points at its newest record
+            and is listed only under that record's topic and difficulty.
+        """
+        day = record["date"]
+        old = self.dates.get(day)
+        if old is None:
+            self._insert(self.order, day)
+        else:
+            self._unlist(day, old)
+        self.dates[day] = [month, offset, length, record.get("topic"), record.get("difficulty")]
+        if record.get("topic"):
+            self._insert(self.topics.setdefault(record["topic"], []), day)
+        if record.get("difficulty"):
+            self._insert(self.difficulties.setdefault(record["difficulty"], []), day)
+
+    def locate(self, day):
+        """
+            (month, offset, length) for an ISO date, or None if nothing is stored for it.
+        """
+        loc = self.dates.get(day)
+        return tuple(loc[:3]) if loc else None
+
+    def between(self, first, last):
+        """
+            Indexed ISO dates from `first` to `last` inclusive.
+        """
+        lo = bisect.bisect_left(self.order, first)
+        hi = bisect.bisect_right(self.order, last)
+        return self.order[lo:hi]
+
+    def last(self, n, until=None):
+        """
+            The newest `n` indexed dates (on or before `until`, if given), oldest first.
+        """
+        hi = bisect.bisect_right(self.order, until) if until else len(self.order)
+        return self.order[max(0, hi - n):hi]
+
+    def for_topic(self, topic):
+        return list(self.topics.get(topic, []))
+
+    def for_difficulty(self, difficulty):
+        return list(self.difficulties.get(difficulty, []))
+
+    def __len__(self):
+        return len(self.dates)
@@ -0,0 +1,196 @@
+import argparse
+import functools
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+
+import fake_blob
+import fake_linkedin
+import fake_openai
+import new_post
+import openai_prompt
+import quiz_store
+import send_it
+
+# End-to-end timing of the daily run against local stand-ins for OpenAI
+# (fake_openai.py), LinkedIn (fake_linkedin.py) and Blob Storage (fake_blob.py).
+# No credentials or network access are needed:
+#
+#     python benchmark.py --iterations 30 --openai-latency 0.8 --out bench.json
+
+DEFAULT_ITERATIONS = 20
+CONTAINER = "quizdata"
+BLOB = "questions.json"
+PERSON_URN = "urn:li:person:benchmark"
+
+# Functions in new_post that are timed as stages (called through the module, so wrapping works)
+STAGES = {
+    "read_yesterday": "_load_yesterday",
+    "todays_question": "_todays_question",
+    "dedupe_load": "_load_dedupe",
+    "append": "append_questions_sharded",
+}
+
+
+def _latency_stats(samples):
+    samples = sorted(samples)
+    if not samples:
+        return {}
+    return {
+        "count": len(samples),
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 2),
+        "p50_ms": round(samples[len(samples) // 2] * 1000, 2),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 2),
+        "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000, 2),
+        "max_ms": round(samples[-1] * 1000, 2),
+    }
+
+
+class StageTimer:
+    """Collects wall-clock samples per stage name; safe to use from worker threads."""
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self.samples[stage].append(seconds)
+
+    def wrap(self, stage, fn):
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.add(stage, time.perf_counter() - start)
+        return timed
+
+    def report(self):
+        return {stage: _latency_stats(s) for stage, s in sorted(self.samples.items())}
+
+
+def _instrument(timer):
+    """Wrap the stage functions in new_post; returns a function that undoes it."""
+    originals = {name: getattr(new_post, name) for name in STAGES.values()}
+    for stage, name in STAGES.items():
+        setattr(new_post, name, timer.wrap(stage, originals[name]))
+
+    def restore():
+        for name, fn in originals.items():
+            setattr(new_post, name, fn)
+    return restore
+
+
+def run_mode(mode, iterations, api_key, publish):
+    """
+        sequential: build_daily_message, then post_text_update (the original flow).
+        pipeline:   run_daily_quiz (reads, generation, append and post overlapped).
+    """
+    timer = StageTimer()
+    restore = _instrument(timer)
+    openai_prompt.STATS.reset()
+    post = timer.wrap("post", publish)
+    try:
+        for i in range(iterations):
+            start = time.perf_counter()
+            if mode == "sequential":
+                message = timer.wrap("build_daily_message", new_post.build_daily_message)(
+                    tz="UTC", offset_days=i, api_key=api_key, container=CONTAINER, blob=BLOB)
+                post(message)
+            else:
+                new_post.run_daily_quiz(post, tz="UTC", offset_days=i, api_key=api_key,
+                                        container=CONTAINER, blob=BLOB)
+            timer.add("end_to_end", time.perf_counter() - start)
+    finally:
+        restore()
+    stats = openai_prompt.STATS
+    timer.samples["openai_call"] = list(stats.latencies)
+    return {"mode": mode, "stages": timer.report(), "openai": stats.snapshot()}
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the daily quiz run against local stand-ins")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS, help="daily runs per mode")
+    parser.add_argument("--modes", default="sequential,pipeline")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--openai-latency", type=float, default=0.5)
+    parser.add_argument("--openai-jitter", type=float, default=0.3)
+    parser.add_argument("--openai-fail-rate", type=float, default=0.0)
+    parser.add_argument("--openai-malformed-rate", type=float, default=0.0)
+    parser.add_argument("--linkedin-latency", type=float, default=0.2)
+    parser.add_argument("--blob-latency", type=float, default=0.02, help="seconds per storage operation")
+    parser.add_argument("--out", help="write JSON results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    # Point every client at the stand-ins; the response cache would hide model latency
+    for name in ("QUIZ_CACHE_DIR", "QUIZ_CACHE_CONTAINER"):
+        os.environ.pop(name, None)
+    ai = fake_openai.FakeOpenAI(seed=args.seed, latency=args.openai_latency, jitter=args.openai_jitter,
+                                fail_rate=args.openai_fail_rate,
+                                malformed_rate=args.openai_malformed_rate).start()
+    li = fake_linkedin.FakeLinkedIn(latency=args.linkedin_latency).start()
+    os.environ["OPENAI_BASE_URL"] = ai.base_url
+    send_it.LINKEDIN_UGC_URL = f"{li.base_url}/v2/ugcPosts"
+    # Every iteration posts as the same author; don't let the per-author gap dominate the timings
+    send_it.AUTHOR_MIN_INTERVAL = 0
+    api_key = f"benchmark-{args.seed}"
+
+    def publish(text):
+        return send_it.post_text_update("fake-token", PERSON_URN, text)
+
+    results = []
+    for mode in args.modes.split(","):
+        blob_service = fake_blob.FakeBlobService(latency=args.blob_latency)
+        quiz_store.set_service_client(blob_service)
+        result = run_mode(mode, args.iterations, api_key, publish)
+        result["storage_calls"] = dict(blob_service.calls)
+        e2e = result["stages"]["end_to_end"]
+        print(f"{mode}: end-to-end p50 {e2e['p50_ms']}ms p95 {e2e['p95_ms']}ms "
+              f"({result['openai']['calls']} model calls)", file=sys.stderr)
+        results.append(result)
+
+    report = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "iterations": args.iterations,
+        "stand_ins": {
+            "openai": {"latency_s": args.openai_latency, "jitter_s": args.openai_jitter,
+                       "fail_rate": args.openai_fail_rate, "malformed_rate": args.openai_malformed_rate},
+            "linkedin": {"latency_s": args.linkedin_latency},
+            "blob": {"latency_s": args.blob_latency},
+        },
+        "results": results,
+        "server_calls": {
+            "openai": {f"{e} {s}": n for (e, s), n in ai.calls.items()},
+            "linkedin": {str(s): n for s, n in li.calls.items()},
+        },
+    }
+    ai.shutdown()
+    li.shutdown()
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import logging
+import os
+import random
+import time
+
+# Azure Functions (Consumption plan) kills a run after 5 minutes by default;
+# stop starting new work a little before that.
+DEFAULT_BUDGET_SECONDS = 270
+# Time kept back for saving today's question and posting it
+WRITE_RESERVE = 20
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+        Raised instead of starting work that can't finish before the deadline.
+    """
+
+
+class Deadline:
+    """
+        Time budget shared by every stage of one run.
+        - remaining(): seconds left (inf when there is no limit).
+        - timeout(cap): per-request timeout that never runs past the deadline.
+        - backoff(attempt): jittered, capped wait before a retry; returns False
+          (without sleeping) when the retry wouldn't fit in the remaining time.
+        - reserve(seconds): a deadline that ends earlier, so a stage leaves time
+          for the ones after it.
+        Deadline() with no seconds never expires, which is the default everywhere.
+    """
+    def __init__(self, seconds=None, *, _expires=None):
+        if _expires is not None:
+            self.expires = _expires
+        elif seconds is None:
+            self.expires = None
+        else:
+            self.expires = time.monotonic() + seconds
+
+    @classmethod
+    def from_env(cls, name="QUIZ_RUN_BUDGET_SECONDS", default=DEFAULT_BUDGET_SECONDS):
+        """
+            Budget from an app setting; 0 or a negative value means unlimited.
+        """
+        seconds = float(os.getenv(name, default))
+        return cls(seconds if seconds > 0 else None)
+
+    @property
+    def bounded(self):
+        return self.expires is not None
+
+    def remaining(self):
+        if self.expires is None:
+            return float("inf")
+        return max(0.0, self.expires - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def check(self, what="operation", need=0.0):
+        """
+            Raise DeadlineExceeded if less than `need` seconds are left.
+        """
+        left = self.remaining()
+        if left <= 0 or left < need:
+            raise DeadlineExceeded(f"{what}: {left:.1f}s left of the run budget, needed {need:.1f}s")
+
+    def timeout(self, cap):
+        """
+            min(cap, remaining time); raises DeadlineExceeded if nothing is left.
+        """
+        self.check("request")
+        return min(cap, self.remaining())
+
+    def reserve(self, seconds):
+        """
+            A deadline `seconds` earlier than this one (still unlimited if this is).
+        """
+        if self.expires is None:
+            return self
+        return Deadline(_expires=self.expires - seconds)
+
+    def backoff(self, attempt, base=1.0, cap=30.0, delay=None, what="retry"):
+        """
+            Sleep before retry number `attempt` and return True, or return False
+            straight away if the wait wouldn't leave time for the retry itself.
+            - Without `delay`: "full jitter", a random wait in [0, min(cap, base * 2**attempt)].
+            - With `delay` (e.g. a Retry-After value): that wait, still capped at `cap`.
+        """
+        if delay is None:
+            wait = random.uniform(0, min(cap, base * 2 ** attempt))
+        else:
+            wait = min(cap, delay)
+        if wait >= self.remaining():
+            logging.warning("Skipping %s: %.1fs wait, %.1fs left of the run budget",
+                            what, wait, self.remaining())
+            return False
+        time.sleep(wait)
+        return True
+
+
+def as_deadline(deadline):
+    """
+        The given deadline, or an unlimited one for callers that don't pass one.
+    """
+    return deadline if deadline is not None else Deadline()
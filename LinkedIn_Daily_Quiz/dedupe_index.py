@@ -0,0 +1,118 @@
+import base64
+import hashlib
+import random
+import re
+import struct
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_WORDS = 2
+DEFAULT_THRESHOLD = 0.5
+
+# Fixed seed so every process derives the same "permutations"
+_MASKS = [random.Random(20240101 + i).getrandbits(32) for i in range(NUM_PERM)]
+_SIG = struct.Struct(f"<{NUM_PERM}I")
+_WORD = re.compile(r"[a-z0-9_]+")
+
+
+def _text(item):
+    """
+        Question plus its choices, lower-cased; the answer key and explanation are left out
+    """
+    parts = [str(item.get("question", ""))]
+    parts.extend(str(c) for c in item.get("choices") or [])
+    return " ".join(parts).lower()
+
+
+def shingles(item, k=SHINGLE_WORDS):
+    """
+        Set of k-word shingles (shorter texts fall back to fewer words per shingle)
+    """
+    words = _WORD.findall(_text(item))
+    k = max(1, min(k, len(words)))
+    return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+
+def signature(item):
+    """
+        MinHash signature: each shingle is hashed once, then XOR-ed with one
+        random mask per slot and the minimum kept (a cheap stand-in for true
+        random permutations that works well for short texts).
+    """
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little")
+        for s in shingles(item)
+    ] or [0]
+    return [min(h ^ m for h in hashes) for m in _MASKS]
+
+
+def _band_keys(sig):
+    packed = _SIG.pack(*sig)
+    width = ROWS * 4
+    return [
+        f"{b}:{hashlib.blake2b(packed[b * width:(b + 1) * width], digest_size=4).hexdigest()}"
+        for b in range(BANDS)
+    ]
+
+
+def similarity(sig_a, sig_b):
+    """
+        Estimated Jaccard similarity = share of matching MinHash slots
+    """
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / NUM_PERM
+
+
+class DedupeIndex:
+    """
+        LSH index over MinHash signatures. A lookup only compares the candidate
+        against questions that share at least one band bucket, so its cost doesn't
+        grow with the size of the history.
+        Stored as JSON: {"signatures": {id: base64}, "buckets": {band_key: [ids]}}.
+    """
+    def __init__(self, signatures=None, buckets=None):
+        self.signatures = signatures or {}
+        self.buckets = buckets or {}
+
+    @classmethod
+    def from_dict(cls, d):
+        d = d or {}
+        return cls(d.get("signatures"), d.get("buckets"))
+
+    def to_dict(self):
+        return {"num_perm": NUM_PERM, "bands": BANDS, "signatures": self.signatures, "buckets": self.buckets}
+
+    @staticmethod
+    def _encode(sig):
+        return base64.b64encode(_SIG.pack(*sig)).decode("ascii")
+
+    @staticmethod
+    def _decode(s):
+        return list(_SIG.unpack(base64.b64decode(s)))
+
+    def add(self, item_id, item):
+        """
+            Index one stored question under its id (the post date)
+        """
+        item_id = str(item_id)
+        if item_id in self.signatures:
+            return
+        sig = signature(item)
+        self.signatures[item_id] = self._encode(sig)
+        for key in _band_keys(sig):
+            self.buckets.setdefault(key, []).append(item_id)
+
+    def query(self, item, threshold=DEFAULT_THRESHOLD):
+        """
+            Stored ids whose estimated similarity is >= threshold, most similar first,
+            as (id, similarity) pairs
+        """
+        sig = signature(item)
+        candidates = set()
+        for key in _band_keys(sig):
+            candidates.update(self.buckets.get(key, ()))
+        scored = ((cid, similarity(sig, self._decode(self.signatures[cid]))) for cid in candidates)
+        return sorted((p for p in scored if p[1] >= threshold), key=lambda p: -p[1])
+
+    def __len__(self):
+        return len(self.signatures)
@@ -0,0 +1,194 @@
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+
+from azure.core import MatchConditions
+from azure.core.exceptions import (
+    ResourceExistsError,
+    ResourceModifiedError,
+    ResourceNotFoundError,
+    ResourceNotModifiedError,
+)
+
+# In-memory stand-in for the parts of azure.storage.blob that quiz_store uses.
+# It follows Azurite's conditional-request rules (ETags, If-Match / If-None-Match,
+# Append Blob offsets), so storage logic can be exercised offline:
+#
+#     import quiz_store, fake_blob
+#     quiz_store.set_service_client(fake_blob.FakeBlobService())
+
+
+class _Blob:
+    def __init__(self, data=b"", append=False):
+        self.data = data
+        self.append = append
+        self.etag = f'"{uuid.uuid4().hex}"'
+        self.last_modified = datetime.now(timezone.utc)
+
+    def touch(self):
+        self.etag = f'"{uuid.uuid4().hex}"'
+        self.last_modified = datetime.now(timezone.utc)
+
+
+class _Properties:
+    def __init__(self, blob):
+        self.etag = blob.etag
+        self.last_modified = blob.last_modified
+        self.size = len(blob.data)
+
+
+class _Downloader:
+    def __init__(self, blob, data):
+        self.properties = _Properties(blob)
+        self._data = data
+
+    def readall(self):
+        return self._data
+
+
+class _ListedBlob:
+    def __init__(self, name, blob):
+        self.name = name
+        self.last_modified = blob.last_modified
+        self.size = len(blob.data)
+
+
+def _check(blob, etag, match_condition):
+    """Apply an azure.core MatchConditions precondition the way the service does."""
+    if match_condition is None:
+        return
+    if match_condition == MatchConditions.IfNotModified:
+        if blob is None or blob.etag != etag:
+            raise ResourceModifiedError("The condition specified using HTTP conditional header(s) is not met.")
+    elif match_condition == MatchConditions.IfModified:
+        if blob is not None and blob.etag == etag:
+            raise ResourceNotModifiedError("Not modified")
+    elif match_condition == MatchConditions.IfMissing:
+        if blob is not None:
+            raise ResourceExistsError("The specified blob already exists.")
+    elif match_condition == MatchConditions.IfPresent:
+        if blob is None:
+            raise ResourceNotFoundError("The specified blob does not exist.")
+
+
+class FakeBlobClient:
+    def __init__(self, service, container, blob):
+        self._svc = service
+        self._key = (container, blob)
+
+    def _get(self):
+        return self._svc.blobs.get(self._key)
+
+    def exists(self):
+        return self._get() is not None
+
+    def get_blob_properties(self):
+        self._svc.op("get_blob_properties")
+        blob = self._get()
+        if blob is None:
+            raise ResourceNotFoundError("The specified blob does not exist.")
+        return _Properties(blob)
+
+    def download_blob(self, offset=None, length=None, etag=None, match_condition=None, **kwargs):
+        self._svc.op("download_blob")
+        with self._svc.lock:
+            blob = self._get()
+            if blob is None:
+                raise ResourceNotFoundError("The specified blob does not exist.")
+            _check(blob, etag, match_condition)
+            start = offset or 0
+            end = start + length if length is not None else len(blob.data)
+            data = blob.data[start:end]
+        self._svc.bytes_downloaded += len(data)
+        return _Downloader(blob, data)
+
+    def upload_blob(self, data, overwrite=False, etag=None, match_condition=None, **kwargs):
+        self._svc.op("upload_blob")
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        with self._svc.lock:
+            blob = self._get()
+            _check(blob, etag, match_condition)
+            if blob is not None and not overwrite:
+                raise ResourceExistsError("The specified blob already exists.")
+            blob = _Blob(data)
+            self._svc.blobs[self._key] = blob
+            return {"etag": blob.etag, "last_modified": blob.last_modified}
+
+    def create_append_blob(self, etag=None, match_condition=None, **kwargs):
+        self._svc.op("create_append_blob")
+        with self._svc.lock:
+            _check(self._get(), etag, match_condition)
+            blob = _Blob(append=True)
+            self._svc.blobs[self._key] = blob
+            return {"etag": blob.etag, "last_modified": blob.last_modified}
+
+    def append_block(self, data, **kwargs):
+        self._svc.op("append_block")
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        with self._svc.lock:
+            blob = self._get()
+            if blob is None or not blob.append:
+                raise ResourceNotFoundError("The specified blob does not exist.")
+            offset = len(blob.data)
+            blob.data += data
+            blob.touch()
+            return {
+                "etag": blob.etag,
+                "last_modified": blob.last_modified,
+                "blob_append_offset": str(offset),
+                "blob_committed_block_count": 1,
+            }
+
+    def delete_blob(self, **kwargs):
+        self._svc.op("delete_blob")
+        with self._svc.lock:
+            if self._svc.blobs.pop(self._key, None) is None:
+                raise ResourceNotFoundError("The specified blob does not exist.")
+
+
+class FakeContainerClient:
+    def __init__(self, service, container):
+        self._svc = service
+        self._container = container
+
+    def list_blobs(self, name_starts_with=None, **kwargs):
+        self._svc.op("list_blobs")
+        prefix = name_starts_with or ""
+        with self._svc.lock:
+            items = sorted(
+                (name, blob) for (c, name), blob in self._svc.blobs.items()
+                if c == self._container and name.startswith(prefix)
+            )
+        return [_ListedBlob(name, blob) for name, blob in items]
+
+    def get_blob_client(self, blob):
+        return FakeBlobClient(self._svc, self._container, blob)
+
+
+class FakeBlobService:
+    """
+        Drop-in for BlobServiceClient. `calls` counts operations and
+        `bytes_downloaded` counts body bytes, so tests can check caching.
+        `latency` adds that many seconds to every operation (for benchmarks).
+    """
+    def __init__(self, latency=0.0):
+        self.blobs = {}
+        self.lock = threading.Lock()
+        self.calls = Counter()
+        self.bytes_downloaded = 0
+        self.latency = latency
+
+    def op(self, name):
+        self.calls[name] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def get_blob_client(self, container, blob):
+        return FakeBlobClient(self, container, blob)
+
+    def get_container_client(self, container):
+        return FakeContainerClient(self, container)
@@ -0,0 +1,203 @@
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+# Local stand-in for LinkedIn's UGC posts and comments endpoints, for load-testing
+# send_it and answer_tally without touching a real account:
+#
+#     python fake_linkedin.py --port 8089 --latency 0.2 --rate-limit 2
+#     LINKEDIN_API_BASE=http://127.0.0.1:8089 python local_test.py
+#
+# or `python fake_linkedin.py --load-test 20` to fan a post out to 20 fake authors.
+
+
+class FakeLinkedIn(ThreadingHTTPServer):
+    """
+        UGC endpoint that accepts POST /v2/ugcPosts and returns 201 with an id,
+        plus GET /v2/socialActions/{urn}/comments?start=&count= paging through
+        comments added with add_comment().
+        - latency: seconds added to every request.
+        - fail_rate: share of requests answered with a 500.
+        - rate_limit: posts allowed per author per `window` seconds; extra posts
+          get a 429 with Retry-After.
+        `calls` counts status codes, `posts` keeps (author, text) pairs and
+        `comments` maps post URN -> comment list.
+    """
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), latency=0.0, fail_rate=0.0, rate_limit=0, window=1):
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.rate_limit = rate_limit
+        self.window = window
+        self.calls = Counter()
+        self.posts = []
+        self.comments = defaultdict(list)
+        self.lock = threading.Lock()
+        self._seen = {}
+        self._ids = itertools.count(1)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def throttled(self, author):
+        """Return seconds to wait if this author is over its limit, else 0."""
+        if not self.rate_limit:
+            return 0
+        now = time.monotonic()
+        with self.lock:
+            recent = [t for t in self._seen.get(author, []) if now - t < self.window]
+            if len(recent) >= self.rate_limit:
+                self._seen[author] = recent
+                return max(1, int(self.window - (now - recent[0]) + 0.999))
+            recent.append(now)
+            self._seen[author] = recent
+        return 0
+
+    def add_comment(self, urn, actor, text):
+        """Add a reader's comment to a post; returns its comment URN."""
+        with self.lock:
+            n = len(self.comments[urn]) + 1
+            comment_urn = f"urn:li:comment:({urn},{n})"
+            self.comments[urn].append({
+                "id": str(n),
+                "$URN": comment_urn,
+                "actor": actor,
+                "object": urn,
+                "message": {"text": text},
+                "created": {"actor": actor, "time": int(time.time() * 1000)},
+            })
+        return comment_urn
+
+    def start(self):
+        """Serve from a daemon thread; returns self so it can be used inline."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+        with self.server.lock:
+            self.server.calls[status] += 1
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        parts = url.path.strip("/").split("/")
+        if len(parts) != 4 or parts[:2] != ["v2", "socialActions"] or parts[3] != "comments":
+            return self._reply(404, {"message": "Not found"})
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            return self._reply(401, {"message": "Missing bearer token"})
+        query = parse_qs(url.query)
+        try:
+            start = int(query.get("start", ["0"])[0])
+            count = int(query.get("count", ["10"])[0])
+        except ValueError:
+            return self._reply(400, {"message": "Bad paging parameters"})
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        urn = unquote(parts[2])
+        wait = self.server.throttled(f"read:{urn}")
+        if wait:
+            return self._reply(429, {"message": "Throttled"}, {"Retry-After": str(wait)})
+        if random.random() < self.server.fail_rate:
+            return self._reply(500, {"message": "Injected failure"})
+        with self.server.lock:
+            comments = list(self.server.comments.get(urn, []))
+        self._reply(200, {
+            "paging": {"start": start, "count": count, "total": len(comments)},
+            "elements": comments[start:start + count],
+        })
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length)
+        if self.path.rstrip("/") != "/v2/ugcPosts":
+            return self._reply(404, {"message": "Not found"})
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            return self._reply(401, {"message": "Missing bearer token"})
+        try:
+            payload = json.loads(raw or b"{}")
+            author = payload["author"]
+            text = payload["specificContent"]["com.linkedin.ugc.ShareContent"]["shareCommentary"]["text"]
+        except (ValueError, KeyError, TypeError):
+            return self._reply(422, {"message": "Malformed UGC payload"})
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        wait = self.server.throttled(author)
+        if wait:
+            return self._reply(429, {"message": "Throttled"}, {"Retry-After": str(wait)})
+        if random.random() < self.server.fail_rate:
+            return self._reply(500, {"message": "Injected failure"})
+
+        urn = f"urn:li:share:{next(self.server._ids)}"
+        with self.server.lock:
+            self.server.posts.append((author, text))
+        self._reply(201, {"id": urn}, {"X-RestLi-Id": urn})
+
+
+def load_test(server, authors, message="Load test post"):
+    """
+        Fan one post out to `authors` fake accounts through send_it.post_many
+        and print how long it took and what the server answered.
+    """
+    import send_it
+
+    send_it.LINKEDIN_UGC_URL = f"{server.base_url}/v2/ugcPosts"
+    urns = [f"urn:li:person:fake{i}" for i in range(authors)]
+    started = time.perf_counter()
+    results = asyncio.run(send_it.post_many("fake-token", urns, message))
+    elapsed = time.perf_counter() - started
+    ok = sum(1 for r in results.values() if getattr(r, "status_code", 0) == 201)
+    print(f"{ok}/{authors} posted in {elapsed:.2f}s | server replies: {dict(server.calls)}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the LinkedIn UGC API")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to each request")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of requests answered with 500")
+    parser.add_argument("--rate-limit", type=int, default=0, help="posts per author per window (0 = unlimited)")
+    parser.add_argument("--window", type=int, default=1, help="rate-limit window in seconds")
+    parser.add_argument("--load-test", type=int, metavar="AUTHORS",
+                        help="start the server in-process and post as this many fake authors")
+    args = parser.parse_args()
+
+    port = 0 if args.load_test else args.port
+    server = FakeLinkedIn(("127.0.0.1", port), args.latency, args.fail_rate, args.rate_limit, args.window)
+    if args.load_test:
+        server.start()
+        load_test(server, args.load_test)
+        server.shutdown()
+        return
+    print(f"Fake LinkedIn UGC API on {server.base_url}/v2/ugcPosts")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import argparse
+import hashlib
+import json
+import operator
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Local stand-in for the two OpenAI endpoints OpenAIPrompt uses
+# (POST /v1/responses and POST /v1/chat/completions). Answers are quiz questions
+# generated from a seed, so the same sequence of requests gets the same answers:
+#
+#     python fake_openai.py --port 8090 --latency 0.8 --jitter 0.3
+#     OPENAI_BASE_URL=http://127.0.0.1:8090/v1 OPENAI_API_KEY=fake python local_test.py
+
+NAMES = ["items", "data", "scores", "words", "nums", "values", "queue", "stack", "cache", "row"]
+FUNCS = ["len", "sum", "max", "min", "sorted", "set", "list", "tuple"]
+OPERATORS = {"//": operator.floordiv, "%": operator.mod, "**": operator.pow}
+# Batched requests (new_post._generate_quiz_batch) number their slots "#1 difficulty=..."
+_SLOT = re.compile(r"#(\d+) difficulty=")
+
+
+def _schema_name(body):
+    fmt = (body.get("text") or {}).get("format") or {}
+    if not fmt:
+        fmt = (body.get("response_format") or {}).get("json_schema") or {}
+    return fmt.get("name")
+
+
+def _quiz(rng):
+    """
+        One valid quiz question (question, 4 choices, answer, explanation) built from rng.
+    """
+    name = rng.choice(NAMES)
+    nums = [rng.randint(0, 9) for _ in range(rng.randint(3, 6))]
+    kind = rng.randrange(4)
+    if kind == 0:
+        func = rng.choice(["len", "sum", "max", "min"])
+        correct = str({"len": len, "sum": sum, "max": max, "min": min}[func](nums))
+        question = f"Given {name} = {nums}, what does {func}({name}) return?"
+        explanation = f"{func}() applied to the list gives {correct}."
+    elif kind == 1:
+        a, b = sorted(rng.sample(range(len(nums) + 1), 2))
+        correct = str(nums[a:b])
+        question = f"{name} = {nums}\nWhat is {name}[{a}:{b}]?"
+        explanation = f"Slicing keeps indexes {a} up to (not including) {b}."
+    elif kind == 2:
+        correct = str(len(set(nums)))
+        question = f"How many elements does set({nums}) contain?"
+        explanation = "A set keeps one copy of each distinct value."
+    else:
+        x, y = rng.randint(7, 99), rng.randint(2, 9)
+        op = rng.choice(list(OPERATORS))
+        correct = str(OPERATORS[op](x, y))
+        question = f"Which value does the expression {x} {op} {y} produce in Python 3?"
+        explanation = f"{op} is applied to two ints, giving {correct}."
+
+    choices = {correct}
+    while len(choices) < 4:
+        choices.add(str(rng.choice([rng.randint(-3, 120), f"[{rng.randint(0, 9)}]", "None", "TypeError"])))
+    choices = sorted(choices)
+    rng.shuffle(choices)
+    return {"question": question, "choices": choices, "answer": correct, "explanation": explanation}
+
+
+class FakeOpenAI(ThreadingHTTPServer):
+    """
+        OpenAI stand-in with deterministic answers and injected latency/failures.
+        Requests using the "quiz_batch" schema get one question per numbered slot.
+        - seed: base seed; each answer is seeded from (seed, prompt, seed param,
+          how many times that prompt was seen), so a rerun replays the same answers.
+        - latency / jitter: seconds added per request (uniform jitter on top).
+        - fail_rate: share of requests answered with a 500.
+        - malformed_rate: share of answers wrapped in a code fence with a trailing
+          comma (exercises OpenAIPrompt's local repair).
+        `calls` counts (endpoint, status) pairs.
+    """
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), seed=0, latency=0.0, jitter=0.0, fail_rate=0.0,
+                 malformed_rate=0.0):
+        super().__init__(address, _Handler)
+        self.seed = seed
+        self.latency = latency
+        self.jitter = jitter
+        self.fail_rate = fail_rate
+        self.malformed_rate = malformed_rate
+        self.calls = Counter()
+        self.lock = threading.Lock()
+        self._seen = Counter()
+        self._ids = 0
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        """Serve from a daemon thread; returns self so it can be used inline."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def rng_for(self, prompt, seed):
+        with self.lock:
+            self._seen[(prompt, seed)] += 1
+            nth = self._seen[(prompt, seed)]
+            self._ids += 1
+        digest = hashlib.sha256(f"{self.seed}|{prompt}|{seed}|{nth}".encode("utf-8")).digest()
+        return random.Random(int.from_bytes(digest[:8], "big"))
+
+    def next_id(self):
+        with self.lock:
+            return self._ids
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body, endpoint):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        with self.server.lock:
+            self.server.calls[(endpoint, status)] += 1
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._reply(400, {"error": {"message": "Invalid JSON body"}}, self.path)
+
+        if self.path.endswith("/responses"):
+            endpoint, messages = "responses", body.get("input") or []
+        elif self.path.endswith("/chat/completions"):
+            endpoint, messages = "chat", body.get("messages") or []
+        else:
+            return self._reply(404, {"error": {"message": f"Unknown path {self.path}"}}, self.path)
+
+        server = self.server
+        rng = server.rng_for(json.dumps(messages, sort_keys=True), body.get("seed"))
+        delay = server.latency + rng.uniform(0, server.jitter)
+        if delay:
+            time.sleep(delay)
+        if rng.random() < server.fail_rate:
+            return self._reply(500, {"error": {"message": "Injected failure", "type": "server_error"}}, endpoint)
+
+        if _schema_name(body) == "quiz_batch":
+            slots = sorted({int(n) for n in _SLOT.findall(json.dumps(messages))})
+            text = json.dumps({"questions": [{"slot": n, **_quiz(rng)} for n in slots]})
+        else:
+            text = json.dumps(_quiz(rng))
+        if rng.random() < server.malformed_rate:
+            text = f"```json\n{text[:-1]}, }}\n```"
+        prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in messages)
+        output_tokens = len(text.split())
+        n = server.next_id()
+        model = body.get("model", "fake")
+
+        if endpoint == "responses":
+            reply = {
+                "id": f"resp_{n}", "object": "response", "created_at": int(time.time()), "model": model,
+                "status": "completed",
+                "output": [{
+                    "type": "message", "id": f"msg_{n}", "status": "completed", "role": "assistant",
+                    "content": [{"type": "output_text", "text": text, "annotations": []}],
+                }],
+                "usage": {"input_tokens": prompt_tokens, "output_tokens": output_tokens,
+                          "total_tokens": prompt_tokens + output_tokens},
+            }
+        else:
+            reply = {
+                "id": f"chatcmpl_{n}", "object": "chat.completion", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": text}}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": output_tokens,
+                          "total_tokens": prompt_tokens + output_tokens},
+            }
+        self._reply(200, reply, endpoint)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the OpenAI Responses/Chat APIs")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to each request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random seconds per request")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of requests answered with 500")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="share of answers needing repair")
+    args = parser.parse_args()
+
+    server = FakeOpenAI(("127.0.0.1", args.port), args.seed, args.latency, args.jitter,
+                        args.fail_rate, args.malformed_rate)
+    print(f"Fake OpenAI API on {server.base_url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,14 @@ import os
 
 import azure.functions as func
 
+import warmup
+
 app = func.FunctionApp()
 
+# Import the heavy modules and build the shared clients while the host finishes
+# starting, instead of inside the first invocation (see warmup.py)
+warmup.start_background()
+
 # ---------- Config / validation ----------
 REQUIRED_ENVS = ["ACCESS_TOKEN", "PERSON_URN"]
 
@@ -29,6 +35,78 @@ def _validate_config(access_token: str, person_urn: str, openai_key: str | None)
     if not openai_key:
         raise RuntimeError("OpenAI API key missing: set OPENAI_API_KEY or OPENAI_KEY")
 
+AUTHOR_PREFIXES = ("urn:li:person:", "urn:li:organization:")
+
+def _extra_authors(raw: str, visibility: str) -> list[tuple[str, str]]:
+    """
+        Parse QUIZ_EXTRA_AUTHORS (comma-separated person/organization URNs).
+        - Organization pages always post PUBLIC; people use QUIZ_VISIBILITY
+        Raises RuntimeError on anything that isn't a person or organization URN.
+    """
+    authors = []
+    for urn in (u.strip() for u in raw.split(",")):
+        if not urn:
+            continue
+        if not urn.startswith(AUTHOR_PREFIXES):
+            raise RuntimeError(f"QUIZ_EXTRA_AUTHORS entry {urn!r} must be a person or organization URN")
+        authors.append((urn, "PUBLIC" if urn.startswith("urn:li:organization:") else visibility))
+    return authors
+
+def _track_authors(raw: str, tracks: list[str], default: str, visibility: str) -> dict[str, tuple[str, str]]:
+    """
+        Parse QUIZ_TRACK_AUTHORS ("advanced=urn:li:organization:123,intermediate=urn:li:person:abc").
+        - Tracks not listed post as `default` (PERSON_URN)
+        - Organization pages always post PUBLIC; people use QUIZ_VISIBILITY
+        Returns {track: (author URN, visibility)}.
+        Raises RuntimeError on unknown tracks or URNs that aren't a person or organization.
+    """
+    authors = {t: default for t in tracks}
+    for pair in (p.strip() for p in raw.split(",")):
+        if not pair:
+            continue
+        track, _, urn = (x.strip() for x in pair.partition("="))
+        if track not in authors:
+            raise RuntimeError(f"QUIZ_TRACK_AUTHORS names unknown track {track!r} (QUIZ_TRACKS: {', '.join(tracks)})")
+        if not urn.startswith(AUTHOR_PREFIXES):
+            raise RuntimeError(f"QUIZ_TRACK_AUTHORS entry {pair!r} must map to a person or organization URN")
+        authors[track] = urn
+    return {t: (urn, "PUBLIC" if urn.startswith("urn:li:organization:") else visibility)
+            for t, urn in authors.items()}
+
+def _quiz_tracks(primary: str) -> list[str]:
+    """
+        Parse QUIZ_TRACKS ("beginner,intermediate,advanced").
+        Returns just `primary` (QUIZ_DIFFICULTY) when it isn't set.
+    """
+    return [t.strip() for t in os.getenv("QUIZ_TRACKS", "").split(",") if t.strip()] or [primary]
+
+def _log_post_result(resp, label: str = "LinkedIn post") -> int | None:
+    """
+        Log a LinkedIn post response: success (with the post URL) on 2xx, an error otherwise.
+        post_text_update returns error responses instead of raising, so this is the check.
+        Returns the HTTP status (None if there was no response).
+    """
+    status = getattr(resp, "status_code", None)
+    body_preview = getattr(resp, "text", "")[:500]
+    if status and 200 <= status < 300:
+        try:
+            urn = resp.json().get("id")
+            post_url = f"https://www.linkedin.com/feed/update/{urn}" if urn else "(no id in response)"
+            logging.info("🎉 %s succeeded (%s). URL: %s | Body: %s", label, status, post_url, body_preview)
+        except Exception as e:
+            logging.info("🎉 %s succeeded (%s). Body: %s (URL parse failed: %s)", label, status, body_preview, e)
+    else:
+        logging.error("❌ %s failed (%s). Body: %s", label, status, body_preview)
+    return status
+
+def _log_http_metrics() -> None:
+    """
+        Log per-endpoint HTTP counts and latency for this process (see http_client.METRICS).
+    """
+    from http_client import METRICS
+    for endpoint, stats in METRICS.snapshot().items():
+        logging.info("📈 %s: %s", endpoint, stats)
+
 # ---------- Timer trigger ----------
 @app.function_name(name="post_daily_quiz")
 @app.schedule(schedule="0 0 14 * * *", arg_name="mytimer", run_on_startup=False, use_monitor=True)
@@ -36,57 +114,205 @@ def post_daily_quiz(mytimer: func.TimerRequest):
     """
         Azure Function that runs every day at 2:00 PM UTC.
         1. Checks environment variables for configuration
-        2. Uses OpenAI to generate today’s quiz question
-        3. Appends the new question to storage
-        4. Builds a LinkedIn post with yesterday’s answer and today’s question
-        5. Posts the message to LinkedIn using the API
+        2. Reads yesterday’s entry while getting today’s question (queue or OpenAI)
+        3. Builds a LinkedIn post with yesterday’s answer and today’s question
+        4. Appends the new question to storage while posting the message to LinkedIn
+           (and to any QUIZ_EXTRA_AUTHORS pages at the same time)
+        If the timer is past due, days missed in the last QUIZ_BACKFILL_DAYS are
+        generated and stored in the same batch; only today's question is posted.
+        With several QUIZ_TRACKS (e.g. "beginner,intermediate,advanced"), every track
+        gets its own question, history and post (to its QUIZ_TRACK_AUTHORS page), and
+        the questions come from one batched model request. QUIZ_DIFFICULTY names the
+        track that keeps the original storage.
         Logs whether the post succeeded or failed.
     """
     logging.info("✅ post_daily_quiz triggered")
-    if mytimer and mytimer.past_due:
-        logging.warning("⏰ Timer is running late.")
+    import tracing
+    from deadline import Deadline
+    # Started first so the budget covers the whole run (QUIZ_RUN_BUDGET_SECONDS)
+    deadline = Deadline.from_env()
+    # A late timer usually means runs were missed: catch up on the days with no stored question
+    past_due = bool(mytimer and mytimer.past_due)
+    if past_due:
+        logging.warning("⏰ Timer is running late; backfilling missed days.")
+
+    # Root span: every stage below (OpenAI, blob I/O, LinkedIn attempts) nests under it
+    with tracing.span("post_daily_quiz", past_due=past_due,
+                      budget_s=round(deadline.remaining(), 1) if deadline.bounded else 0) as root:
+        try:
+            startup = warmup.invocation_attributes()
+            root.set_attributes(startup)
+            logging.info("⏱️ Start-up: %s", startup)
+
+            # Pull settings from environment variables
+            ACCESS_TOKEN = os.getenv("ACCESS_TOKEN", "")
+            PERSON_URN = os.getenv("PERSON_URN", "")
+            OPENAI_KEY = os.getenv("OPENAI_KEY") or os.getenv("OPENAI_API_KEY")
+
+            QUIZ_TZ = os.getenv("QUIZ_TZ", "America/Phoenix")
+            QUIZ_DIFFICULTY = os.getenv("QUIZ_DIFFICULTY", "beginner")
+            OFFSET_DAYS = int(os.getenv("QUIZ_OFFSET_DAYS", "0"))
+            VISIBILITY = os.getenv("QUIZ_VISIBILITY", "CONNECTIONS")
+            QUIZ_OPENAI_MODEL = os.getenv("QUIZ_OPENAI_MODEL", "gpt-5")
+            BACKFILL_DAYS = int(os.getenv("QUIZ_BACKFILL_DAYS", "14")) if past_due else 0
+            WORKERS = int(os.getenv("QUIZ_QUEUE_WORKERS", "4"))
+
+            with tracing.span("validate_config"):
+                _validate_config(ACCESS_TOKEN, PERSON_URN, OPENAI_KEY)
+            EXTRA_AUTHORS = _extra_authors(os.getenv("QUIZ_EXTRA_AUTHORS", ""), VISIBILITY)
+            TRACKS = _quiz_tracks(QUIZ_DIFFICULTY)
 
+            import asyncio
+            from new_post import run_daily_quiz, run_daily_tracks
+            from send_it import post_many, post_text_update
+
+            if len(TRACKS) > 1:
+                TRACK_AUTHORS = _track_authors(os.getenv("QUIZ_TRACK_AUTHORS", ""), TRACKS, PERSON_URN, VISIBILITY)
+                if EXTRA_AUTHORS or BACKFILL_DAYS:
+                    logging.warning("QUIZ_EXTRA_AUTHORS and backfill only apply to single-track runs; ignored.")
+
+                def _publisher(author, visibility):
+                    return lambda text: post_text_update(ACCESS_TOKEN, author, text, visibility=visibility,
+                                                         deadline=deadline)
+
+                results = run_daily_tracks(
+                    {t: _publisher(*TRACK_AUTHORS[t]) for t in TRACKS},
+                    tz=QUIZ_TZ,
+                    primary=QUIZ_DIFFICULTY,
+                    offset_days=OFFSET_DAYS,
+                    api_key=OPENAI_KEY,
+                    model=QUIZ_OPENAI_MODEL,
+                    deadline=deadline,
+                )
+                for track, (message, resp) in results.items():
+                    _log_post_result(resp, f"LinkedIn post for the {track} track as {TRACK_AUTHORS[track][0]}")
+                root.set_attributes({"model": QUIZ_OPENAI_MODEL, "tracks": len(TRACKS)})
+                return
+
+            def publish(text):
+                # Single account: plain post. Extra pages: fan out, but report on PERSON_URN's post
+                if not EXTRA_AUTHORS:
+                    return post_text_update(ACCESS_TOKEN, PERSON_URN, text, visibility=VISIBILITY,
+                                            deadline=deadline)
+                results = asyncio.run(post_many(ACCESS_TOKEN, [(PERSON_URN, VISIBILITY)] + EXTRA_AUTHORS, text,
+                                                deadline=deadline))
+                for urn, res in results.items():
+                    if urn != PERSON_URN:
+                        logging.info("📣 Extra author %s: %s", urn, getattr(res, "status_code", res))
+                primary = results[PERSON_URN]
+                if isinstance(primary, Exception):
+                    raise primary
+                return primary
+
+            # Build the daily quiz post (yesterday’s answer + today’s question), then
+            # save today's question and post to LinkedIn at the same time
+            message, resp = run_daily_quiz(
+                publish,
+                tz=QUIZ_TZ,
+                difficulty=QUIZ_DIFFICULTY,
+                offset_days=OFFSET_DAYS,
+                api_key=OPENAI_KEY,
+                model=QUIZ_OPENAI_MODEL,
+                deadline=deadline,
+                backfill_days=BACKFILL_DAYS,
+                max_workers=WORKERS,
+            )
+
+            status = _log_post_result(resp)
+            root.set_attributes({"model": QUIZ_OPENAI_MODEL, "extra_authors": len(EXTRA_AUTHORS),
+                                 "message_bytes": len(message.encode("utf-8")), "http.status_code": status or 0})
+
+        except Exception as e:
+            root.record_exception(e)
+            logging.exception("🚨 post_daily_quiz failed: %s", e)
+        finally:
+            _log_http_metrics()
+
+
+# ---------- Queue pre-generation ----------
+@app.function_name(name="prefill_quiz_queue")
+@app.schedule(schedule="0 0 3 * * *", arg_name="mytimer", run_on_startup=False, use_monitor=True)
+def prefill_quiz_queue(mytimer: func.TimerRequest):
+    """
+        Azure Function that runs every day at 3:00 AM UTC, well before the post.
+        Generates the next QUIZ_QUEUE_DAYS days of questions in parallel
+        (QUIZ_QUEUE_WORKERS at a time) so post_daily_quiz only has to dequeue.
+        Every QUIZ_TRACKS track gets its own queue (quiz_store.track_blob).
+    """
+    logging.info("✅ prefill_quiz_queue triggered")
+    from deadline import Deadline
+    deadline = Deadline.from_env()
     try:
-        # Pull settings from environment variables
-        ACCESS_TOKEN = os.getenv("ACCESS_TOKEN", "")
-        PERSON_URN = os.getenv("PERSON_URN", "")
+        logging.info("⏱️ Start-up: %s", warmup.invocation_attributes())
         OPENAI_KEY = os.getenv("OPENAI_KEY") or os.getenv("OPENAI_API_KEY")
-
-        QUIZ_TZ = os.getenv("QUIZ_TZ", "America/Phoenix")
+        if not OPENAI_KEY:
+            raise RuntimeError("OpenAI API key missing: set OPENAI_API_KEY or OPENAI_KEY")
         QUIZ_DIFFICULTY = os.getenv("QUIZ_DIFFICULTY", "beginner")
-        OFFSET_DAYS = int(os.getenv("QUIZ_OFFSET_DAYS", "0"))
-        VISIBILITY = os.getenv("QUIZ_VISIBILITY", "CONNECTIONS")
-        QUIZ_OPENAI_MODEL = os.getenv("QUIZ_OPENAI_MODEL", "gpt-5")
 
-        _validate_config(ACCESS_TOKEN, PERSON_URN, OPENAI_KEY)
+        from new_post import DEFAULT_BLOB, prefill_question_queue
+        from question_queue import DEFAULT_QUEUE_BLOB
+        from quiz_store import track_blob
 
-        from new_post import build_daily_message
-        from send_it import post_text_update
+        for track in _quiz_tracks(QUIZ_DIFFICULTY):
+            try:
+                added = prefill_question_queue(
+                    tz=os.getenv("QUIZ_TZ", "America/Phoenix"),
+                    difficulty=track,
+                    days=int(os.getenv("QUIZ_QUEUE_DAYS", "7")),
+                    offset_days=int(os.getenv("QUIZ_OFFSET_DAYS", "0")),
+                    max_workers=int(os.getenv("QUIZ_QUEUE_WORKERS", "4")),
+                    api_key=OPENAI_KEY,
+                    model=os.getenv("QUIZ_OPENAI_MODEL", "gpt-5"),
+                    blob=track_blob(DEFAULT_BLOB, track, QUIZ_DIFFICULTY),
+                    queue_blob=track_blob(DEFAULT_QUEUE_BLOB, track, QUIZ_DIFFICULTY),
+                    deadline=deadline,
+                )
+                logging.info("📥 Queued %s %s question(s): %s", len(added), track,
+                             ", ".join(d.isoformat() for d in added) or "none needed")
+            except Exception as e:
+                logging.exception("🚨 prefill_quiz_queue failed for the %s track: %s", track, e)
+    except Exception as e:
+        logging.exception("🚨 prefill_quiz_queue failed: %s", e)
 
-        # Build the daily quiz post (yesterday’s answer + today’s question)
-        message = build_daily_message(
-            tz=QUIZ_TZ,
-            difficulty=QUIZ_DIFFICULTY,
-            offset_days=OFFSET_DAYS,
-            api_key=OPENAI_KEY,
-            model=QUIZ_OPENAI_MODEL,
-        )
 
-        # Post the message to LinkedIn
-        resp = post_text_update(ACCESS_TOKEN, PERSON_URN, message, visibility=VISIBILITY)
+@app.function_name(name="tally_quiz_answers")
+@app.schedule(schedule="0 30 13 * * *", arg_name="mytimer", run_on_startup=False, use_monitor=True)
+def tally_quiz_answers(mytimer: func.TimerRequest):
+    """
+        Azure Function that runs every day at 1:30 PM UTC, just before the post.
+        Reads new comments on the posts from the last QUIZ_TALLY_DAYS days and
+        updates their answer counts, so today's post can show how yesterday went.
+        Every QUIZ_TRACKS track has its own tallies (quiz_store.track_blob).
+    """
+    logging.info("✅ tally_quiz_answers triggered")
+    from deadline import Deadline
+    deadline = Deadline.from_env()
+    try:
+        logging.info("⏱️ Start-up: %s", warmup.invocation_attributes())
+        ACCESS_TOKEN = os.getenv("ACCESS_TOKEN", "")
+        if not ACCESS_TOKEN:
+            raise RuntimeError("ACCESS_TOKEN missing")
+        QUIZ_DIFFICULTY = os.getenv("QUIZ_DIFFICULTY", "beginner")
 
-        status = getattr(resp, "status_code", None)
-        body_preview = getattr(resp, "text", "")[:500]
+        from answer_tally import REFRESH_DAYS, accuracy, refresh_tallies
+        from new_post import DEFAULT_BLOB, DEFAULT_CONTAINER
+        from quiz_store import track_blob
 
-        if status and 200 <= status < 300:
+        for track in _quiz_tracks(QUIZ_DIFFICULTY):
             try:
-                urn = resp.json().get("id")
-                post_url = f"https://www.linkedin.com/feed/update/{urn}" if urn else "(no id in response)"
-                logging.info("🎉 LinkedIn post succeeded (%s). URL: %s | Body: %s", status, post_url, body_preview)
+                refreshed = refresh_tallies(
+                    ACCESS_TOKEN, DEFAULT_CONTAINER, track_blob(DEFAULT_BLOB, track, QUIZ_DIFFICULTY),
+                    days=int(os.getenv("QUIZ_TALLY_DAYS", str(REFRESH_DAYS))),
+                    deadline=deadline,
+                )
             except Exception as e:
-                logging.info("🎉 LinkedIn post succeeded (%s). Body: %s (URL parse failed: %s)", status, body_preview, e)
-        else:
-            logging.error("❌ LinkedIn post failed (%s). Body: %s", status, body_preview)
-
+                logging.exception("🚨 tally_quiz_answers failed for the %s track: %s", track, e)
+                continue
+            for day, tally in sorted(refreshed.items()):
+                total, share = accuracy(tally)
+                logging.info("📊 %s %s: %s answer(s), %s correct", track, day, total,
+                             "n/a" if share is None else f"{share:.0%}")
     except Exception as e:
-        logging.exception("🚨 post_daily_quiz failed: %s", e)
+        logging.exception("🚨 tally_quiz_answers failed: %s", e)
+    finally:
+        _log_http_metrics()
@@ -0,0 +1,32 @@
+import difflib
+import os
+
+# ISS_Tracker and LinkedIn_Daily_Quiz each deploy their own copy of http_client.py;
+# this fails as soon as the two drift apart:
+#     python http_client_local_test.py
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+COPIES = [
+    os.path.join(HERE, "http_client.py"),
+    os.path.join(HERE, os.pardir, "ISS_Tracker", "http_client.py"),
+]
+
+
+def check_copies_identical():
+    texts = []
+    for path in COPIES:
+        with open(path, "r", encoding="utf-8") as f:
+            texts.append(f.read())
+    diff = list(difflib.unified_diff(texts[0].splitlines(), texts[1].splitlines(),
+                                     "LinkedIn_Daily_Quiz/http_client.py", "ISS_Tracker/http_client.py",
+                                     lineterm=""))
+    assert not diff, "http_client.py copies differ:\n" + "\n".join(diff[:40])
+    print("http_client.py copies identical: OK")
+
+
+def main():
+    check_copies_identical()
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,8 @@ except ImportError:
 
 import new_post as new
 import send_it as send
+from openai_prompt import STATS as OPENAI_STATS
+from response_cache import default_cache
 
 HERE = os.path.dirname(os.path.abspath(__file__))
 QUESTIONS_PATH = os.path.join(HERE, "questions.json")
@@ -115,6 +117,11 @@ def main():
     except Exception as e:
         print(f"Failed to parse LinkedIn response JSON: {e}")
 
+    cache = default_cache()
+    if cache is not None:
+        print(f"OpenAI response cache: {cache.stats()}")
+    print(f"OpenAI calls: {OPENAI_STATS.snapshot()}")
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
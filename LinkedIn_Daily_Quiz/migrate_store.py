@@ -0,0 +1,80 @@
+import argparse
+from datetime import date, timedelta
+
+from quiz_store import (
+    append_questions_sharded,
+    latest_name,
+    list_blobs,
+    load_questions,
+    rebuild_archive_index,
+    rebuild_dedupe_index,
+    _shard_prefix,
+)
+
+DEFAULT_CONTAINER = "quizdata"
+DEFAULT_BLOB = "questions.json"
+
+
+def _default_topic(the_date):
+    """
+        Topic the daily run uses for a date with the default topic rotation;
+        legacy records were stored without one.
+    """
+    from new_post import DEFAULT_TOPICS, _topic_for_day
+    return _topic_for_day(the_date.toordinal(), DEFAULT_TOPICS)
+
+
+def migrate(container, blob, last_date, dry_run=False):
+    """
+        Convert the legacy single-list blob into monthly JSONL shards + latest pointer.
+        The legacy list has no dates, so items are assumed to be one per day with
+        the last item posted on `last_date`. The legacy blob is left untouched.
+        Returns the number of records written.
+    """
+    existing = [name for name, _ in list_blobs(container, _shard_prefix(blob))]
+    if existing:
+        raise RuntimeError(
+            f"{_shard_prefix(blob)} already has {len(existing)} blob(s); refusing to migrate twice"
+        )
+
+    items = load_questions(container, blob)
+    first = last_date - timedelta(days=len(items) - 1)
+    dated = [(first + timedelta(days=i), item) for i, item in enumerate(items)]
+
+    if dry_run:
+        shards = sorted({f"{d:%Y-%m}" for d, _ in dated})
+        print(f"Would write {len(dated)} record(s) into {len(shards)} shard(s): {', '.join(shards)}")
+        return 0
+
+    append_questions_sharded(container, blob, dated)
+    # Re-index so legacy records get their (inferred) topic in the archive index
+    rebuild_archive_index(container, blob, topic_for=_default_topic)
+    print(f"Wrote {len(dated)} record(s); latest pointer at {latest_name(blob)}")
+    return len(dated)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate questions.json to the sharded layout")
+    parser.add_argument("--container", default=DEFAULT_CONTAINER)
+    parser.add_argument("--blob", default=DEFAULT_BLOB)
+    parser.add_argument("--last-date", type=date.fromisoformat, default=date.today(),
+                        help="date the newest legacy question was posted (YYYY-MM-DD)")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--rebuild-dedupe", action="store_true",
+                        help="only rebuild the near-duplicate index from the existing shards")
+    parser.add_argument("--rebuild-index", action="store_true",
+                        help="only rebuild the date/topic/difficulty archive index from the existing shards")
+    args = parser.parse_args()
+    if args.rebuild_dedupe:
+        count = rebuild_dedupe_index(args.container, args.blob)
+        print(f"Indexed {count} record(s)")
+        return
+    if args.rebuild_index:
+        count = rebuild_archive_index(args.container, args.blob, topic_for=_default_topic)
+        print(f"Indexed {count} record(s)")
+        return
+    migrate(args.container, args.blob, args.last_date, dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
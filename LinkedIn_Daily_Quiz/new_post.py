@@ -1,8 +1,17 @@
-from datetime import datetime, timedelta
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
 from zoneinfo import ZoneInfo
 
+import tracing
+from answer_tally import load_tallies, register_post, summary_line
+from deadline import WRITE_RESERVE, as_deadline
 from openai_prompt import OpenAIPrompt
-from quiz_store import load_questions, append_question
+from quiz_store import (load_questions, load_latest, append_questions_sharded, load_dedupe_index,
+                        stored_dates, track_blob)
+from dedupe_index import DEFAULT_THRESHOLD as DEDUPE_THRESHOLD
+from question_queue import (DEFAULT_QUEUE_BLOB, DEFAULT_QUEUE_DAYS, DEFAULT_MAX_WORKERS,
+                            dequeue_question, fill_queue, load_queue)
 
 OPENAI_MODEL = "gpt-5"
 
@@ -29,6 +38,55 @@ DEFAULT_TOPICS = [
 
 CHOICE_LABELS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
 
+# Structured-output schema for one question (strict mode: every field required, no extras)
+QUIZ_SCHEMA = {
+    "name": "quiz_question",
+    "schema": {
+        "type": "object",
+        "properties": {
+            "question": {"type": "string"},
+            "choices": {"type": "array", "items": {"type": "string"}},
+            "answer": {"type": "string"},
+            "explanation": {"type": "string"},
+        },
+        "required": ["question", "choices", "answer", "explanation"],
+        "additionalProperties": False,
+    },
+}
+
+# Multi-track posts: one model request returns a question per (track, topic) slot
+DEFAULT_TRACKS = ["beginner", "intermediate", "advanced"]
+QUIZ_BATCH_SCHEMA = {
+    "name": "quiz_batch",
+    "schema": {
+        "type": "object",
+        "properties": {
+            "questions": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "slot": {"type": "integer"},
+                        **QUIZ_SCHEMA["schema"]["properties"],
+                    },
+                    "required": ["slot"] + QUIZ_SCHEMA["schema"]["required"],
+                    "additionalProperties": False,
+                },
+            },
+        },
+        "required": ["questions"],
+        "additionalProperties": False,
+    },
+}
+QUIZ_CHOICES = 4
+
+# Near-duplicate retries: each retry uses a new seed and asks for a less common angle
+MAX_DEDUPE_ATTEMPTS = 3
+DEDUPE_SEED_STEP = 100_003
+
+# Catch-up: how far back a past-due run looks for days with no stored question
+BACKFILL_MAX_DAYS = 14
+
 # --- Format questions and answers for LinkedIn posts ---
 
 def _indent_code_block(code):
@@ -141,6 +199,25 @@ def _validate_quiz(d):
     return d
 
 
+def _quiz_problems(d):
+    """
+        Why a generated question can't be posted as-is (empty list if it can).
+        Stricter than _validate_quiz, which would quietly pick the first choice
+        when the answer matches none of them.
+    """
+    problems = []
+    if not str(d.get("question", "")).strip():
+        problems.append("question is empty")
+    choices = [str(c).strip() for c in d.get("choices") or []]
+    if len(choices) != QUIZ_CHOICES:
+        problems.append(f"has {len(choices)} choices instead of {QUIZ_CHOICES}")
+    elif len(set(choices)) != len(choices):
+        problems.append("choices repeat")
+    if str(d.get("answer", "")).strip() not in choices:
+        problems.append("answer is not one of the choices")
+    return problems
+
+
 def _generate_quiz_question(
     *,
     seed,
@@ -148,6 +225,8 @@ def _generate_quiz_question(
     difficulty="beginner",
     api_key=None,
     model=OPENAI_MODEL,
+    avoid_repeats=False,
+    deadline=None,
 ):
     """
         Use OpenAI to generate a single quiz question
@@ -163,12 +242,19 @@ def _generate_quiz_question(
         "- The 'answer' value must exactly match one item in 'choices'."
     )
     user_prompt = f"Generate one {difficulty} multiple-choice Python question on the topic: {topic}."
+    if avoid_repeats:
+        user_prompt += (
+            " A very similar question was already posted, so pick a less common"
+            " sub-concept of this topic and avoid the textbook example."
+        )
 
     prompt_client = OpenAIPrompt(api_key=api_key, model=model)
     data = prompt_client.generate_json(
         system_prompt=system_prompt,
         user_prompt=user_prompt,
         seed=seed,
+        schema=QUIZ_SCHEMA,
+        deadline=deadline,
     )
 
     data = _validate_quiz(data or {})
@@ -184,69 +270,379 @@ def _question_for_date(
     difficulty,
     api_key=None,
     model=OPENAI_MODEL,
+    dedupe=None,
+    threshold=DEDUPE_THRESHOLD,
+    deadline=None,
+    first_attempt=0,
 ):
     """
-        Generate a question for a specific date
+        Generate a question for a specific date.
+        If a dedupe index is given, candidates too similar to a stored question
+        are rejected and regenerated (up to MAX_DEDUPE_ATTEMPTS); the last
+        candidate is used if every attempt is a near-duplicate, or if the
+        deadline has run out before another attempt.
+        `first_attempt` > 0 skips the plain first try (already known to repeat).
+    """
+    deadline = as_deadline(deadline)
+    with tracing.span("daily.question_for_date", date=the_date.isoformat()) as span:
+        date_ordinal = the_date.toordinal()
+        topic = _topic_for_day(date_ordinal, topics)
+        question = None
+        for attempt in range(first_attempt, MAX_DEDUPE_ATTEMPTS):
+            span.set_attribute("generation_attempts", attempt + 1)
+            if question is not None and deadline.expired():
+                logging.warning("No time left to regenerate the question for %s; keeping it", the_date)
+                break
+            question = _generate_quiz_question(
+                seed=date_ordinal + attempt * DEDUPE_SEED_STEP,
+                topic=topic,
+                difficulty=difficulty,
+                api_key=api_key,
+                model=model,
+                avoid_repeats=attempt > 0,
+                deadline=deadline,
+            )
+            # Stored with the record so the archive index can look questions up by topic/difficulty
+            question["topic"] = topic
+            question["difficulty"] = difficulty
+            if dedupe is None:
+                return question
+            matches = dedupe.query(question, threshold)
+            if not matches:
+                return question
+            logging.warning("Question for %s is %.0f%% similar to %s; regenerating",
+                            the_date, matches[0][1] * 100, matches[0][0])
+        return question
+
+
+def _track_topics(the_date, tracks, topics):
+    """
+        {track: topic} for a date. Track i gets the topic i days ahead of the rotation,
+        so tracks posted together cover different topics and the first track keeps
+        the same topic a single-track run would use.
     """
     date_ordinal = the_date.toordinal()
-    topic = _topic_for_day(date_ordinal, topics)
-    return _generate_quiz_question(
-        seed=date_ordinal,
-        topic=topic,
-        difficulty=difficulty,
-        api_key=api_key,
-        model=model,
-    )
+    return {track: _topic_for_day(date_ordinal + i, topics) for i, track in enumerate(tracks)}
 
 
-# --- Main function: put everything together for the LinkedIn post ---
+def _generate_quiz_batch(slots, *, seed, api_key=None, model=OPENAI_MODEL, deadline=None):
+    """
+        Generate several questions with one model request.
+        - `slots` is a list of (difficulty, topic); returns questions in the same order.
+        - Each returned item is checked on its own (_quiz_problems, then _validate_quiz).
+        - Slots the batch missed or got wrong are generated individually, in
+          parallel, so one bad item doesn't cost a second batch round-trip.
+    """
+    deadline = as_deadline(deadline)
+    with tracing.span("daily.generate_batch", slots=len(slots), model=model) as span:
+        numbered = "\n".join(
+            f"#{i} difficulty={difficulty}; topic={topic}" for i, (difficulty, topic) in enumerate(slots, 1)
+        )
+        system_prompt = (
+            "You are a precise Python quiz generator. Output one question per slot.\n"
+            "- Prefer practical, bite-sized concepts (no trick questions).\n"
+            "- Match each slot's difficulty and topic; questions must not overlap.\n"
+            "- Include 4 multiple-choice options; ensure exactly one correct answer.\n"
+            "- Keep each question under 280 characters if possible.\n"
+            "- Choices must be ONE LINE each (no newlines) and MUST NOT include letters like 'A.'; "
+            "just the option text. We'll label them later.\n"
+            "- Return ONLY valid JSON: {\"questions\": [...]}, each item with fields slot (the slot "
+            "number), question, choices (exactly 4), answer, explanation.\n"
+            "- Each 'answer' value must exactly match one item in its 'choices'."
+        )
+        user_prompt = f"Generate {len(slots)} multiple-choice Python questions, one for each slot:\n{numbered}"
+
+        items = {}
+        try:
+            data = OpenAIPrompt(api_key=api_key, model=model).generate_json(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                seed=seed,
+                schema=QUIZ_BATCH_SCHEMA,
+                deadline=deadline,
+            )
+            for item in (data or {}).get("questions") or []:
+                if isinstance(item, dict) and isinstance(item.get("slot"), int):
+                    items.setdefault(item.pop("slot"), item)
+        except Exception as e:
+            logging.warning("Batch generation failed, generating each question on its own: %s", e)
+
+        questions, redo = [None] * len(slots), []
+        for i, (difficulty, topic) in enumerate(slots):
+            item = items.get(i + 1)
+            problems = _quiz_problems(item) if item else ["missing from the batch"]
+            if problems:
+                logging.warning("Batch slot %s (%s, %s) %s; regenerating it",
+                                i + 1, difficulty, topic, ", ".join(problems))
+                redo.append(i)
+            else:
+                questions[i] = _validate_quiz(item)
+        span.set_attributes({"batch_ok": len(slots) - len(redo), "regenerated": len(redo)})
+
+        if redo:
+            with ThreadPoolExecutor(max_workers=len(redo)) as pool:
+                futures = {
+                    i: pool.submit(
+                        tracing.bind(_generate_quiz_question), seed=seed + i + 1, topic=slots[i][1],
+                        difficulty=slots[i][0], api_key=api_key, model=model, deadline=deadline,
+                    )
+                    for i in redo
+                }
+                for i, fut in futures.items():
+                    questions[i] = fut.result()
+        for question, (difficulty, topic) in zip(questions, slots):
+            question["topic"] = topic
+            question["difficulty"] = difficulty
+        return questions
+
+
+def questions_for_tracks(
+    the_date,
+    slots,
+    *,
+    api_key=None,
+    model=OPENAI_MODEL,
+    dedupes=None,
+    threshold=DEDUPE_THRESHOLD,
+    deadline=None,
+):
+    """
+        Questions for several tracks on one date with a single batched request.
+        - `slots` maps track (difficulty) -> topic, see _track_topics.
+        - `dedupes` maps track -> that track's dedupe index; a near-duplicate is
+          regenerated on its own through _question_for_date, skipping the plain retry.
+        Returns {track: question}.
+    """
+    deadline = as_deadline(deadline)
+    dedupes = dedupes or {}
+    with tracing.span("daily.questions_for_tracks", date=the_date.isoformat(), tracks=len(slots)) as span:
+        tracks = list(slots)
+        batch = _generate_quiz_batch([(t, slots[t]) for t in tracks], seed=the_date.toordinal(),
+                                     api_key=api_key, model=model, deadline=deadline)
+        result = dict(zip(tracks, batch))
+
+        repeats = []
+        for track, question in result.items():
+            matches = dedupes[track].query(question, threshold) if dedupes.get(track) is not None else []
+            if matches:
+                logging.warning("%s question for %s is %.0f%% similar to %s; regenerating",
+                                track, the_date, matches[0][1] * 100, matches[0][0])
+                repeats.append(track)
+        span.set_attribute("near_duplicates", len(repeats))
+        if repeats and not deadline.expired():
+            with ThreadPoolExecutor(max_workers=len(repeats)) as pool:
+                futures = {
+                    track: pool.submit(
+                        tracing.bind(_question_for_date), the_date, topics=[slots[track]], difficulty=track,
+                        api_key=api_key, model=model, dedupe=dedupes[track], threshold=threshold,
+                        deadline=deadline, first_attempt=1,
+                    )
+                    for track in repeats
+                }
+                for track, fut in futures.items():
+                    result[track] = fut.result()
+        return result
+
+
+def _load_dedupe(container, blob):
+    """
+        Load the near-duplicate index; None (no checking) if it can't be read
+    """
+    try:
+        return load_dedupe_index(container, blob)
+    except Exception as e:
+        logging.warning("Dedupe index unavailable: %s", e)
+        return None
 
-def build_daily_message(
+
+def _local_today(tz):
+    """
+        Today's date in the given timezone (UTC if the zone name is invalid)
+    """
+    try:
+        return datetime.now(ZoneInfo(tz)).date()
+    except Exception:
+        from datetime import datetime as _dt
+        return _dt.utcnow().date()
+
+
+# --- Pre-generate upcoming questions so the daily post doesn't wait on OpenAI ---
+
+def prefill_question_queue(
     *,
     tz="UTC",
     topics=None,
     difficulty="beginner",
+    days=DEFAULT_QUEUE_DAYS,
     offset_days=0,
+    max_workers=DEFAULT_MAX_WORKERS,
     api_key=None,
     model=OPENAI_MODEL,
     container=DEFAULT_CONTAINER,
     blob=DEFAULT_BLOB,
+    queue_blob=DEFAULT_QUEUE_BLOB,
+    deadline=None,
 ):
     """
-        Build the LinkedIn post content, show yesterday’s answer,
-        generate today’s question, and save it
+        Generate questions for the next `days` post dates in parallel and queue them.
+        Each question goes through the same _question_for_date/_validate_quiz path
+        as a live run, so the daily trigger can post it as-is.
+        Generation stops WRITE_RESERVE seconds before the deadline so the queue save fits.
+        Returns the dates that were added.
     """
+    deadline = as_deadline(deadline)
+    gen_deadline = deadline.reserve(WRITE_RESERVE)
     topics = topics or DEFAULT_TOPICS
+    first = _local_today(tz) + timedelta(days=offset_days + 1)
+    dates = [first + timedelta(days=i) for i in range(days)]
 
-    try:
-        base_date = datetime.now(ZoneInfo(tz)).date()
-    except Exception:
-        from datetime import datetime as _dt
-        base_date = _dt.utcnow().date()
+    dedupe = _load_dedupe(container, blob)
 
-    target_date = base_date + timedelta(days=offset_days)
+    def _generate(the_date):
+        return _question_for_date(
+            the_date, topics=topics, difficulty=difficulty, api_key=api_key, model=model,
+            dedupe=dedupe, deadline=gen_deadline,
+        )
 
-    # 1) Load yesterday from blob (last saved entry)
-    all_items = load_questions(container, blob)
-    if all_items:
-        yesterday_entry = all_items[-1]
-    else:
-        yesterday_entry = {"question": "", "choices": [], "answer": "—", "explanation": ""}
+    return fill_queue(container, dates, _generate, difficulty,
+                      max_workers=max_workers, queue_blob=queue_blob, deadline=deadline)
 
-    # 2) Generate today's question
-    today_q = _question_for_date(
-        target_date, topics=topics, difficulty=difficulty, api_key=api_key, model=model
-    )
 
-    # 3) Append today's question to storage
-    append_question(container, blob, today_q)
+# --- Catch up on days a late or failed run never stored ---
+
+def missing_dates(container, blob, target_date, max_days=BACKFILL_MAX_DAYS):
+    """
+        Days before `target_date` (at most `max_days` back) with no stored question.
+        Only gaps after the first stored day in that window count (or after the
+        latest record, if it is older), so days before the quiz started aren't filled.
+    """
+    if max_days <= 0:
+        return []
+    latest = load_latest(container, blob)
+    if not latest or not latest.get("date"):
+        return []
+    first = target_date - timedelta(days=max_days)
+    last = target_date - timedelta(days=1)
+    stored = stored_dates(container, blob, first, last)
+    anchor = min(stored) if stored else date.fromisoformat(latest["date"])
+    start = max(first, anchor + timedelta(days=1))
+    days = (start + timedelta(days=i) for i in range((last - start).days + 1))
+    return [d for d in days if d not in stored]
+
+
+def _backfill_questions(target_date, *, topics, difficulty, max_days, max_workers, api_key, model,
+                        container, blob, queue_blob, deadline):
+    """
+        Questions for missed days before `target_date`, as (date, question) pairs in date order.
+        - A question still waiting in the queue for that day is used as-is.
+        - The rest are generated up to `max_workers` at a time; each day keeps its
+          toordinal() seed, so a re-run asks the model for the same questions.
+        - A day that fails or runs out of time is logged and skipped; the next
+          past-due run picks it up again.
+    """
+    with tracing.span("daily.backfill", target_date=target_date.isoformat()) as span:
+        missing = missing_dates(container, blob, target_date, max_days)
+        span.set_attribute("missing_days", len(missing))
+        if not missing:
+            return []
+        logging.warning("Backfilling %s missed day(s): %s", len(missing), ", ".join(d.isoformat() for d in missing))
+
+        try:
+            queue = load_queue(container, queue_blob)
+        except Exception as e:
+            logging.warning("Question queue unavailable for backfill: %s", e)
+            queue = {}
+
+        pairs, todo = [], []
+        for d in missing:
+            entry = queue.get(d.isoformat())
+            if entry and entry.get("difficulty") == difficulty:
+                pairs.append((d, entry["question"]))
+            else:
+                todo.append(d)
+
+        if todo:
+            dedupe = _load_dedupe(container, blob)
+            gen_deadline = deadline.reserve(WRITE_RESERVE)
+            with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+                futures = {
+                    pool.submit(
+                        tracing.bind(_question_for_date), d, topics=topics, difficulty=difficulty,
+                        api_key=api_key, model=model, dedupe=dedupe, deadline=gen_deadline,
+                    ): d
+                    for d in todo
+                }
+                for fut in as_completed(futures):
+                    try:
+                        pairs.append((futures[fut], fut.result()))
+                    except Exception as e:
+                        logging.warning("Backfill failed for %s: %s", futures[fut], e)
+
+        return sorted(pairs, key=lambda p: p[0])
+
+
+# --- Main function: put everything together for the LinkedIn post ---
+
+EMPTY_ENTRY = {"question": "", "choices": [], "answer": "—", "explanation": ""}
+
 
-    # 4) Build message
+def _load_yesterday(container, blob):
+    """
+        Yesterday's entry from the small latest pointer (legacy single blob until migrated)
+    """
+    with tracing.span("daily.load_yesterday") as span:
+        entry = load_latest(container, blob)
+        span.set_attribute("source", "latest")
+        if entry is None:
+            span.set_attribute("source", "legacy")
+            all_items = load_questions(container, blob)
+            entry = all_items[-1] if all_items else None
+        return entry or dict(EMPTY_ENTRY)
+
+
+def _todays_question(target_date, *, topics, difficulty, api_key, model, container, blob, queue_blob,
+                     deadline):
+    """
+        Today's pre-generated question; only call OpenAI if the queue has none.
+        Live generation must finish WRITE_RESERVE seconds before the deadline.
+    """
+    with tracing.span("daily.todays_question", date=target_date.isoformat(), model=model) as span:
+        try:
+            today_q = dequeue_question(container, target_date, difficulty, queue_blob)
+        except Exception as e:
+            logging.warning("Question queue unavailable, generating live: %s", e)
+            today_q = None
+        span.set_attribute("source", "queue" if today_q is not None else "live")
+        if today_q is None:
+            today_q = _question_for_date(
+                target_date, topics=topics, difficulty=difficulty, api_key=api_key, model=model,
+                dedupe=_load_dedupe(container, blob), deadline=deadline.reserve(WRITE_RESERVE),
+            )
+        return today_q
+
+
+def _load_tallies(container, blob):
+    """
+        Answer tallies for recent posts ({} if they can't be read; the post doesn't need them)
+    """
+    try:
+        return load_tallies(container, blob)
+    except Exception as e:
+        logging.warning("Answer tallies unavailable: %s", e)
+        return {}
+
+
+def _compose_message(yesterday_entry, today_q, tally=None, track=None):
     divider = "—" * 24
-    message = (
-        "📌 Daily Python Quiz\n\n"
+    title = f"Daily Python Quiz · {track.title()}" if track else "Daily Python Quiz"
+    stats = summary_line(tally)
+    if stats:
+        stats += "\n"
+    return (
+        f"📌 {title}\n\n"
         "✅ Yesterday's Answer:\n"
-        f"{_answer_letter_first(yesterday_entry)}\n\n"
+        f"{_answer_letter_first(yesterday_entry)}\n"
+        f"{stats}\n"
         f"{divider}\n\n"
         "💡 Today's Question:\n"
         f"{_format_question(today_q)}\n\n"
@@ -254,4 +650,254 @@ def build_daily_message(
         "#Python #Quiz #OpenAI\n"
         "This is programmatically run post daily using OpenAI's API and Azure."
     )
-    return message
\ No newline at end of file
+
+
+def _prepare_daily(*, tz, topics, difficulty, offset_days, api_key, model, container, blob, queue_blob,
+                   deadline, backfill_days=0, max_workers=DEFAULT_MAX_WORKERS):
+    """
+        Stage 1 of the daily run: read yesterday and get today's question at the same time.
+        The blob read and the model call don't depend on each other, so the stage
+        takes as long as the slower of the two. With `backfill_days`, missed days are
+        generated alongside them.
+        Returns (message, dated_items, target_date); dated_items holds the backfilled
+        (date, question) pairs followed by today's, ready for one batched append.
+    """
+    topics = topics or DEFAULT_TOPICS
+    target_date = _local_today(tz) + timedelta(days=offset_days)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        yesterday_fut = pool.submit(tracing.bind(_load_yesterday), container, blob)
+        tallies_fut = pool.submit(tracing.bind(_load_tallies), container, blob)
+        today_fut = pool.submit(
+            tracing.bind(_todays_question), target_date, topics=topics, difficulty=difficulty,
+            api_key=api_key, model=model, container=container, blob=blob, queue_blob=queue_blob,
+            deadline=deadline,
+        )
+        backfill_fut = None
+        if backfill_days:
+            backfill_fut = pool.submit(
+                tracing.bind(_backfill_questions), target_date, topics=topics, difficulty=difficulty,
+                max_days=backfill_days, max_workers=max_workers, api_key=api_key, model=model,
+                container=container, blob=blob, queue_blob=queue_blob, deadline=deadline,
+            )
+        yesterday_entry = yesterday_fut.result()
+        tally = tallies_fut.result().get(yesterday_entry.get("date"))
+        today_q = today_fut.result()
+        backfilled = []
+        if backfill_fut is not None:
+            # Catching up must never stop today's post
+            try:
+                backfilled = backfill_fut.result()
+            except Exception as e:
+                logging.warning("Backfill skipped: %s", e)
+
+    dated_items = backfilled + [(target_date, today_q)]
+    return _compose_message(yesterday_entry, today_q, tally), dated_items, target_date
+
+
+def build_daily_message(
+    *,
+    tz="UTC",
+    topics=None,
+    difficulty="beginner",
+    offset_days=0,
+    api_key=None,
+    model=OPENAI_MODEL,
+    container=DEFAULT_CONTAINER,
+    blob=DEFAULT_BLOB,
+    queue_blob=DEFAULT_QUEUE_BLOB,
+    deadline=None,
+    backfill_days=0,
+    max_workers=DEFAULT_MAX_WORKERS,
+):
+    """
+        Build the LinkedIn post content, show yesterday’s answer,
+        take today’s question from the queue (or generate it), and save it.
+        `deadline` (deadline.Deadline) bounds every retry and model call on the way.
+        `backfill_days` > 0 also fills missed days in that window (see run_daily_quiz).
+    """
+    deadline = as_deadline(deadline)
+    message, dated_items, _ = _prepare_daily(
+        tz=tz, topics=topics, difficulty=difficulty, offset_days=offset_days, api_key=api_key,
+        model=model, container=container, blob=blob, queue_blob=queue_blob, deadline=deadline,
+        backfill_days=backfill_days, max_workers=max_workers,
+    )
+    append_questions_sharded(container, blob, dated_items, deadline=deadline)
+    return message
+
+
+def _posted_urn(result):
+    """
+        URN of the post `publish` created: from a requests.Response, or the first
+        successful one in a post_many result ({author: response or exception}).
+    """
+    if isinstance(result, dict):
+        return next(filter(None, map(_posted_urn, result.values())), None)
+    if not 200 <= getattr(result, "status_code", 0) < 300:
+        return None
+    try:
+        urn = (result.json() or {}).get("id")
+    except ValueError:
+        urn = None
+    return urn or result.headers.get("X-RestLi-Id") or result.headers.get("x-restli-id")
+
+
+def _track_answers(result, container, blob, target_date, today_q, deadline):
+    """
+        Register today's post for answer tallying; never fails the run.
+    """
+    urn = _posted_urn(result)
+    if not urn:
+        return
+    try:
+        register_post(container, blob, target_date, urn, today_q, deadline=deadline)
+    except Exception as e:
+        logging.warning("Could not register %s for answer tallies: %s", urn, e)
+
+
+def run_daily_quiz(
+    publish,
+    *,
+    tz="UTC",
+    topics=None,
+    difficulty="beginner",
+    offset_days=0,
+    api_key=None,
+    model=OPENAI_MODEL,
+    container=DEFAULT_CONTAINER,
+    blob=DEFAULT_BLOB,
+    queue_blob=DEFAULT_QUEUE_BLOB,
+    deadline=None,
+    backfill_days=0,
+    max_workers=DEFAULT_MAX_WORKERS,
+):
+    """
+        The whole daily run as a pipeline; returns (message, publish result).
+        1. Yesterday's entry and today's question are fetched in parallel.
+        2. Saving today's question and `publish(message)` (the LinkedIn post) then
+           run in parallel too. Both start only once the message exists, and the
+           save always starts after yesterday was read, so the latest pointer can't
+           be moved before it is used.
+        3. Waits for both. A failed save is raised after the post has finished,
+           so a post is never cut off half-way.
+        4. A successful post is registered in the answer tallies (answer_tally.py),
+           whose counts go into tomorrow's "Yesterday's Answer".
+        Generation leaves WRITE_RESERVE seconds of `deadline` for stage 2; pass the
+        same deadline to whatever `publish` calls (e.g. post_text_update).
+        Catch-up mode (`backfill_days` > 0, used when the timer is past due): days in
+        that window with no stored question are generated in stage 1 too (up to
+        `max_workers` at a time) and saved in the same batch as today's question.
+        Only today's question is posted; yesterday's answer is still the last one posted.
+    """
+    deadline = as_deadline(deadline)
+    message, dated_items, target_date = _prepare_daily(
+        tz=tz, topics=topics, difficulty=difficulty, offset_days=offset_days, api_key=api_key,
+        model=model, container=container, blob=blob, queue_blob=queue_blob, deadline=deadline,
+        backfill_days=backfill_days, max_workers=max_workers,
+    )
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        append_fut = pool.submit(tracing.bind(append_questions_sharded), container, blob, dated_items,
+                                 deadline=deadline)
+        publish_fut = pool.submit(tracing.bind(publish), message)
+        try:
+            result = publish_fut.result()
+        finally:
+            append_fut.result()
+    _track_answers(result, container, blob, target_date, dated_items[-1][1], deadline)
+    return message, result
+
+
+# --- Several difficulty tracks, each with its own history and post ---
+
+def _dequeue_for_track(container, target_date, track, queue_blob):
+    try:
+        return dequeue_question(container, target_date, track, queue_blob)
+    except Exception as e:
+        logging.warning("Question queue for %s unavailable, generating live: %s", track, e)
+        return None
+
+
+def run_daily_tracks(
+    publishers,
+    *,
+    tz="UTC",
+    topics=None,
+    primary=None,
+    offset_days=0,
+    api_key=None,
+    model=OPENAI_MODEL,
+    container=DEFAULT_CONTAINER,
+    blob=DEFAULT_BLOB,
+    queue_blob=DEFAULT_QUEUE_BLOB,
+    deadline=None,
+):
+    """
+        run_daily_quiz for several difficulty tracks at once; returns {track: (message, publish result)}.
+        - `publishers` maps track -> publish(message), e.g. a post to that track's page.
+        - Every track has its own history, latest pointer, dedupe index, queue and
+          tallies: `blob`/`queue_blob` for the `primary` track, "<name>-<track>.json" for
+          the others (quiz_store.track_blob).
+        - Yesterday, tallies, queue and dedupe reads for all tracks run in parallel.
+        - Tracks with nothing queued get their questions from ONE batched model
+          request (questions_for_tracks), so adding a track adds output tokens,
+          not another round-trip.
+        - Saves and posts then run in parallel; a failed save or post in one track
+          is raised after every track has finished.
+    """
+    deadline = as_deadline(deadline)
+    topics = topics or DEFAULT_TOPICS
+    tracks = list(publishers)
+    target_date = _local_today(tz) + timedelta(days=offset_days)
+    blobs = {t: track_blob(blob, t, primary) for t in tracks}
+    queues = {t: track_blob(queue_blob, t, primary) for t in tracks}
+
+    with tracing.span("daily.tracks", date=target_date.isoformat(), tracks=len(tracks)) as span:
+        with ThreadPoolExecutor(max_workers=max(1, 4 * len(tracks))) as pool:
+            reads = {
+                t: [
+                    pool.submit(tracing.bind(_load_yesterday), container, blobs[t]),
+                    pool.submit(tracing.bind(_load_tallies), container, blobs[t]),
+                    pool.submit(tracing.bind(_dequeue_for_track), container, target_date, t, queues[t]),
+                    pool.submit(tracing.bind(_load_dedupe), container, blobs[t]),
+                ]
+                for t in tracks
+            }
+            yesterday, tallies, queued, dedupes = (
+                {t: futs[k].result() for t, futs in reads.items()} for k in range(4)
+            )
+
+        todo = {t: topic for t, topic in _track_topics(target_date, tracks, topics).items() if queued[t] is None}
+        span.set_attributes({"queued": len(tracks) - len(todo), "generated": len(todo)})
+        today = dict(queued)
+        if todo:
+            today.update(questions_for_tracks(
+                target_date, todo, api_key=api_key, model=model,
+                dedupes={t: dedupes[t] for t in todo}, deadline=deadline.reserve(WRITE_RESERVE),
+            ))
+
+        messages = {
+            t: _compose_message(yesterday[t], today[t], tallies[t].get(yesterday[t].get("date")), track=t)
+            for t in tracks
+        }
+        with ThreadPoolExecutor(max_workers=2 * len(tracks)) as pool:
+            appends = {t: pool.submit(tracing.bind(append_questions_sharded), container, blobs[t],
+                                      [(target_date, today[t])], deadline=deadline) for t in tracks}
+            posts = {t: pool.submit(tracing.bind(publishers[t]), messages[t]) for t in tracks}
+            results, errors = {}, []
+            for t in tracks:
+                try:
+                    results[t] = posts[t].result()
+                except Exception as e:
+                    logging.error("Posting the %s track failed: %s", t, e)
+                    errors.append(e)
+                try:
+                    appends[t].result()
+                except Exception as e:
+                    logging.error("Saving the %s track failed: %s", t, e)
+                    errors.append(e)
+        for t, result in results.items():
+            _track_answers(result, container, blobs[t], target_date, today[t], deadline)
+        if errors:
+            raise errors[0]
+        return {t: (messages[t], results.get(t)) for t in tracks}
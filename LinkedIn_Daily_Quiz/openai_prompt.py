@@ -1,38 +1,185 @@
-from openai import OpenAI
 import json
+import logging
 import os
+import re
+import threading
+import time
+
+import tracing
+from deadline import as_deadline
+from response_cache import default_cache, request_key
+
+# Longest a single model call may take (further capped by the run's deadline)
+OPENAI_TIMEOUT = 120
+
+# One client (and connection pool) per API key for the whole process
+_clients = {}
+_clients_lock = threading.Lock()
+
+_FENCE = re.compile(r"^\s*```[a-zA-Z]*\s*|\s*```\s*$")
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+_JSON_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool,
+    "null": type(None),
+}
+
+
+def shared_client(api_key=None):
+    """
+        Process-wide OpenAI client for this API key (created on first use).
+        Raises an error if no key is given and OPENAI_API_KEY isn't set.
+    """
+    key = api_key or os.environ.get("OPENAI_API_KEY")
+    if not key:
+        raise RuntimeError(
+            "OpenAI API key missing: pass api_key=... or set OPENAI_API_KEY"
+        )
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            # Imported here: the SDK takes most of a cold start to import, and a
+            # run whose question comes from the queue never needs it
+            from openai import OpenAI
+            client = _clients[key] = OpenAI(api_key=key)
+    return client
+
+
+def schema_errors(value, schema, path="$"):
+    """
+        Check a parsed value against the JSON Schema subset used for structured
+        output (type, properties, required, additionalProperties, items, enum).
+        Returns a list of readable problems; empty means valid.
+    """
+    errors = []
+    expected = schema.get("type")
+    if expected:
+        py_type = _JSON_TYPES.get(expected, object)
+        if not isinstance(value, py_type) or (expected in ("integer", "number") and isinstance(value, bool)):
+            return [f"{path} should be {expected}, got {type(value).__name__}"]
+    if "enum" in schema and value not in schema["enum"]:
+        errors.append(f"{path} should be one of {schema['enum']}")
+    if isinstance(value, dict):
+        props = schema.get("properties", {})
+        for name in schema.get("required", []):
+            if name not in value:
+                errors.append(f"{path}.{name} is missing")
+        if schema.get("additionalProperties") is False:
+            errors.extend(f"{path}.{name} is not allowed" for name in value if name not in props)
+        for name, sub in props.items():
+            if name in value:
+                errors.extend(schema_errors(value[name], sub, f"{path}.{name}"))
+    if isinstance(value, list) and "items" in schema:
+        for i, item in enumerate(value):
+            errors.extend(schema_errors(item, schema["items"], f"{path}[{i}]"))
+    return errors
+
+
+def _repair(value, schema):
+    """
+        Fix the mistakes that don't need the model: drop keys the schema forbids
+        and turn numbers/booleans into strings where strings are expected.
+    """
+    expected = schema.get("type")
+    if expected == "string" and isinstance(value, (int, float, bool)):
+        return str(value)
+    if isinstance(value, dict):
+        props = schema.get("properties", {})
+        if schema.get("additionalProperties") is False:
+            value = {k: v for k, v in value.items() if k in props}
+        return {k: _repair(v, props[k]) if k in props else v for k, v in value.items()}
+    if isinstance(value, list) and "items" in schema:
+        return [_repair(v, schema["items"]) for v in value]
+    return value
+
+
+class CallStats:
+    """
+        Running totals for model calls in this process: calls, errors, local repairs,
+        re-requests, tokens and latency. Safe to update from several threads.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.errors = 0
+        self.repairs = 0
+        self.rerequests = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.latencies = []
+
+    def record(self, call):
+        with self._lock:
+            self.calls += 1
+            self.errors += 1 if call.get("error") else 0
+            self.input_tokens += call.get("input_tokens") or 0
+            self.output_tokens += call.get("output_tokens") or 0
+            self.latencies.append(call["latency_s"])
+
+    def count(self, field):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def snapshot(self):
+        with self._lock:
+            lat = sorted(self.latencies)
+            pick = lambda q: round(lat[min(len(lat) - 1, int(q * len(lat)))], 3) if lat else None
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "repairs": self.repairs,
+                "rerequests": self.rerequests,
+                "input_tokens": self.input_tokens,
+                "output_tokens": self.output_tokens,
+                "latency_p50_s": pick(0.5),
+                "latency_p95_s": pick(0.95),
+                "latency_max_s": lat[-1] if lat else None,
+            }
+
+
+STATS = CallStats()
+
 
 class OpenAIPrompt:
     """
         A helper class for generating structured JSON responses from the OpenAI API.
         It tries the newer Responses API first, and falls back to the Chat Completions API
         with JSON mode if needed.
+        Instances are cheap: they share one OpenAI client per API key. Every model call
+        is appended to `calls` (api, latency, tokens) and added to STATS.
     """
-    def __init__(self, prompt=None, api_key=None, model="gpt-5"):
+    def __init__(self, prompt=None, api_key=None, model="gpt-5", cache=None):
         """
             Create a new OpenAIPrompt instance.
             :param prompt: The main prompt text to send to the model (optional).
             :param api_key: Your OpenAI API key. If not provided, will try to use
                             the OPENAI_API_KEY environment variable.
             :param model: The model name to use (default: "gpt-5").
+            :param cache: Optional response cache (see response_cache.py). Defaults to
+                          the one configured by QUIZ_CACHE_DIR / QUIZ_CACHE_CONTAINER.
         """
         self.client = self._get_client(api_key)
         self.model = model
         self.prmpt = prompt
+        self.cache = cache if cache is not None else default_cache()
+        self.calls = []
 
     @staticmethod
     def _get_client(api_key):
         """
-            Create an OpenAI client using the provided API key.
+            The shared OpenAI client for the provided API key (see shared_client).
             If no key is provided, try to load it from the OPENAI_API_KEY environment variable.
             Raises an error if no key is found.
         """
-        key = api_key or os.environ.get("OPENAI_API_KEY")
-        if not key:
-            raise RuntimeError(
-                "OpenAI API key missing: pass api_key=... or set OPENAI_API_KEY"
-            )
-        return OpenAI(api_key=key)
+        return shared_client(api_key)
 
     @staticmethod
     def _loads_or_trim_braces(s):
@@ -42,12 +189,14 @@ class OpenAIPrompt:
             - If that fails, try to extract the portion between the first '{' and the last '}'
             and parse that.
             - If parsing still fails, re-raise the original error.
+            Markdown code fences and trailing commas are removed first.
         """
         if not s:
             raise ValueError("Empty string passed to JSON parser")
         try:
             return json.loads(s)
         except Exception:
+            s = _TRAILING_COMMA.sub(r"\1", _FENCE.sub("", s))
             start = s.find("{")
             end = s.rfind("}")
             if start == -1 or end == -1 or end <= start:
@@ -55,29 +204,141 @@ class OpenAIPrompt:
                 raise
             return json.loads(s[start: end + 1])
 
-    def generate_json(self, *, system_prompt, user_prompt, seed=None):
+    def _client_for(self, deadline):
+        """
+            The client to use under a deadline: request timeout capped by the time
+            left, and no hidden SDK retries (retries are paced by the deadline here).
+        """
+        if not deadline.bounded:
+            return self.client
+        return self.client.with_options(timeout=deadline.timeout(OPENAI_TIMEOUT), max_retries=0)
+
+    def generate_json(self, *, system_prompt, user_prompt, seed=None, schema=None, deadline=None):
         """
             Send prompts to OpenAI and return a structured JSON response.
             Steps:
             1. Try the new Responses API first.
-            2. If parsing fails or an error occurs, fall back to the older
-            Chat Completions API with JSON mode.
+            2. If the call fails, or the answer can't be parsed/repaired into valid
+            JSON, make one Chat Completions request (quoting the problems, if any).
             3. Always return the parsed JSON as a Python dictionary.
 
             :param system_prompt: Instructions for how the model should behave.
             :param user_prompt: The actual question or input to generate output from.
             :param seed: Optional integer to make results reproducible.
+            :param schema: Optional {"name", "schema"} for strict structured output; the
+                           answer is checked against it and repaired locally before
+                           any second request.
+            :param deadline: Optional deadline.Deadline; each call's timeout is capped by
+                             the time left, and the fallback is skipped if none is left.
             :return: A Python dictionary parsed from the model’s JSON response.
+
+            Identical (model, prompts, seed, schema) requests are answered from the cache when one is set.
+        """
+        deadline = as_deadline(deadline)
+        with tracing.span("openai.generate_json", model=self.model,
+                          schema=schema["name"] if schema else "none") as span:
+            key = None
+            if self.cache is not None:
+                key = request_key(model=self.model, system_prompt=system_prompt,
+                                  user_prompt=user_prompt, seed=seed,
+                                  schema=schema["name"] if schema else None)
+                cached = self.cache.get(key)
+                span.set_attribute("cache_hit", cached is not None)
+                if cached is not None:
+                    return cached
+
+            calls_before = len(self.calls)
+            data, problems = self._request_json(system_prompt=system_prompt, user_prompt=user_prompt,
+                                                seed=seed, schema=schema, deadline=deadline)
+            span.set_attribute("calls", len(self.calls) - calls_before)
+            # Output that failed validation is still returned, but never cached: a rerun should ask again
+            if key is not None and not problems:
+                self.cache.set(key, data)
+            return data
+
+    def _record(self, api, started, usage=None, error=None):
         """
+            Log one model call and add it to `calls` and STATS.
+        """
+        call = {
+            "api": api,
+            "model": self.model,
+            "latency_s": round(time.perf_counter() - started, 3),
+            "input_tokens": getattr(usage, "input_tokens", None) or getattr(usage, "prompt_tokens", None),
+            "output_tokens": getattr(usage, "output_tokens", None) or getattr(usage, "completion_tokens", None),
+        }
+        if error:
+            call["error"] = str(error)[:200]
+        self.calls.append(call)
+        STATS.record(call)
+        logging.info("OpenAI %s: %.2fs, %s in / %s out tokens%s", api, call["latency_s"],
+                     call["input_tokens"], call["output_tokens"], " (failed)" if error else "")
+        return call
+
+    def _call(self, api, create, **kwargs):
+        """
+            One model call, timed, traced and recorded (a failed call is recorded, then re-raised).
+        """
+        started = time.perf_counter()
+        request_bytes = len(json.dumps(kwargs, default=str).encode("utf-8"))
+        with tracing.span(f"openai.{api}", model=self.model, request_bytes=request_bytes) as span:
+            try:
+                resp = create(**kwargs)
+            except Exception as e:
+                self._record(api, started, error=e)
+                raise
+            call = self._record(api, started, getattr(resp, "usage", None))
+            span.set_attributes({k: call[k] for k in ("input_tokens", "output_tokens") if call[k] is not None})
+            return resp
+
+    def _parse(self, text, schema):
+        """
+            Parse model text and check it against the schema, repairing what can be
+            fixed locally. Returns (data, problems); problems is empty when valid.
+        """
+        try:
+            data = json.loads(text)
+        except ValueError:
+            data = self._loads_or_trim_braces(text)
+            STATS.count("repairs")
+            tracing.current_span().set_attribute("repaired", True)
+        if schema is None:
+            return data, []
+        errors = schema_errors(data, schema["schema"])
+        if errors:
+            repaired = _repair(data, schema["schema"])
+            if not schema_errors(repaired, schema["schema"]):
+                STATS.count("repairs")
+                tracing.current_span().set_attribute("repaired", True)
+                logging.info("Repaired model output locally: %s", "; ".join(errors[:3]))
+                return repaired, []
+        return data, errors
+
+    def _request_json(self, *, system_prompt, user_prompt, seed=None, schema=None, deadline=None):
+        """
+            Make the actual API call(s) behind generate_json (no caching here).
+            Returns (data, problems); problems lists the schema errors still left in data.
+        """
+        deadline = as_deadline(deadline)
+        seed = int(seed) if seed is not None else None
+        data, problems, first_error = None, [], None
+
         # First, try using the newer "Responses" API from OpenAI
         try:
-            resp = self.client.responses.create(
+            extra = {}
+            if schema is not None:
+                # Strict structured output: the model can only produce schema-shaped JSON
+                extra["text"] = {"format": {"type": "json_schema", "name": schema["name"],
+                                            "schema": schema["schema"], "strict": True}}
+            resp = self._call(
+                "responses", self._client_for(deadline).responses.create,
                 model=self.model,  # which model to use (default is gpt-5)
                 input=[
                     {"role": "system", "content": system_prompt},  # system role defines behavior
                     {"role": "user", "content": user_prompt},  # user role gives the actual question
                 ],
-                seed=int(seed) if seed is not None else None,  # optional seed for reproducibility
+                # No seed here: the Responses API doesn't take one (it's part of the cache key)
+                **extra,
             )
 
             # Try to grab the text directly from the response
@@ -87,23 +348,48 @@ class OpenAIPrompt:
                 # Some SDK versions don’t provide `output_text`, so fall back
                 text = str(resp)
 
-            # Parse the response text into a Python dictionary
-            return self._loads_or_trim_braces(text)
+            # Parse (and if needed repair) the response text into a Python dictionary
+            data, problems = self._parse(text, schema)
+            if not problems:
+                return data, []
+        except Exception as e:
+            first_error = e
 
-        except Exception:
-            # If the Responses API fails for any reason, fall back to the older "Chat Completions" API
-            chat = self.client.chat.completions.create(
-                model=self.model,  # same model as above
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                response_format={"type": "json_object"},  # force JSON output format
-                seed=int(seed) if seed is not None else None,
-            )
+        # Re-request through Chat Completions, after a short jittered pause - unless that
+        # would leave no time for the call. An answer that only failed validation is kept then.
+        if not deadline.backoff(1, base=0.5, cap=2, what="Chat Completions fallback"):
+            if data is not None:
+                logging.warning("Using model output that failed validation: %s", "; ".join(problems[:3]))
+                return data, problems
+            raise first_error
+        STATS.count("rerequests")
+        tracing.current_span().set_attribute("fallback", True)
+
+        if schema is not None:
+            response_format = {"type": "json_schema",
+                               "json_schema": {"name": schema["name"], "schema": schema["schema"], "strict": True}}
+        else:
+            response_format = {"type": "json_object"}  # force JSON output format
+        if problems:
+            user_prompt = (f"{user_prompt}\n\nA previous answer was rejected: {'; '.join(problems[:5])}. "
+                           "Return corrected JSON only.")
+
+        chat = self._call(
+            "chat", self._client_for(deadline).chat.completions.create,
+            model=self.model,  # same model as above
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            response_format=response_format,
+            seed=seed,
+        )
 
-            # Get the generated JSON text from the chat response
-            content = chat.choices[0].message.content
+        # Get the generated JSON text from the chat response
+        content = chat.choices[0].message.content
 
-            # Parse the JSON string into a Python dictionary and return it
-            return json.loads(content)
+        # Parse the JSON string into a Python dictionary and return it
+        data, problems = self._parse(content, schema)
+        if problems:
+            logging.warning("Model output still fails validation: %s", "; ".join(problems[:3]))
+        return data, problems
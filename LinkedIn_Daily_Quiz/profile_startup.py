@@ -0,0 +1,152 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+# Cold-start report for the function app: what importing each module costs
+# (python -X importtime) and how long post_daily_quiz takes on a fresh process
+# with and without the background warm-up, against the local stand-ins:
+#
+#     python profile_startup.py --out startup.json
+#
+# Every measurement runs in a new interpreter, so nothing is already imported.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MODULES = ["function_app", "warmup", "quiz_store", "send_it", "new_post", "openai_prompt", "openai"]
+TOP = 12
+
+
+def _python(args, env=None):
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, cwd=HERE,
+                          env={**os.environ, **(env or {})})
+
+
+def import_profile(module, top=TOP):
+    """
+        Import `module` in a fresh interpreter under -X importtime.
+        Returns its total import time and the costliest modules it pulled in
+        (by cumulative time, then by their own time).
+    """
+    out = _python(["-X", "importtime", "-c", f"import {module}"])
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+        })
+    if out.returncode != 0 or not rows:
+        return {"error": out.stderr.strip().splitlines()[-1] if out.stderr.strip() else "no output"}
+    total = next((r for r in reversed(rows) if r["module"] == module), rows[-1])
+    return {
+        "total_ms": round(total["cumulative_ms"], 1),
+        "modules_imported": len(rows),
+        "top_cumulative": sorted((r for r in rows if 0 < r["depth"] <= 2),
+                                 key=lambda r: -r["cumulative_ms"])[:top],
+        "top_self": sorted(rows, key=lambda r: -r["self_ms"])[:top],
+    }
+
+
+def _child(warm):
+    """
+        Runs in a fresh interpreter (--child): two post_daily_quiz invocations against
+        the stand-ins, optionally after waiting for the warm-up. Prints JSON.
+    """
+    import fake_linkedin
+    import fake_openai
+
+    ai = fake_openai.FakeOpenAI(seed=1).start()
+    li = fake_linkedin.FakeLinkedIn().start()
+    os.environ.update({
+        "ACCESS_TOKEN": "fake-token", "PERSON_URN": "urn:li:person:profile", "OPENAI_API_KEY": "fake",
+        "OPENAI_BASE_URL": ai.base_url, "LINKEDIN_API_BASE": li.base_url, "QUIZ_TRACE": "off",
+        "QUIZ_TZ": "UTC", "QUIZ_WARMUP": "1" if warm else "0",
+    })
+    for name in ("QUIZ_CACHE_DIR", "QUIZ_CACHE_CONTAINER"):
+        os.environ.pop(name, None)
+
+    # The blob stand-in has to be installed before anything touches storage, so
+    # quiz_store (and azure.storage.blob) is imported up front in both modes
+    import fake_blob
+    import quiz_store
+    quiz_store.set_service_client(fake_blob.FakeBlobService())
+
+    start = time.perf_counter()
+    import function_app
+    import warmup
+    result = {"import_function_app_ms": round((time.perf_counter() - start) * 1000, 1)}
+    if warm:
+        warmup._thread.join()
+        result["warmup"] = warmup.timings()
+
+    class Timer:
+        past_due = False
+
+    for n in ("first_invocation_ms", "second_invocation_ms"):
+        # Same author both times: drop send_it's per-author spacing so only start-up cost shows
+        if "send_it" in sys.modules:
+            sys.modules["send_it"]._author_next.clear()
+        start = time.perf_counter()
+        function_app.post_daily_quiz(Timer())
+        result[n] = round((time.perf_counter() - start) * 1000, 1)
+    result["posts"] = len(li.posts)
+    ai.shutdown()
+    li.shutdown()
+    print(json.dumps(result))
+
+
+def invocation_profile(warm):
+    out = _python([os.path.basename(__file__), "--child", "warm" if warm else "cold"])
+    try:
+        return json.loads(out.stdout.strip().splitlines()[-1])
+    except (ValueError, IndexError):
+        return {"error": (out.stderr.strip().splitlines() or ["no output"])[-1]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import-time and cold-start report for the function app")
+    parser.add_argument("--modules", default=",".join(MODULES))
+    parser.add_argument("--top", type=int, default=TOP)
+    parser.add_argument("--out", help="write JSON results here instead of stdout")
+    parser.add_argument("--child", choices=["cold", "warm"], help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        return _child(args.child == "warm")
+
+    from benchmark import _git_commit
+
+    imports = {m: import_profile(m, args.top) for m in args.modules.split(",")}
+    invocations = {
+        "no_warmup": invocation_profile(warm=False),
+        "after_warmup": invocation_profile(warm=True),
+    }
+    for m, r in imports.items():
+        print(f"import {m}: {r.get('total_ms', r.get('error'))} ms", file=sys.stderr)
+    for mode, r in invocations.items():
+        print(f"{mode}: first {r.get('first_invocation_ms')} ms, second {r.get('second_invocation_ms')} ms",
+              file=sys.stderr)
+
+    report = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "imports": imports,
+        "invocations": invocations,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import logging
+
+import tracing
+from quiz_store import load_json, update_json
+
+DEFAULT_QUEUE_BLOB = "queue.json"
+DEFAULT_QUEUE_DAYS = 7
+DEFAULT_MAX_WORKERS = 4
+
+# Queue layout in the blob:
+# {"2025-01-31": {"difficulty": "beginner", "question": {...}}, ...}
+
+def load_queue(container, queue_blob=DEFAULT_QUEUE_BLOB):
+    """
+        Load the pre-generated question queue (date string -> entry).
+        Returns an empty dict if the queue blob does not exist yet.
+    """
+    return load_json(container, queue_blob, {}) or {}
+
+def dequeue_question(container, the_date, difficulty, queue_blob=DEFAULT_QUEUE_BLOB):
+    """
+        Take the queued question for a date, if there is one.
+        - Only returns it when it was generated for the same difficulty.
+        - Removes the entry (and any older leftovers) from the queue.
+        - Returns None when the queue has nothing usable, so the caller can
+          fall back to live generation.
+    """
+    key = the_date.isoformat()
+    queue = load_queue(container, queue_blob)
+    if key not in queue and not any(k < key for k in queue):
+        return None
+
+    taken = {}
+
+    def _take(latest):
+        taken["entry"] = latest.pop(key, None)
+        for k in [k for k in latest if k < key]:
+            latest.pop(k)
+
+    # Conditional write, so a prefill run saving at the same moment isn't overwritten
+    update_json(container, queue_blob, _take, default={})
+    entry = taken.get("entry")
+    if entry and entry.get("difficulty") == difficulty:
+        return entry.get("question")
+    return None
+
+def fill_queue(container, dates, generate, difficulty, *, max_workers=DEFAULT_MAX_WORKERS,
+               queue_blob=DEFAULT_QUEUE_BLOB, deadline=None):
+    """
+        Generate questions for any of `dates` not already queued and save them.
+        - `generate(the_date)` must return a validated question dict.
+        - Up to `max_workers` model calls run at the same time.
+        - A failed date is logged and skipped; the daily run will generate it live.
+        - Returns the list of dates that were added.
+    """
+    queue = load_queue(container, queue_blob)
+    todo = [d for d in dates if d.isoformat() not in queue]
+    if not todo:
+        return []
+
+    added = []
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = {pool.submit(tracing.bind(generate), d): d for d in todo}
+        for fut in as_completed(futures):
+            the_date = futures[fut]
+            try:
+                queue[the_date.isoformat()] = {"difficulty": difficulty, "question": fut.result()}
+                added.append(the_date)
+            except Exception as e:
+                logging.warning("Queue pre-generation failed for %s: %s", the_date, e)
+
+    def _merge(latest):
+        latest.update({d.isoformat(): queue[d.isoformat()] for d in added})
+        return dict(sorted(latest.items()))
+
+    # Merge into the current blob with If-Match, so a dequeue that ran meanwhile isn't undone
+    if added:
+        update_json(container, queue_blob, _merge, default={}, deadline=deadline)
+    return sorted(added)
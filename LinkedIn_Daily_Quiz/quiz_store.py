@@ -1,20 +1,184 @@
+import copy
+from datetime import date
 import os
 import json
+import logging
+import threading
+from azure.core import MatchConditions
+from azure.core.exceptions import (
+    ResourceExistsError,
+    ResourceModifiedError,
+    ResourceNotModifiedError,
+)
 from azure.storage.blob import BlobServiceClient
 
+import tracing
+from deadline import WRITE_RESERVE, as_deadline
+from archive_index import ArchiveIndex
+from dedupe_index import DedupeIndex
+
 CONN_ENV = "STORAGE_CONNECTION_STRING"
 
+# Append blobs take at most 4 MiB per block
+MAX_APPEND_BLOCK = 4 * 1024 * 1024
+
+# Conditional writes that lose a race are retried this many times
+MAX_CONFLICT_RETRIES = 5
+CONFLICT_BACKOFF = 0.2
+
+_service = None
+_service_lock = threading.Lock()
+
+# (container, blob) -> (etag, parsed JSON) from the last download or upload
+_etag_cache = {}
+
+def _service_client():
+    """
+        Shared BlobServiceClient for the whole process.
+        Built once from STORAGE_CONNECTION_STRING so every call reuses the same
+        HTTP connection pool instead of doing a new handshake.
+        Raises an error if the variable is missing.
+    """
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                conn = os.environ.get(CONN_ENV)
+                if not conn:
+                    raise RuntimeError(f"{CONN_ENV} not set")
+                _service = BlobServiceClient.from_connection_string(conn)
+    return _service
+
+def set_service_client(svc):
+    """
+        Swap in a different service client (e.g. the fake_blob stand-in for offline runs).
+        Also clears the ETag cache, which belongs to the old client's data.
+    """
+    global _service
+    _service = svc
+    _etag_cache.clear()
+
 def _blob_client(container, blob):
     """
-        Create and return a client object for a specific blob file in Azure Storage.
-        Looks up the storage connection string from the environment variable
-        STORAGE_CONNECTION_STRING. If the variable is missing, it raises an error.
+        Return a client object for a specific blob file in Azure Storage,
+        built from the shared service client.
+    """
+    return _service_client().get_blob_client(container=container, blob=blob)
+
+def _container_client(container):
+    """
+        Return a client for a whole container (used for listing blobs).
+    """
+    return _service_client().get_container_client(container)
+
+def list_blobs(container, prefix=""):
+    """
+        List blobs under a prefix as (name, last_modified) pairs.
+    """
+    cc = _container_client(container)
+    return [(b.name, b.last_modified) for b in cc.list_blobs(name_starts_with=prefix)]
+
+def delete_blob(container, blob):
+    """
+        Delete a blob, ignoring it if it is already gone.
+    """
+    bc = _blob_client(container, blob)
+    try:
+        bc.delete_blob()
+    except Exception:
+        pass
+
+def load_json_versioned(container, blob, default=None):
+    """
+        Load a JSON blob and its ETag as (value, etag).
+        - If we already hold a copy, the download is sent with If-None-Match, so an
+          unchanged blob costs a 304 and no body.
+        - Returns (default, None) if the blob is missing or unreadable.
+        - The value is a private copy; changing it doesn't touch the cache.
+    """
+    key = (container, blob)
+    cached = _etag_cache.get(key)
+    bc = _blob_client(container, blob)
+    with tracing.span("blob.load_json", container=container, blob=blob) as span:
+        try:
+            if cached:
+                downloader = bc.download_blob(etag=cached[0], match_condition=MatchConditions.IfModified)
+            else:
+                downloader = bc.download_blob()
+            raw = downloader.readall()
+            value = json.loads(raw)
+            etag = downloader.properties.etag
+            _etag_cache[key] = (etag, value)
+            span.set_attributes({"result": "downloaded", "bytes": len(raw)})
+            return copy.deepcopy(value), etag
+        except ResourceNotModifiedError:
+            span.set_attributes({"result": "not_modified", "bytes": 0})
+            return copy.deepcopy(cached[1]), cached[0]
+        except Exception as e:
+            _etag_cache.pop(key, None)
+            span.set_attributes({"result": "missing", "error": type(e).__name__})
+            return default, None
+
+def load_json(container, blob, default=None):
+    """
+        Load any JSON document stored in an Azure Blob.
+        - Returns the parsed value, or `default` if the blob is missing or unreadable.
+    """
+    return load_json_versioned(container, blob, default)[0]
+
+def save_json(container, blob, value, etag=None, must_not_exist=False):
+    """
+        Save any JSON-serializable value to a blob.
+        - With `etag`, the write only succeeds if the blob is unchanged (If-Match);
+          with `must_not_exist`, only if it hasn't been created yet.
+          Otherwise ResourceModifiedError / ResourceExistsError is raised.
+        - Without either, the blob is simply overwritten.
+        - The JSON is written with indentation and keeps non-ASCII characters.
+        - Returns the new ETag.
+    """
+    bc = _blob_client(container, blob)
+    text = json.dumps(value, indent=2, ensure_ascii=False)
+    conditions = {}
+    if etag:
+        conditions = {"etag": etag, "match_condition": MatchConditions.IfNotModified}
+    elif must_not_exist:
+        conditions = {"etag": "*", "match_condition": MatchConditions.IfMissing}
+    with tracing.span("blob.save_json", container=container, blob=blob,
+                      bytes=len(text.encode("utf-8")), conditional=bool(conditions)):
+        result = bc.upload_blob(text, overwrite=True, **conditions)
+    new_etag = result.get("etag")
+    _etag_cache[(container, blob)] = (new_etag, copy.deepcopy(value))
+    return new_etag
+
+def update_json(container, blob, mutate, default=None, deadline=None):
     """
-    conn = os.environ.get(CONN_ENV)
-    if not conn:
-        raise RuntimeError(f"{CONN_ENV} not set")
-    svc = BlobServiceClient.from_connection_string(conn)
-    return svc.get_blob_client(container=container, blob=blob)
+        Read-modify-write a JSON blob without losing concurrent changes.
+        - Reads the blob and its ETag, calls mutate(value) (edit in place or
+          return a new value), then writes with If-Match.
+        - If another run wrote first, re-reads and tries again, up to
+          MAX_CONFLICT_RETRIES times with a short jittered wait (never past `deadline`).
+        - Returns the value that was saved.
+    """
+    deadline = as_deadline(deadline)
+    with tracing.span("blob.update_json", container=container, blob=blob) as span:
+        for attempt in range(1, MAX_CONFLICT_RETRIES + 1):
+            span.set_attribute("attempts", attempt)
+            value, etag = load_json_versioned(container, blob, None)
+            if etag is None:
+                value = copy.deepcopy(default)
+            result = mutate(value)
+            if result is not None:
+                value = result
+            try:
+                save_json(container, blob, value, etag=etag, must_not_exist=etag is None)
+                return value
+            except (ResourceModifiedError, ResourceExistsError):
+                _etag_cache.pop((container, blob), None)
+                span.set_attribute("conflicts", attempt)
+                if attempt == MAX_CONFLICT_RETRIES:
+                    raise
+                if not deadline.backoff(attempt, base=CONFLICT_BACKOFF, cap=2, what=f"{blob} conflict retry"):
+                    raise
 
 def load_questions(container, blob):
     """
@@ -22,12 +186,10 @@ def load_questions(container, blob):
         - If the blob exists and contains valid JSON, return its contents as a Python list.
         - If the blob is missing or unreadable, return an empty list instead.
     """
-    bc = _blob_client(container, blob)
-    try:
-        data = bc.download_blob().readall()
-        return json.loads(data)
-    except Exception:
-        return []
+    with tracing.span("quiz_store.load_questions", container=container, blob=blob) as span:
+        items = load_json(container, blob, [])
+        span.set_attribute("count", len(items))
+        return items
 
 def save_questions(container, blob, items):
     """
@@ -35,19 +197,322 @@ def save_questions(container, blob, items):
         - The existing blob will be overwritten with the new JSON data.
         - The JSON is written with indentation and keeps non-ASCII characters.
     """
-    bc = _blob_client(container, blob)
-    text = json.dumps(items, indent=2, ensure_ascii=False)
-    bc.upload_blob(text, overwrite=True)
+    save_json(container, blob, items)
 
 def append_question(container, blob, item):
     """
         Add one new quiz question to the end of the list in the blob file.
         - Reads the current list of questions from the blob (or uses an empty list if none).
         - Appends the new question dictionary.
-        - Saves the updated list back to the blob.
+        - Saves the updated list back only if nobody else changed it meanwhile
+          (retries on conflict).
         - Returns the full updated list of questions.
     """
-    items = load_questions(container, blob)
-    items.append(item)
-    save_questions(container, blob, items)
-    return items
\ No newline at end of file
+    with tracing.span("quiz_store.append_question", container=container, blob=blob):
+        return update_json(container, blob, lambda items: items.append(item), default=[])
+
+
+# --- Sharded, append-only layout ---
+# questions.json (legacy single list) becomes:
+#   questions/2025-01.jsonl   one Append Blob per month, one JSON record per line
+#   questions/latest.json     copy of the newest record, so "yesterday" is one small read
+#   questions/index.json      date -> (shard, offset, length) plus topic/difficulty lists,
+#                             so single records are fetched with ranged reads
+
+def _shard_prefix(blob):
+    """
+        Folder used for the sharded layout of a legacy blob name ("questions.json" -> "questions/").
+    """
+    return os.path.splitext(blob)[0] + "/"
+
+def shard_name(blob, the_date):
+    """
+        Month shard that holds the record for a given date.
+    """
+    return f"{_shard_prefix(blob)}{the_date:%Y-%m}.jsonl"
+
+def latest_name(blob):
+    return f"{_shard_prefix(blob)}latest.json"
+
+def dedupe_name(blob):
+    return f"{_shard_prefix(blob)}minhash.json"
+
+def index_name(blob):
+    return f"{_shard_prefix(blob)}index.json"
+
+def track_blob(blob, track, primary=None):
+    """
+        Blob name for one difficulty track ("questions.json", "advanced" -> "questions-advanced.json").
+        The `primary` track keeps the plain name, so its existing history stays where it is.
+    """
+    if track == primary:
+        return blob
+    stem, ext = os.path.splitext(blob)
+    slug = "-".join(str(track).lower().split())
+    return f"{stem}-{slug}{ext}"
+
+def _month_of(shard):
+    return os.path.basename(shard)[:-len(".jsonl")]
+
+def _index_records(stored, records):
+    """
+        Add records to a stored dedupe index dict (used as an update_json mutator).
+    """
+    index = DedupeIndex.from_dict(stored)
+    for rec in records:
+        index.add(rec["date"], rec)
+    return index.to_dict()
+
+def load_dedupe_index(container, blob):
+    """
+        Near-duplicate index over every sharded question (empty if none yet).
+    """
+    return DedupeIndex.from_dict(load_json(container, dedupe_name(blob), {}))
+
+def rebuild_dedupe_index(container, blob):
+    """
+        Build the dedupe index from the full sharded history (one-off, e.g. after migration).
+    """
+    records = load_all_sharded(container, blob)
+    save_json(container, dedupe_name(blob), _index_records({}, records))
+    return len(records)
+
+def _index_locations(stored, located):
+    """
+        Add (record, shard, offset, length) tuples to a stored archive index dict
+        (used as an update_json mutator).
+    """
+    index = ArchiveIndex.from_dict(stored)
+    for rec, shard, offset, length in located:
+        index.add(rec, _month_of(shard), offset, length)
+    return index.to_dict()
+
+def load_archive_index(container, blob):
+    """
+        Date/topic/difficulty index over the sharded history (empty if none yet).
+    """
+    return ArchiveIndex.from_dict(load_json(container, index_name(blob), {}))
+
+def rebuild_archive_index(container, blob, topic_for=None):
+    """
+        Build the archive index by scanning every shard (one-off, e.g. after migration).
+        `topic_for(date)` fills in the topic for records stored without one.
+        Returns the number of records indexed.
+    """
+    located = []
+    for name, _ in sorted(list_blobs(container, _shard_prefix(blob))):
+        if not name.endswith(".jsonl"):
+            continue
+        try:
+            data = _blob_client(container, name).download_blob().readall()
+        except Exception:
+            continue
+        offset = 0
+        for line in data.splitlines(keepends=True):
+            if line.strip():
+                rec = json.loads(line)
+                if topic_for and not rec.get("topic") and rec.get("date"):
+                    rec["topic"] = topic_for(date.fromisoformat(rec["date"]))
+                located.append((rec, name, offset, len(line)))
+            offset += len(line)
+    save_json(container, index_name(blob), _index_locations({}, located))
+    return len(located)
+
+def _ensure_append_blob(bc):
+    """
+        Create the Append Blob if it doesn't exist yet (never truncates an existing one).
+    """
+    try:
+        bc.create_append_blob(etag="*", match_condition=MatchConditions.IfMissing)
+    except (ResourceExistsError, ResourceModifiedError):
+        pass
+
+def _line_chunks(lines):
+    chunk = b""
+    for line in lines:
+        if chunk and len(chunk) + len(line) > MAX_APPEND_BLOCK:
+            yield chunk
+            chunk = b""
+        chunk += line
+    if chunk:
+        yield chunk
+
+def append_questions_sharded(container, blob, dated_items, deadline=None):
+    """
+        Append several (date, question) pairs in one batch.
+        - Each record is stored with its "date" (ISO string) and "date_ordinal" in
+          its month's shard; "topic"/"difficulty" are kept if the item has them.
+        - One append per shard (split only if it passes the 4 MiB block limit).
+        - The offset Azure reports for each block is recorded in the archive index.
+        - The latest pointer moves forward only if a newer date was written.
+        - With a deadline, refuses to start (DeadlineExceeded) unless WRITE_RESERVE
+          seconds are left, so the host doesn't stop the run between shard and pointer.
+        - Returns the stored records in date order.
+    """
+    deadline = as_deadline(deadline)
+    pairs = sorted(dated_items, key=lambda p: p[0])
+    records = [{**item, "date": d.isoformat(), "date_ordinal": d.toordinal()} for d, item in pairs]
+    if not records:
+        return []
+    deadline.check("sharded append", need=WRITE_RESERVE)
+
+    by_shard = {}
+    for (d, _), rec in zip(pairs, records):
+        by_shard.setdefault(shard_name(blob, d), []).append(rec)
+
+    with tracing.span("quiz_store.append", container=container, blob=blob,
+                      records=len(records), shards=len(by_shard)) as span:
+        written = 0
+        located = []
+        for shard, recs in by_shard.items():
+            bc = _blob_client(container, shard)
+            _ensure_append_blob(bc)
+            lines = [(json.dumps(r, ensure_ascii=False) + "\n").encode("utf-8") for r in recs]
+            line_recs = iter(zip(lines, recs))
+            for chunk in _line_chunks(lines):
+                with tracing.span("blob.append_block", container=container, blob=shard, bytes=len(chunk)):
+                    result = bc.append_block(chunk)
+                offset = result.get("blob_append_offset")
+                if offset is None:
+                    # Without the offset the lines can't be located; leave them out of the
+                    # index (rebuild_archive_index picks them up) rather than point at byte 0
+                    logging.warning("append_block on %s returned no offset; %d record(s) not indexed",
+                                    shard, chunk.count(b"\n"))
+                    for _ in range(chunk.count(b"\n")):
+                        next(line_recs)
+                    written += len(chunk)
+                    continue
+                offset = int(offset)
+                end = offset + len(chunk)
+                while offset < end:
+                    line, rec = next(line_recs)
+                    located.append((rec, shard, offset, len(line)))
+                    offset += len(line)
+                written += len(chunk)
+        span.set_attribute("bytes", written)
+
+        def _advance(latest):
+            if latest is None or latest.get("date", "") <= records[-1]["date"]:
+                return records[-1]
+            return latest
+
+        update_json(container, latest_name(blob), _advance, deadline=deadline)
+        update_json(container, dedupe_name(blob), lambda d: _index_records(d, records), default={},
+                    deadline=deadline)
+        update_json(container, index_name(blob), lambda d: _index_locations(d, located), default={},
+                    deadline=deadline)
+    return records
+
+def append_question_sharded(container, blob, item, the_date, deadline=None):
+    """
+        Append one question for `the_date`: one Append Blob block plus the small
+        latest pointer, no matter how long the history is.
+    """
+    return append_questions_sharded(container, blob, [(the_date, item)], deadline=deadline)[0]
+
+def load_latest(container, blob):
+    """
+        Newest stored record, or None if the sharded layout hasn't been written yet.
+    """
+    return load_json(container, latest_name(blob))
+
+def load_shard(container, blob, year, month):
+    """
+        All records for one month, in the order they were appended.
+    """
+    bc = _blob_client(container, f"{_shard_prefix(blob)}{year:04d}-{month:02d}.jsonl")
+    try:
+        data = bc.download_blob().readall()
+    except Exception:
+        return []
+    return [json.loads(line) for line in data.decode("utf-8").splitlines() if line.strip()]
+
+def _read_located(container, blob, locations):
+    """
+        Fetch records by (month, offset, length) with one ranged read per shard
+        (covering just the span between its first and last wanted record).
+        Returns records in the order of `locations`; unreadable ones are skipped.
+    """
+    by_month = {}
+    for loc in locations:
+        by_month.setdefault(loc[0], []).append(loc)
+    found = {}
+    for month, locs in by_month.items():
+        start = min(off for _, off, _ in locs)
+        end = max(off + length for _, off, length in locs)
+        bc = _blob_client(container, f"{_shard_prefix(blob)}{month}.jsonl")
+        try:
+            data = bc.download_blob(offset=start, length=end - start).readall()
+        except Exception:
+            continue
+        for loc in locs:
+            _, off, length = loc
+            found[loc] = json.loads(data[off - start:off - start + length])
+    return [found[loc] for loc in locations if loc in found]
+
+def question_for_date(container, blob, the_date, index=None):
+    """
+        Stored record for one date (None if there isn't one): an index lookup plus
+        one ranged read of a single line.
+    """
+    index = index or load_archive_index(container, blob)
+    loc = index.locate(the_date.isoformat())
+    if loc is None:
+        return None
+    found = _read_located(container, blob, [loc])
+    return found[0] if found else None
+
+def questions_for_dates(container, blob, days, index=None):
+    """
+        Stored records for ISO date strings, oldest first, skipping dates with none.
+    """
+    index = index or load_archive_index(container, blob)
+    locations = [index.locate(d) for d in sorted(days)]
+    return _read_located(container, blob, [loc for loc in locations if loc])
+
+def questions_for_topic(container, blob, topic, limit=None, index=None):
+    """
+        Stored records for a topic, oldest first (`limit` keeps only the newest ones).
+    """
+    index = index or load_archive_index(container, blob)
+    days = index.for_topic(topic)
+    if limit:
+        days = days[-limit:]
+    return questions_for_dates(container, blob, days, index)
+
+def last_n_days(container, blob, n, until=None, index=None):
+    """
+        The newest `n` stored records (on or before the date `until`), oldest first.
+    """
+    index = index or load_archive_index(container, blob)
+    days = index.last(n, until.isoformat() if until else None)
+    return questions_for_dates(container, blob, days, index)
+
+def stored_dates(container, blob, first, last):
+    """
+        Dates from `first` to `last` (inclusive) that already have a stored record.
+        Only the month shards covering that range are read.
+    """
+    found = set()
+    year, month = first.year, first.month
+    while (year, month) <= (last.year, last.month):
+        for rec in load_shard(container, blob, year, month):
+            try:
+                d = date.fromisoformat(rec.get("date", ""))
+            except (TypeError, ValueError):
+                continue
+            if first <= d <= last:
+                found.add(d)
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return found
+
+def load_all_sharded(container, blob):
+    """
+        Whole history from the shards, oldest first (for tools, not the daily run).
+    """
+    items = []
+    for name, _ in sorted(list_blobs(container, _shard_prefix(blob))):
+        if name.endswith(".jsonl"):
+            year, month = os.path.basename(name)[:-len(".jsonl")].split("-")
+            items.extend(load_shard(container, blob, int(year), int(month)))
+    return items
@@ -0,0 +1,177 @@
+import hashlib
+import json
+import logging
+import os
+import time
+
+CACHE_DIR_ENV = "QUIZ_CACHE_DIR"
+CACHE_CONTAINER_ENV = "QUIZ_CACHE_CONTAINER"
+CACHE_TTL_ENV = "QUIZ_CACHE_TTL_SECONDS"
+CACHE_MAX_ENV = "QUIZ_CACHE_MAX_ENTRIES"
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 500
+BLOB_PREFIX = "cache/"
+
+
+def request_key(*, model, system_prompt, user_prompt, seed=None, schema=None):
+    """
+        Content address for one model request: SHA-256 of the canonical JSON of
+        everything that affects the answer.
+    """
+    fields = {"model": model, "system": system_prompt, "user": user_prompt, "seed": seed}
+    if schema is not None:
+        # Only added when set, so keys for plain JSON-mode requests stay unchanged
+        fields["schema"] = schema
+    payload = json.dumps(
+        fields,
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _CacheBase:
+    """
+        Shared TTL check and hit/miss counters. Subclasses implement
+        _read(key), _write(key, record) and _evict().
+    """
+    def __init__(self, ttl_seconds=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _expired(self, record):
+        return bool(self.ttl) and time.time() - record.get("created", 0) > self.ttl
+
+    def get(self, key):
+        """
+            Return the cached value for `key`, or None on a miss or expired entry.
+        """
+        try:
+            record = self._read(key)
+        except Exception as e:
+            logging.warning("Response cache read failed: %s", e)
+            record = None
+        if record is None or self._expired(record):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return record["value"]
+
+    def set(self, key, value):
+        """
+            Store a value. Cache failures are logged, never raised: a broken cache
+            must not break quiz generation.
+        """
+        try:
+            self._write(key, {"created": time.time(), "value": value})
+            self._evict()
+        except Exception as e:
+            logging.warning("Response cache write failed: %s", e)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 3) if total else None,
+        }
+
+
+class DiskCache(_CacheBase):
+    """
+        One JSON file per request under a local folder. Handy for local_test.py.
+    """
+    def __init__(self, directory, **kwargs):
+        super().__init__(**kwargs)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _read(self, key):
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write(self, key, record):
+        tmp = self._path(key) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False)
+        os.replace(tmp, self._path(key))
+
+    def _evict(self):
+        """
+            Drop expired entries, then the oldest ones beyond max_entries.
+        """
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                path = os.path.join(self.directory, name)
+                files.append((os.path.getmtime(path), path))
+        files.sort()
+        now = time.time()
+        over = len(files) - self.max_entries if self.max_entries else 0
+        for i, (mtime, path) in enumerate(files):
+            if i < over or (self.ttl and now - mtime > self.ttl):
+                os.remove(path)
+                self.evictions += 1
+
+
+class BlobCache(_CacheBase):
+    """
+        One blob per request under cache/ in the quiz container, so cached
+        answers are shared by every run of the Azure Function.
+    """
+    def __init__(self, container, prefix=BLOB_PREFIX, **kwargs):
+        super().__init__(**kwargs)
+        self.container = container
+        self.prefix = prefix
+
+    def _read(self, key):
+        from quiz_store import load_json
+        return load_json(self.container, f"{self.prefix}{key}.json")
+
+    def _write(self, key, record):
+        from quiz_store import save_json
+        save_json(self.container, f"{self.prefix}{key}.json", record)
+
+    def _evict(self):
+        from quiz_store import delete_blob, list_blobs
+        blobs = sorted(list_blobs(self.container, self.prefix), key=lambda b: b[1])
+        now = time.time()
+        over = len(blobs) - self.max_entries if self.max_entries else 0
+        for i, (name, modified) in enumerate(blobs):
+            if i < over or (self.ttl and now - modified.timestamp() > self.ttl):
+                delete_blob(self.container, name)
+                self.evictions += 1
+
+
+_default_cache = None
+
+def default_cache():
+    """
+        Cache configured from app settings, created once per process:
+        - QUIZ_CACHE_DIR: local folder cache
+        - QUIZ_CACHE_CONTAINER: blob cache in that container
+        - QUIZ_CACHE_TTL_SECONDS / QUIZ_CACHE_MAX_ENTRIES: eviction limits
+        Returns None (no caching) when neither location is set.
+    """
+    global _default_cache
+    if _default_cache is None:
+        limits = {
+            "ttl_seconds": int(os.getenv(CACHE_TTL_ENV, str(DEFAULT_TTL_SECONDS))),
+            "max_entries": int(os.getenv(CACHE_MAX_ENV, str(DEFAULT_MAX_ENTRIES))),
+        }
+        if os.getenv(CACHE_DIR_ENV):
+            _default_cache = DiskCache(os.getenv(CACHE_DIR_ENV), **limits)
+        elif os.getenv(CACHE_CONTAINER_ENV):
+            _default_cache = BlobCache(os.getenv(CACHE_CONTAINER_ENV), **limits)
+    return _default_cache
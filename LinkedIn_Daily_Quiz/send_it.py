@@ -1,11 +1,52 @@
+import asyncio
+import json
 import logging
+import os
+import threading
 import time
 import requests
 
-LINKEDIN_UGC_URL = "https://api.linkedin.com/v2/ugcPosts"
+import tracing
+from deadline import as_deadline
+from http_client import NO_RETRY, default_client
+
+# LINKEDIN_API_BASE lets local runs point at fake_linkedin.py instead of the real API
+LINKEDIN_API_BASE = os.getenv("LINKEDIN_API_BASE", "https://api.linkedin.com")
+LINKEDIN_UGC_URL = f"{LINKEDIN_API_BASE}/v2/ugcPosts"
 REQUEST_TIMEOUT = 15
 MAX_RETRIES = 3
 BACKOFF_BASE = 2
+# Longest single wait between attempts, even if LinkedIn's Retry-After asks for more
+MAX_BACKOFF = 60
+
+# Name posts are counted under in http_client.METRICS
+UGC_ENDPOINT = "linkedin.ugcPosts"
+# Minimum gap between two posts by the same author, and default fan-out width
+AUTHOR_MIN_INTERVAL = 1.0
+MAX_CONCURRENCY = 4
+
+# author URN -> earliest time.monotonic() at which it may post again
+_author_next = {}
+_author_lock = threading.Lock()
+
+def _hold_author(author, seconds):
+    """
+        Push back the next allowed post time for an author (never pulls it forward).
+    """
+    with _author_lock:
+        _author_next[author] = max(_author_next.get(author, 0.0), time.monotonic() + seconds)
+
+def _wait_for_author(author, deadline):
+    """
+        Sleep until this author is allowed to post again (per-author rate limit).
+        Raises DeadlineExceeded rather than waiting past the run's deadline.
+    """
+    with _author_lock:
+        wait = _author_next.get(author, 0.0) - time.monotonic()
+    if wait > 0:
+        deadline.check(f"rate-limit wait for {author}", need=wait)
+        logging.info("Rate limit: waiting %.1fs before posting as %s", wait, author)
+        time.sleep(wait)
 
 def _retryable(status):
     """
@@ -14,41 +55,51 @@ def _retryable(status):
     """
     return status in (408, 429, 500, 502, 503, 504)
 
-def _sleep_retry(attempt, resp):
+def _sleep_retry(attempt, resp, deadline, author=None):
     """
-        Wait before retrying a request.
-        - If the response includes a 'Retry-After' header, wait that many seconds.
-        - Otherwise, wait an exponentially increasing number of seconds (2^attempt).
+        Wait before retrying a request; returns False if there's no time left to retry.
+        - If the response includes a 'Retry-After' header, wait that many seconds
+          (and keep other posts by the same author back for that long too).
+        - Otherwise, wait a jittered, exponentially growing time (up to 2^attempt seconds).
+        - Waits are capped at MAX_BACKOFF and never run past the deadline.
     """
+    delay = None
     if resp is not None:
         ra = resp.headers.get("Retry-After")
         if ra:
             try:
-                wait = int(ra)
-                logging.warning("Retry-After: sleeping %ss", wait)
-                time.sleep(wait)
-                return
+                delay = int(ra)
+                logging.warning("Retry-After: %ss", delay)
+                if author:
+                    _hold_author(author, min(delay, MAX_BACKOFF))
             except ValueError:
                 pass
-    wait = BACKOFF_BASE ** attempt
-    logging.warning("Retrying in %ss (attempt %s/%s)...", wait, attempt, MAX_RETRIES)
-    time.sleep(wait)
+    logging.warning("Retrying (attempt %s/%s)...", attempt, MAX_RETRIES)
+    return deadline.backoff(attempt, base=1, cap=MAX_BACKOFF, delay=delay, what="LinkedIn retry")
 
-def post_text_update(access_token, person_urn, message, visibility="CONNECTIONS"):
+def post_text_update(access_token, person_urn, message, visibility="CONNECTIONS", client=None,
+                     deadline=None):
     """
         Send a plain-text post to LinkedIn using the UGC API.
         Args:
             access_token: OAuth access token for LinkedIn.
-            person_urn: The LinkedIn person URN (must start with 'urn:li:person:').
+            person_urn: The author URN ('urn:li:person:...' or 'urn:li:organization:...').
             message: The text content to post.
             visibility: Who can see the post. Use 'PUBLIC' or 'CONNECTIONS' (default).
+            client: Optional http_client.HttpClient; defaults to the shared pooled client.
+            deadline: Optional deadline.Deadline for the whole run.
         Behavior:
             - Builds the request payload with the message.
-            - Sends the post to LinkedIn.
-            - Retries automatically on certain temporary errors (like 429 or 500).
+            - Waits if this author is still inside its rate-limit window.
+            - Sends the post to LinkedIn over a pooled keep-alive connection.
+            - Retries automatically on certain temporary errors (like 429 or 500),
+              but only while the deadline leaves time for another attempt.
             - Returns the HTTP response object (requests.Response).
-            - Raises an error if all retries fail.
+            - Raises an error if all retries fail, or DeadlineExceeded if no
+              attempt could be started in time.
     """
+    client = client or default_client()
+    deadline = as_deadline(deadline)
     headers = {
         "Authorization": f"Bearer {access_token}",
         "Content-Type": "application/json",
@@ -66,39 +117,92 @@ def post_text_update(access_token, person_urn, message, visibility="CONNECTIONS"
         "visibility": {"com.linkedin.ugc.MemberNetworkVisibility": visibility},
     }
 
+    payload_bytes = len(json.dumps(payload).encode("utf-8"))
+    with tracing.span("linkedin.post_text_update", author=person_urn, visibility=visibility,
+                      payload_bytes=payload_bytes) as span:
+        return _post_with_retries(client, headers, payload, deadline, person_urn, span)
+
+def _send(client, headers, payload, deadline, attempt):
+    """
+        One POST to the UGC endpoint, traced as its own span.
+        The retries around it are done here (deadline and per-author aware), not by the client.
+    """
+    with tracing.span("linkedin.attempt", attempt=attempt) as span:
+        resp = client.post(
+            LINKEDIN_UGC_URL,
+            endpoint=UGC_ENDPOINT,
+            retry=NO_RETRY,
+            headers=headers,
+            json=payload,
+            timeout=deadline.timeout(REQUEST_TIMEOUT),
+        )
+        span.set_attribute("http.status_code", resp.status_code)
+        if resp.headers.get("Retry-After"):
+            span.set_attribute("retry_after", resp.headers["Retry-After"])
+        return resp
+
+def _post_with_retries(client, headers, payload, deadline, person_urn, span):
+    """
+        The retry loop behind post_text_update (attempt count and final status go on `span`).
+    """
     last_exc = None
     resp = None
 
     for attempt in range(1, MAX_RETRIES + 1):
+        span.set_attribute("attempts", attempt)
         try:
-            resp = requests.post(
-                LINKEDIN_UGC_URL,
-                headers=headers,
-                json=payload,
-                timeout=REQUEST_TIMEOUT,
-            )
+            _wait_for_author(person_urn, deadline)
+            resp = _send(client, headers, payload, deadline, attempt)
+            span.set_attribute("http.status_code", resp.status_code)
             if 200 <= resp.status_code < 300:
+                _hold_author(person_urn, AUTHOR_MIN_INTERVAL)
                 return resp
 
             logging.warning("LinkedIn %s: %s", resp.status_code, resp.text[:500])
-            if _retryable(resp.status_code) and attempt < MAX_RETRIES:
-                _sleep_retry(attempt, resp)
+            if (_retryable(resp.status_code) and attempt < MAX_RETRIES
+                    and _sleep_retry(attempt, resp, deadline, person_urn)):
                 continue
             return resp
 
         except requests.Timeout as e:
             last_exc = e
             logging.error("Timeout posting to LinkedIn: %s", e)
-            if attempt < MAX_RETRIES:
-                _sleep_retry(attempt, None)
+            if attempt < MAX_RETRIES and _sleep_retry(attempt, None, deadline):
                 continue
             raise
         except requests.RequestException as e:
             last_exc = e
             logging.error("Request error posting to LinkedIn: %s", e)
-            if attempt < MAX_RETRIES:
-                _sleep_retry(attempt, None)
+            if attempt < MAX_RETRIES and _sleep_retry(attempt, None, deadline):
                 continue
             raise
 
-    raise RuntimeError(f"Unknown LinkedIn posting failure: {last_exc}")
\ No newline at end of file
+    raise RuntimeError(f"Unknown LinkedIn posting failure: {last_exc}")
+
+async def post_many(access_token, authors, message, visibility="CONNECTIONS", max_concurrency=MAX_CONCURRENCY,
+                    deadline=None):
+    """
+        Post the same message as several authors at once (personal and organization pages).
+        Args:
+            access_token: OAuth token allowed to post for every author.
+            authors: List of author URNs, or (urn, visibility) pairs to override visibility.
+            message: The text content to post.
+            visibility: Default visibility for authors given as a plain URN.
+            max_concurrency: How many posts may be in flight at the same time.
+            deadline: Optional deadline.Deadline shared by every post.
+        Behavior:
+            - Each post runs post_text_update in a worker thread over the shared pooled client.
+            - Per-author rate limits and Retry-After are honored per author, so one
+              throttled page doesn't hold up the others.
+            - Returns {urn: response or exception}; one failure doesn't cancel the rest.
+    """
+    sem = asyncio.Semaphore(max(1, max_concurrency))
+    targets = [(a, visibility) if isinstance(a, str) else tuple(a) for a in authors]
+
+    async def _one(urn, vis):
+        async with sem:
+            return await asyncio.to_thread(post_text_update, access_token, urn, message, vis,
+                                           deadline=deadline)
+
+    results = await asyncio.gather(*(_one(u, v) for u, v in targets), return_exceptions=True)
+    return {urn: res for (urn, _), res in zip(targets, results)}
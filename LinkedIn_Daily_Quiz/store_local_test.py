@@ -0,0 +1,131 @@
+from datetime import date, timedelta
+import threading
+
+import fake_blob
+import quiz_store as store
+from new_post import missing_dates
+from question_queue import dequeue_question, fill_queue
+
+CONTAINER = "quizdata"
+BLOB = "questions.json"
+
+
+def check_etag_cache(svc):
+    store.save_json(CONTAINER, "doc.json", {"n": 1})
+    before = svc.bytes_downloaded
+    for _ in range(5):
+        assert store.load_json(CONTAINER, "doc.json") == {"n": 1}
+    assert svc.bytes_downloaded == before, "unchanged blob should not be re-downloaded"
+
+    # Another writer changes it; the next read must see the new body
+    svc.get_blob_client(CONTAINER, "doc.json").upload_blob('{"n": 2}', overwrite=True)
+    assert store.load_json(CONTAINER, "doc.json") == {"n": 2}
+    print("ETag cache: OK")
+
+
+def check_conditional_writes():
+    store.save_json(CONTAINER, BLOB, [])
+    threads = [
+        threading.Thread(target=store.append_question, args=(CONTAINER, BLOB, {"question": f"q{i}"}))
+        for i in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    items = store.load_questions(CONTAINER, BLOB)
+    assert sorted(i["question"] for i in items) == [f"q{i}" for i in range(8)], items
+    print("Conditional appends with retry: OK")
+
+
+def check_shards(svc):
+    store.append_question_sharded(CONTAINER, BLOB, {"question": "jan"}, date(2025, 1, 31))
+    store.append_question_sharded(CONTAINER, BLOB, {"question": "feb"}, date(2025, 2, 1))
+    assert store.load_latest(CONTAINER, BLOB)["question"] == "feb"
+    assert [r["question"] for r in store.load_all_sharded(CONTAINER, BLOB)] == ["jan", "feb"]
+    # A backfilled older date must not move the latest pointer backwards
+    store.append_question_sharded(CONTAINER, BLOB, {"question": "old"}, date(2025, 1, 5))
+    assert store.load_latest(CONTAINER, BLOB)["question"] == "feb"
+    print("Sharded append + latest pointer: OK")
+
+    index = store.load_dedupe_index(CONTAINER, BLOB)
+    assert len(index) == 3
+    assert index.query({"question": "jan"})[0][0] == "2025-01-31"
+    print("Dedupe index updated on append: OK")
+
+
+def check_missing_dates():
+    blob = "gaps.json"
+    store.append_questions_sharded(CONTAINER, blob, [
+        (date(2025, 4, 28), {"question": "a"}),
+        (date(2025, 5, 1), {"question": "b"}),
+    ])
+    # Gap inside the window plus the trailing gap before the target day; nothing before 04-28
+    assert missing_dates(CONTAINER, blob, date(2025, 5, 4), max_days=10) == [
+        date(2025, 4, 29), date(2025, 4, 30), date(2025, 5, 2), date(2025, 5, 3)]
+    assert store.stored_dates(CONTAINER, blob, date(2025, 4, 1), date(2025, 5, 31)) == {
+        date(2025, 4, 28), date(2025, 5, 1)}
+    assert missing_dates(CONTAINER, "empty.json", date(2025, 5, 4)) == []
+    print("Missing-day detection: OK")
+
+
+def check_archive_index(svc):
+    blob = "archive.json"
+    topics = ["Decorators", "Asyncio", "File I/O"]
+    dated = [
+        (date(2025, 6, 1) + timedelta(days=i),
+         {"question": f"q{i} " + "x" * 200, "topic": topics[i % 3], "difficulty": "beginner"})
+        for i in range(60)
+    ]
+    store.append_questions_sharded(CONTAINER, blob, dated[:40])
+    store.append_questions_sharded(CONTAINER, blob, dated[40:])
+
+    store.load_archive_index(CONTAINER, blob)  # warm the ETag cache, as a long-lived worker would
+    before = svc.bytes_downloaded
+    rec = store.question_for_date(CONTAINER, blob, date(2025, 7, 15))
+    assert rec["question"].startswith("q44") and rec["date_ordinal"] == date(2025, 7, 15).toordinal()
+    assert svc.bytes_downloaded - before < 400, "a date lookup should read one line, not the shard"
+
+    assert [r["question"][:3] for r in store.questions_for_topic(CONTAINER, blob, "Asyncio", limit=2)] == ["q55", "q58"]
+    assert [r["date"] for r in store.last_n_days(CONTAINER, blob, 3)] == ["2025-07-28", "2025-07-29", "2025-07-30"]
+    assert store.question_for_date(CONTAINER, blob, date(2024, 1, 1)) is None
+
+    incremental = store.load_json(CONTAINER, store.index_name(blob))
+    store.rebuild_archive_index(CONTAINER, blob)
+    assert store.load_json(CONTAINER, store.index_name(blob)) == incremental
+
+    # A re-run with another topic moves the date out of its old topic list
+    store.append_question_sharded(CONTAINER, blob, {"question": "rerun", "topic": "Asyncio",
+                                                    "difficulty": "advanced"}, date(2025, 6, 1))
+    assert store.questions_for_topic(CONTAINER, blob, "Asyncio", limit=1)[0]["question"][:3] == "q58"
+    assert "2025-06-01" not in store.load_archive_index(CONTAINER, blob).for_topic("Decorators")
+    assert [r["question"] for r in store.questions_for_topic(CONTAINER, blob, "Asyncio")][0] == "rerun"
+    assert store.load_archive_index(CONTAINER, blob).for_difficulty("advanced") == ["2025-06-01"]
+    print("Archive index (date/topic/last-N via ranged reads): OK")
+
+
+def check_queue():
+    days = [date(2025, 3, d) for d in (1, 2, 3)]
+    fill_queue(CONTAINER, days, lambda d: {"question": d.isoformat()}, "beginner")
+    assert dequeue_question(CONTAINER, date(2025, 3, 2), "beginner") == {"question": "2025-03-02"}
+    assert set(store.load_json(CONTAINER, "queue.json")) == {"2025-03-03"}
+    assert dequeue_question(CONTAINER, date(2025, 3, 3), "advanced") is None
+    print("Question queue: OK")
+
+
+def main():
+    svc = fake_blob.FakeBlobService()
+    store.set_service_client(svc)
+    assert store._service_client() is svc
+
+    check_etag_cache(svc)
+    check_conditional_writes()
+    check_shards(svc)
+    check_missing_dates()
+    check_archive_index(svc)
+    check_queue()
+    print(f"Storage calls: {dict(svc.calls)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+from datetime import date
+
+import answer_tally as tally
+import fake_blob
+import fake_linkedin
+import quiz_store as store
+import send_it
+
+# Answer tallies against the local LinkedIn and Blob stand-ins:
+#     python tally_local_test.py
+
+CONTAINER = "quizdata"
+BLOB = "questions.json"
+QUESTION = {"question": "q", "choices": ["1", "2", "3", "4"], "answer": "2", "explanation": ""}
+
+
+def check_extract_answer():
+    cases = {
+        "B": "B", "(c)": "C", "d.": "D", "B) because slices stop early": "B",
+        "The answer is C": "C", "option b": "B", "I'd go with (D), easy one": "D",
+        "Pretty sure it's C, the set drops duplicates": "C",
+        "A": "A", "a!": "A", "I think this one is tricky": None, "Great post!": None,
+        "E": None, "A or B?": None,
+    }
+    for text, expected in cases.items():
+        got = tally.extract_answer(text)
+        assert got == expected, f"{text!r}: expected {expected}, got {got}"
+    print("Answer extraction: OK")
+
+
+def check_incremental(server):
+    urn = "urn:li:share:42"
+    store.save_json(CONTAINER, tally.tally_name(BLOB), {})
+    tally.register_post(CONTAINER, BLOB, date(2025, 5, 1), urn, QUESTION)
+    for i, text in enumerate(["B", "answer is A", "B!", "nice one", "C"]):
+        server.add_comment(urn, f"urn:li:person:r{i}", text)
+    # The same reader changing their mind only counts once
+    server.add_comment(urn, "urn:li:person:r0", "actually C")
+
+    old_page = tally.PAGE_SIZE
+    tally.PAGE_SIZE = 2
+    try:
+        saved = tally.refresh_tallies("fake-token", CONTAINER, BLOB, today=date(2025, 5, 2))
+        entry = saved["2025-05-01"]
+        assert entry["counts"] == {"B": 2, "A": 1, "C": 1}, entry
+        assert entry["start"] == 6
+        assert tally.summary_line(entry) == "📊 4 answers, 50% correct"
+
+        before = server.calls[200]
+        server.add_comment(urn, "urn:li:person:r9", "B")
+        entry = tally.refresh_tallies("fake-token", CONTAINER, BLOB, today=date(2025, 5, 2))["2025-05-01"]
+        assert entry["counts"]["B"] == 3 and entry["start"] == 7, entry
+        # Resumed from the cursor: one page, not the whole comment history again
+        assert server.calls[200] - before == 1, server.calls
+    finally:
+        tally.PAGE_SIZE = old_page
+
+    # Old posts are left alone
+    assert tally.refresh_tallies("fake-token", CONTAINER, BLOB, today=date(2025, 6, 1)) == {}
+    print("Incremental tallies with paging cursor: OK")
+
+
+def check_posted_urn():
+    from new_post import _compose_message, _posted_urn
+
+    resp = send_it.post_text_update("fake-token", "urn:li:person:me", "hello")
+    assert _posted_urn(resp) == resp.json()["id"]
+    entry = tally.load_tallies(CONTAINER, BLOB)["2025-05-01"]
+    message = _compose_message({"question": "q", "choices": ["1", "2"], "answer": "2"}, QUESTION, entry)
+    assert "📊 5 answers, 60% correct" in message, message
+    print("Post URN + tally line in message: OK")
+
+
+def main():
+    store.set_service_client(fake_blob.FakeBlobService())
+    server = fake_linkedin.FakeLinkedIn().start()
+    send_it.LINKEDIN_API_BASE = server.base_url
+    send_it.LINKEDIN_UGC_URL = f"{server.base_url}/v2/ugcPosts"
+    try:
+        check_extract_answer()
+        check_incremental(server)
+        check_posted_urn()
+    finally:
+        server.shutdown()
+    print("All tally checks passed ✅")
+
+
+if __name__ == "__main__":
+    main()
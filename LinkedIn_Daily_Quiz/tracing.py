@@ -0,0 +1,172 @@
+import contextvars
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    from opentelemetry import trace as _otel_trace
+except ImportError:
+    _otel_trace = None
+
+# QUIZ_TRACE picks where spans go:
+#   otel    - OpenTelemetry (default once a TracerProvider is set, e.g. by configure_azure_monitor())
+#   file    - one JSON line per span appended to QUIZ_TRACE_FILE (default quiz_trace.jsonl)
+#   console - one log line per span (default otherwise)
+#   off     - nothing
+TRACE_ENV = "QUIZ_TRACE"
+TRACE_FILE_ENV = "QUIZ_TRACE_FILE"
+DEFAULT_TRACE_FILE = "quiz_trace.jsonl"
+TRACER_NAME = "linkedin_daily_quiz"
+
+_current = contextvars.ContextVar("quiz_span", default=None)
+_file_lock = threading.Lock()
+
+
+def _otel_configured():
+    # Installed but never configured, OpenTelemetry hands out non-recording spans,
+    # so the default only switches to otel once a real provider is in place
+    if _otel_trace is None:
+        return False
+    provider = _otel_trace.get_tracer_provider()
+    return not isinstance(provider, (_otel_trace.ProxyTracerProvider, _otel_trace.NoOpTracerProvider))
+
+
+def _mode():
+    mode = os.getenv(TRACE_ENV, "").strip().lower()
+    if mode == "otel" and _otel_trace is None:
+        return "console"
+    return mode or ("otel" if _otel_configured() else "console")
+
+
+class Span:
+    """
+        Local span with the same fields an OTLP exporter writes (trace/span ids,
+        parent, start/end in ns, attributes, status, events). Used when
+        OpenTelemetry isn't installed or QUIZ_TRACE is file/console.
+    """
+    def __init__(self, name, parent=None, attributes=None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent.span_id if parent else None
+        self.attributes = dict(attributes or {})
+        self.events = []
+        self.status = "OK"
+        self.status_description = None
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes):
+        self.attributes.update(attributes)
+
+    def add_event(self, name, attributes=None):
+        self.events.append({"name": name, "time_unix_nano": time.time_ns(), "attributes": attributes or {}})
+
+    def record_exception(self, exc):
+        self.status = "ERROR"
+        self.status_description = f"{type(exc).__name__}: {exc}"
+        self.add_event("exception", {"exception.type": type(exc).__name__, "exception.message": str(exc)})
+
+    @property
+    def duration_ms(self):
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "status": {"code": self.status, "description": self.status_description},
+            "events": self.events,
+        }
+
+
+def _export(span, mode):
+    if mode == "file":
+        line = json.dumps(span.to_dict(), default=str)
+        with _file_lock, open(os.getenv(TRACE_FILE_ENV, DEFAULT_TRACE_FILE), "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    elif mode == "console":
+        attrs = " ".join(f"{k}={v}" for k, v in span.attributes.items())
+        log = logging.warning if span.status == "ERROR" else logging.info
+        log("🔎 span %s %.1fms %s%s", span.name, span.duration_ms, attrs,
+            f" error={span.status_description}" if span.status == "ERROR" else "")
+
+
+class _NoopSpan:
+    def set_attribute(self, key, value):
+        pass
+
+    def set_attributes(self, attributes):
+        pass
+
+    def add_event(self, name, attributes=None):
+        pass
+
+    def record_exception(self, exc):
+        pass
+
+
+@contextmanager
+def span(name, **attributes):
+    """
+        Time a block as a child of the current span:
+
+            with tracing.span("openai.generate_json", model=model) as s:
+                ...
+                s.set_attribute("retries", 2)
+
+        Exceptions are recorded on the span and re-raised.
+    """
+    mode = _mode()
+    if mode == "off":
+        yield _NoopSpan()
+        return
+    if mode == "otel":
+        tracer = _otel_trace.get_tracer(TRACER_NAME)
+        with tracer.start_as_current_span(name, attributes=attributes) as otel_span:
+            yield otel_span
+        return
+
+    s = Span(name, _current.get(), attributes)
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.record_exception(e)
+        raise
+    finally:
+        _current.reset(token)
+        s.end_ns = time.time_ns()
+        _export(s, mode)
+
+
+def current_span():
+    """The active span (a no-op object when there is none or tracing is off)."""
+    if _mode() == "otel":
+        return _otel_trace.get_current_span()
+    return _current.get() or _NoopSpan()
+
+
+def bind(fn):
+    """
+        Run `fn` in a copy of the caller's context, so spans it opens in a worker
+        thread (ThreadPoolExecutor.submit) nest under the caller's span.
+    """
+    ctx = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return ctx.run(fn, *args, **kwargs)
+    return run
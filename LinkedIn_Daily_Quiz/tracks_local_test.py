@@ -0,0 +1,94 @@
+import os
+from datetime import date
+
+import fake_blob
+import fake_linkedin
+import fake_openai
+import new_post
+import quiz_store as store
+import send_it
+from openai_prompt import STATS, OpenAIPrompt
+
+# Multi-track generation and posting against the local OpenAI, LinkedIn and Blob stand-ins:
+#     python tracks_local_test.py
+
+CONTAINER = "quizdata"
+BLOB = "questions.json"
+TRACKS = ["beginner", "intermediate", "advanced"]
+
+
+def check_batch_regenerates_bad_items():
+    original = OpenAIPrompt.generate_json
+
+    def spoil_batch(self, **kwargs):
+        data = original(self, **kwargs)
+        if kwargs.get("schema") is new_post.QUIZ_BATCH_SCHEMA:
+            items = data["questions"]
+            items[0]["answer"] = "not one of the choices"
+            del items[2]
+        return data
+
+    OpenAIPrompt.generate_json = spoil_batch
+    STATS.reset()
+    try:
+        slots = [("beginner", "Functions"), ("intermediate", "Decorators"), ("advanced", "Asyncio")]
+        questions = new_post._generate_quiz_batch(slots, seed=1, api_key="fake")
+    finally:
+        OpenAIPrompt.generate_json = original
+    assert all(not new_post._quiz_problems(q) for q in questions), questions
+    assert [(q["difficulty"], q["topic"]) for q in questions] == slots
+    # One batch call, then only the two bad slots on their own
+    assert STATS.calls == 3, STATS.snapshot()
+    print("Batch with per-item validation and regeneration: OK")
+
+
+def check_tracks(linkedin):
+    STATS.reset()
+    posted = {}
+
+    def publisher(track):
+        def publish(text):
+            posted[track] = text
+            return send_it.post_text_update("fake-token", f"urn:li:person:{track}", text)
+        return publish
+
+    results = new_post.run_daily_tracks({t: publisher(t) for t in TRACKS}, primary="beginner",
+                                        api_key="fake", container=CONTAINER, blob=BLOB)
+    assert STATS.calls == 1, STATS.snapshot()
+    assert set(results) == set(TRACKS)
+    assert "Daily Python Quiz · Advanced" in posted["advanced"]
+
+    today = date.today().isoformat()
+    for track in TRACKS:
+        blob = store.track_blob(BLOB, track, "beginner")
+        latest = store.load_latest(CONTAINER, blob)
+        assert latest["date"] == today and latest["difficulty"] == track, (track, latest)
+    assert store.track_blob(BLOB, "beginner", "beginner") == BLOB
+    assert store.track_blob(BLOB, "advanced", "beginner") == "questions-advanced.json"
+    topics = {store.load_latest(CONTAINER, store.track_blob(BLOB, t, "beginner"))["topic"] for t in TRACKS}
+    assert len(topics) == len(TRACKS), topics
+    assert len(linkedin.posts) == len(TRACKS)
+    print("Three tracks from one model request, stored and posted separately: OK")
+
+
+def main():
+    for name in ("QUIZ_CACHE_DIR", "QUIZ_CACHE_CONTAINER"):
+        os.environ.pop(name, None)
+    ai = fake_openai.FakeOpenAI(seed=7).start()
+    linkedin = fake_linkedin.FakeLinkedIn().start()
+    os.environ["OPENAI_BASE_URL"] = ai.base_url
+    send_it.LINKEDIN_API_BASE = linkedin.base_url
+    send_it.LINKEDIN_UGC_URL = f"{linkedin.base_url}/v2/ugcPosts"
+    send_it.AUTHOR_MIN_INTERVAL = 0
+    store.set_service_client(fake_blob.FakeBlobService())
+    try:
+        check_batch_regenerates_bad_items()
+        check_tracks(linkedin)
+    finally:
+        ai.shutdown()
+        linkedin.shutdown()
+    print("All track checks passed ✅")
+
+
+if __name__ == "__main__":
+    main()
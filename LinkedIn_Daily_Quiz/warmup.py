@@ -0,0 +1,126 @@
+import importlib
+import logging
+import os
+import threading
+import time
+
+# Cold-start helper for the function app. When the host loads function_app.py,
+# start_background() imports the heavy modules and builds the process-wide clients
+# (blob service, pooled HTTP client, OpenAI) on a daemon thread, so the first
+# invocation finds them ready. They live in module globals (quiz_store._service,
+# http_client._default, openai_prompt._clients), so every later invocation on the same
+# warm host reuses them. Only the standard library is imported here.
+
+WARMUP_ENV = "QUIZ_WARMUP"
+
+# Set when this module is first imported, i.e. when the host loads the app
+LOADED_AT = time.perf_counter()
+
+_lock = threading.Lock()
+_thread = None
+_done = threading.Event()
+_invocations = 0
+
+# step -> seconds (or "error: ...") from the last warm_up(); written by the warm-up
+# thread while handlers may be reading it, so go through _timings_lock
+TIMINGS = {}
+_timings_lock = threading.Lock()
+
+
+def _openai_key():
+    return os.getenv("OPENAI_KEY") or os.getenv("OPENAI_API_KEY")
+
+
+def _blob_service():
+    import quiz_store
+    if os.getenv(quiz_store.CONN_ENV):
+        quiz_store._service_client()
+
+
+def _http_session():
+    import http_client
+    http_client.default_client().session
+
+
+def _openai_client():
+    if _openai_key():
+        import openai_prompt
+        openai_prompt.shared_client(_openai_key())
+
+
+# Cheapest first: a daily run whose question is queued only needs the first four
+STEPS = [
+    ("import quiz_store", lambda: importlib.import_module("quiz_store")),
+    ("blob service client", _blob_service),
+    ("import send_it", lambda: importlib.import_module("send_it")),
+    ("http session", _http_session),
+    ("import new_post", lambda: importlib.import_module("new_post")),
+    ("openai client", _openai_client),
+]
+
+
+def warm_up():
+    """
+        Run every warm-up step in order and return {step: seconds}.
+        A failing step is logged and recorded as "error: ..."; the rest still run,
+        and the handler hits the same error (with a proper message) when it gets there.
+    """
+    for name, step in STEPS:
+        start = time.perf_counter()
+        try:
+            step()
+            result = round(time.perf_counter() - start, 4)
+        except Exception as e:
+            result = f"error: {type(e).__name__}: {e}"
+            logging.warning("Warm-up step %r failed: %s", name, e)
+        with _timings_lock:
+            TIMINGS[name] = result
+    _done.set()
+    return timings()
+
+
+def timings():
+    """
+        Snapshot of TIMINGS, safe to take while the warm-up thread is still running.
+    """
+    with _timings_lock:
+        return dict(TIMINGS)
+
+
+def start_background():
+    """
+        Start warm_up() on a daemon thread, once per process (QUIZ_WARMUP=0 turns it off).
+    """
+    global _thread
+    if os.getenv(WARMUP_ENV, "1") == "0":
+        return None
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=warm_up, name="quiz-warmup", daemon=True)
+            _thread.start()
+    return _thread
+
+
+def invocation_attributes():
+    """
+        Span attributes describing this invocation's start-up cost:
+        - cold_start: True for the first invocation in this process
+        - host_age_s: seconds since the app module was loaded
+        - warmup_done: whether the background warm-up had finished
+        - warmup.<step>_ms: how long each warm-up step took
+    """
+    global _invocations
+    with _lock:
+        _invocations += 1
+        first = _invocations == 1
+    attrs = {
+        "cold_start": first,
+        "host_age_s": round(time.perf_counter() - LOADED_AT, 3),
+        "warmup_done": _done.is_set(),
+    }
+    for name, value in timings().items():
+        key = "warmup." + name.replace(" ", "_")
+        attrs[key + "_ms" if isinstance(value, float) else key] = (
+            round(value * 1000, 1) if isinstance(value, float) else value
+        )
+    return attrs
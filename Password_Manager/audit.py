@@ -0,0 +1,152 @@
+import hashlib
+import hmac
+import json
+import math
+import os
+import secrets
+import string
+
+from storage import read_json, update_json, write_json
+
+AUDIT_FILE = "audit.json"
+AUDIT_KEY_FILE = "audit.key"
+
+# Entropy thresholds (bits) for the strength labels
+STRENGTH_LEVELS = [(40, "weak"), (60, "fair"), (80, "strong")]
+WEAK_BELOW = 40
+
+
+def entropy_bits(password):
+    """Estimate entropy as length * log2(character pool); repeated characters count half."""
+    if not password:
+        return 0.0
+    pool = 0
+    if any(c in string.ascii_lowercase for c in password):
+        pool += 26
+    if any(c in string.ascii_uppercase for c in password):
+        pool += 26
+    if any(c in string.digits for c in password):
+        pool += 10
+    if any(not c.isalnum() for c in password):
+        pool += 33
+    effective_len = (len(password) + len(set(password))) / 2
+    return round(effective_len * math.log2(pool), 1)
+
+
+def strength_label(bits):
+    for limit, label in STRENGTH_LEVELS:
+        if bits < limit:
+            return label
+    return "very strong"
+
+
+class AuditIndex:
+    """
+    Incrementally maintained reuse/strength index. Passwords are stored only as
+    HMAC fingerprints under a local key, so audit.json never holds plain text.
+    """
+
+    def __init__(self, path=AUDIT_FILE, key_path=AUDIT_KEY_FILE):
+        self.path = path
+        self.key = self._load_key(key_path)
+        self._load(read_json(path, {})[0])
+
+    def _load(self, stored):
+        self.reuse = stored.get("reuse", {})
+        self.entries = stored.get("entries", {})
+
+    @staticmethod
+    def _load_key(key_path):
+        try:
+            with open(key_path, "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            pass
+        key = secrets.token_bytes(32)
+        try:
+            fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            # Another process created it first; use theirs
+            with open(key_path, "rb") as file:
+                return file.read()
+        with os.fdopen(fd, "wb") as file:
+            file.write(key)
+        return key
+
+    def fingerprint(self, password):
+        return hmac.new(self.key, password.encode("utf-8"), hashlib.sha256).hexdigest()
+
+    def _state(self):
+        return {"reuse": self.reuse, "entries": self.entries}
+
+    def _record(self, site, password):
+        self._forget(site)
+        fp = self.fingerprint(password)
+        bits = entropy_bits(password)
+        self.entries[site] = {"hash": fp, "entropy": bits, "strength": strength_label(bits)}
+        self.reuse.setdefault(fp, []).append(site)
+
+    def _update(self, change):
+        """Apply change() to the latest on-disk index, so other processes' edits are kept."""
+        def _apply(stored):
+            self._load(stored)
+            change()
+            return self._state()
+        update_json(self.path, _apply, default={})
+
+    def add(self, site, password):
+        """Index one new or changed entry; called from BinaryTree.add."""
+        self._update(lambda: self._record(site, password))
+
+    def add_many(self, passwords):
+        """Index a batch of {site: password} changes in one write."""
+        def _record_all():
+            for site, password in passwords.items():
+                self._record(site, password)
+        self._update(_record_all)
+
+    def remove(self, site):
+        self._update(lambda: self._forget(site))
+
+    def _forget(self, site):
+        entry = self.entries.pop(site, None)
+        if entry is None:
+            return
+        sites = self.reuse.get(entry["hash"], [])
+        if site in sites:
+            sites.remove(site)
+        if not sites:
+            self.reuse.pop(entry["hash"], None)
+
+    def rebuild(self, data):
+        """Recompute from the vault; only needed once for vaults created before auditing."""
+        self.reuse = {}
+        self.entries = {}
+        for site, node in data.items():
+            self._record(site, node["password"])
+        write_json(self.path, self._state())
+
+    def shared_with(self, password, exclude=None):
+        """Sites already using this password (for the save dialog warning)."""
+        self._load(read_json(self.path, {})[0])
+        return [s for s in self.reuse.get(self.fingerprint(password), []) if s != exclude]
+
+    def report(self):
+        """Reused groups and weak entries, read straight from the index."""
+        return {
+            "reused": [sorted(sites) for sites in self.reuse.values() if len(sites) > 1],
+            "weak": sorted(s for s, e in self.entries.items() if e["entropy"] < WEAK_BELOW),
+            "entries": self.entries,
+        }
+
+
+if __name__ == "__main__":
+    index = AuditIndex()
+    if not index.entries and os.path.exists("data.json"):
+        with open("data.json", "r") as f:
+            index.rebuild(json.load(f))
+    result = index.report()
+    for group in result["reused"]:
+        print("Reused:", ", ".join(group))
+    for site in result["weak"]:
+        print(f"Weak: {site} ({result['entries'][site]['entropy']} bits)")
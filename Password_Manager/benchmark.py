@@ -0,0 +1,251 @@
+import argparse
+import json
+import os
+import platform
+import random
+import string
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from bst import BinaryTree, DATA_FILE
+from vault_view import PAGE_ROWS, VaultView
+from generator import DEFAULT_POLICY, Policy, generate_many
+from storage import write_json
+
+# Full JSON rewrites make adds O(n); pass --sizes 100000,1000000 for the large runs
+DEFAULT_SIZES = [1_000, 10_000]
+DEFAULT_SAMPLES = 20
+DEFAULT_GEN_COUNT = 10_000
+
+# Rough English first-letter frequencies, so the index distribution is as lumpy as a real vault
+FIRST_LETTER_WEIGHTS = {
+    "a": 11.7, "b": 4.4, "c": 5.2, "d": 3.2, "e": 2.8, "f": 4.0, "g": 1.6, "h": 4.2, "i": 7.3,
+    "j": 0.5, "k": 0.9, "l": 2.4, "m": 3.8, "n": 2.3, "o": 7.6, "p": 4.3, "q": 0.2, "r": 2.8,
+    "s": 6.7, "t": 16.0, "u": 1.2, "v": 0.8, "w": 5.5, "x": 0.05, "y": 0.8, "z": 0.05,
+}
+WORDS = ["mail", "bank", "shop", "cloud", "news", "play", "book", "home", "travel", "music",
+         "photo", "forum", "hub", "box", "net", "store", "pay", "learn", "code", "chat"]
+TLDS = [".com", ".org", ".net", ".io", ".co.uk", ".de", ""]
+
+
+def site_names(count, rng, order="random"):
+    """Unique, realistic-looking site names with a skewed first-letter distribution."""
+    letters = list(FIRST_LETTER_WEIGHTS)
+    weights = list(FIRST_LETTER_WEIGHTS.values())
+    names = set()
+    while len(names) < count:
+        stem = rng.choices(letters, weights)[0] + "".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 6)))
+        name = stem + rng.choice(WORDS) + rng.choice(TLDS)
+        if rng.random() < 0.3:
+            name += str(rng.randint(1, 999))
+        names.add(name)
+    names = list(names)
+    if order == "sorted":
+        names.sort()
+    else:
+        rng.shuffle(names)
+    return names
+
+
+def synthetic_vault(names, rng):
+    pool = string.ascii_letters + string.digits + "!#$%&()*+"
+    data = {}
+    for name in names:
+        data[name] = {
+            "email": f"user{rng.randint(1, 5)}@example.com",
+            "password": "".join(rng.choices(pool, k=14)),
+            "index": BinaryTree.index_for(name),
+            "parent": None,
+            "left_child": None,
+            "right_child": None,
+        }
+    return data
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def _latency_stats(samples):
+    samples = sorted(samples)
+    if not samples:
+        return {}
+    return {
+        "count": len(samples),
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 4),
+        "p50_ms": round(samples[len(samples) // 2] * 1000, 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 4),
+        "max_ms": round(samples[-1] * 1000, 4),
+    }
+
+
+def _peak(fn):
+    tracemalloc.start()
+    try:
+        elapsed, result = _timed(fn)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak, result
+
+
+class BstJsonBackend:
+    """The GUI's storage: BinaryTree over data.json with full-file rewrites."""
+    name = "bst-json"
+
+    def bulk_load(self, data):
+        write_json(DATA_FILE, data)
+        self.tree = BinaryTree()
+        self.tree.treeify()
+
+    def add(self, name, password, email):
+        self.tree.add(name, password, email)
+
+    def search(self, name):
+        return self.tree.search_tree(name)
+
+    def size_bytes(self):
+        return os.path.getsize(DATA_FILE)
+
+
+BACKENDS = {BstJsonBackend.name: BstJsonBackend}
+
+
+def run_case(backend_cls, size, order, samples, seed):
+    rng = random.Random(seed)
+    names = site_names(size + samples + 1, rng, order)
+    existing, extra = names[:size], names[size:]
+    data = synthetic_vault(existing, rng)
+
+    # Latencies are measured untraced; tracemalloc slows allocation-heavy code several-fold,
+    # so peak memory comes from separate traced runs of a bulk load and a single add.
+    backend = backend_cls()
+    load_s, _ = _timed(lambda: backend.bulk_load(data))
+
+    hits = rng.sample(existing, min(samples, len(existing)))
+    search_times = [_timed(lambda n=n: backend.search(n))[0] for n in hits]
+    miss_times = [_timed(lambda n=n: backend.search(n + "-missing"))[0] for n in hits]
+    add_times = [_timed(lambda n=n: backend.add(n, "Pw!" + n[:8], "bench@example.com"))[0]
+                 for n in extra[:-1]]
+    file_bytes = backend.size_bytes()
+
+    _, add_peak, _ = _peak(lambda: backend.add(extra[-1], "Pw!traced", "bench@example.com"))
+    _, load_peak, _ = _peak(lambda: backend_cls().bulk_load(data))
+
+    return {
+        "backend": backend_cls.name,
+        "size": size,
+        "order": order,
+        "bulk_load_s": round(load_s, 4),
+        "bulk_load_peak_bytes": load_peak,
+        "search_hit": _latency_stats(search_times),
+        "search_miss": _latency_stats(miss_times),
+        "add": _latency_stats(add_times),
+        "add_peak_bytes": add_peak,
+        "file_bytes": file_bytes,
+    }
+
+
+def run_generator(count):
+    """Bulk generation throughput (passwords/second) per policy, as used by vault.rotate."""
+    results = []
+    for label, policy in (("default", DEFAULT_POLICY), ("passphrase", Policy(passphrase=True))):
+        elapsed, _ = _timed(lambda: generate_many(count, policy))
+        results.append({
+            "policy": label,
+            "count": count,
+            "seconds": round(elapsed, 4),
+            "per_second": round(count / elapsed) if elapsed else None,
+        })
+    return results
+
+
+def run_browser(size, seed):
+    """Browse-pane costs over a vault of `size` entries: build, sort, a typed filter and paging."""
+    rng = random.Random(seed)
+    data = synthetic_vault(site_names(size, rng), rng)
+    entries = {name: {"entropy": rng.uniform(20, 120), "strength": "fair"} for name in data}
+
+    build_s, view = _timed(lambda: VaultView(data, entries))
+    sort_s, _ = _timed(lambda: view.sort("strength"))
+    query = next(iter(data))[:4]
+    keystrokes = [_timed(lambda i=i: view.filter(query[:i]))[0] for i in range(1, len(query) + 1)]
+    view.filter("")
+    offsets = [rng.randrange(max(1, size - PAGE_ROWS)) for _ in range(200)]
+    page_times = [_timed(lambda o=o: view.page(o, PAGE_ROWS))[0] for o in offsets]
+    _, build_peak, _ = _peak(lambda: VaultView(data, entries))
+    return {
+        "size": size,
+        "build_s": round(build_s, 4),
+        "build_peak_bytes": build_peak,
+        "sort_s": round(sort_s, 4),
+        "filter_keystroke": _latency_stats(keystrokes),
+        "page": _latency_stats(page_times),
+    }
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Password_Manager storage and search")
+    parser.add_argument("--sizes", type=lambda s: [int(x) for x in s.split(",")], default=DEFAULT_SIZES,
+                        help="comma-separated vault sizes (e.g. 1000,10000,1000000)")
+    parser.add_argument("--orders", default="random,sorted", help="insert orders: random,sorted")
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES, help="timed adds/searches per case")
+    parser.add_argument("--gen-count", type=int, default=DEFAULT_GEN_COUNT,
+                        help="passwords per generator throughput run (0 to skip)")
+    parser.add_argument("--browse-size", type=int, default=100_000,
+                        help="vault size for the browse-pane timings (0 to skip)")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--out", help="write JSON results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    results = []
+    for backend_name in args.backends.split(","):
+        for size in args.sizes:
+            for order in args.orders.split(","):
+                with tempfile.TemporaryDirectory() as workdir:
+                    cwd = os.getcwd()
+                    os.chdir(workdir)
+                    try:
+                        case = run_case(BACKENDS[backend_name], size, order, args.samples, args.seed)
+                    finally:
+                        os.chdir(cwd)
+                print(f"{backend_name} n={size} {order}: load {case['bulk_load_s']}s, "
+                      f"search p50 {case['search_hit'].get('p50_ms')}ms, add p50 {case['add'].get('p50_ms')}ms",
+                      file=sys.stderr)
+                results.append(case)
+
+    report = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "samples": args.samples,
+        "results": results,
+        "generator": run_generator(args.gen_count) if args.gen_count else [],
+        "browser": run_browser(args.browse_size, args.seed) if args.browse_size else None,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import hashlib
+import mmap
+import os
+import struct
+import sys
+
+# Sorted SHA-1 download from Have I Been Pwned ("HASH:COUNT" per line, ordered by hash)
+BREACH_FILE = os.getenv("PM_BREACH_FILE", "pwned-passwords-sha1-ordered-by-hash.txt")
+BLOOM_SUFFIX = ".bloom"
+
+# 10 bits per entry and 7 probes gives roughly a 1% false-positive rate
+BLOOM_BITS_PER_ITEM = 10
+BLOOM_HASHES = 7
+BLOOM_HEADER = struct.Struct(">QI")
+
+
+def _sha1(password):
+    return hashlib.sha1(password.encode("utf-8")).digest()
+
+
+class BloomFilter:
+    """Bit array keyed by raw SHA-1 digests; answers "definitely not present" quickly."""
+
+    def __init__(self, size_bits, num_hashes=BLOOM_HASHES, bits=None, offset=0):
+        self.size = max(8, size_bits)
+        self.k = num_hashes
+        self.bits = bits if bits is not None else bytearray((self.size + 7) // 8)
+        self._offset = offset
+
+    def _positions(self, digest):
+        # SHA-1 output is already uniform, so slice it instead of hashing again
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        for i in range(self.k):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, digest):
+        for pos in self._positions(digest):
+            self.bits[self._offset + (pos >> 3)] |= 1 << (pos & 7)
+
+    def __contains__(self, digest):
+        for pos in self._positions(digest):
+            if not self.bits[self._offset + (pos >> 3)] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(BLOOM_HEADER.pack(self.size, self.k))
+            f.write(self.bits)
+
+    @classmethod
+    def load(cls, path):
+        """Memory-map a saved filter so a multi-GB filter costs nothing to open."""
+        with open(path, "rb") as f:
+            bits = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        size, k = BLOOM_HEADER.unpack_from(bits, 0)
+        return cls(size, k, bits=bits, offset=BLOOM_HEADER.size)
+
+
+class BreachChecker:
+    """Offline lookup against a sorted HIBP hash file using mmap + binary search."""
+
+    def __init__(self, hash_file=BREACH_FILE, bloom_file=None):
+        self._file = open(hash_file, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        bloom_file = bloom_file or hash_file + BLOOM_SUFFIX
+        self.bloom = BloomFilter.load(bloom_file) if os.path.exists(bloom_file) else None
+
+    def close(self):
+        if self.bloom is not None and isinstance(self.bloom.bits, mmap.mmap):
+            self.bloom.bits.close()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _lookup(self, hex_hash):
+        """Binary search over byte offsets, snapping each probe to the start of its line."""
+        m = self._map
+        lo, hi = 0, len(m)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = m.rfind(b"\n", 0, mid) + 1
+            end = m.find(b"\n", start)
+            if end == -1:
+                end = len(m)
+            key, _, count = m[start:end].strip().partition(b":")
+            if key == hex_hash:
+                try:
+                    return int(count)
+                except ValueError:
+                    return 1
+            if key < hex_hash:
+                lo = end + 1
+            else:
+                hi = start
+        return 0
+
+    def _count_digest(self, digest):
+        if self.bloom is not None and digest not in self.bloom:
+            return 0
+        return self._lookup(digest.hex().upper().encode("ascii"))
+
+    def check(self, password):
+        """Return how many times the password appears in the breach corpus (0 = not found)."""
+        return self._count_digest(_sha1(password))
+
+    def check_many(self, passwords):
+        """
+        Check a batch of passwords at once. Lookups run in hash order so the
+        mmap pages are touched front to back. Returns {password: count}.
+        """
+        digests = sorted((_sha1(pw), pw) for pw in set(passwords))
+        return {pw: self._count_digest(d) for d, pw in digests}
+
+    def audit_vault(self, data):
+        """Return {site: count} for every vault entry whose password is breached."""
+        counts = self.check_many(node["password"] for node in data.values())
+        return {site: counts[node["password"]] for site, node in data.items()
+                if counts[node["password"]]}
+
+
+def build_bloom(hash_file=BREACH_FILE, bloom_file=None):
+    """One-off pass over the hash file to write the Bloom filter next to it."""
+    bloom_file = bloom_file or hash_file + BLOOM_SUFFIX
+
+    lines = 0
+    with open(hash_file, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 24), b""):
+            lines += chunk.count(b"\n")
+
+    bloom = BloomFilter(max(lines, 1) * BLOOM_BITS_PER_ITEM)
+    with open(hash_file, "rb") as f:
+        for line in f:
+            key = line.split(b":", 1)[0].strip()
+            if len(key) == 40:
+                bloom.add(bytes.fromhex(key.decode("ascii")))
+    bloom.save(bloom_file)
+    return bloom_file
+
+
+_checker = None
+
+
+def get_checker():
+    """Shared checker for the GUI; None when no breach file has been downloaded."""
+    global _checker
+    if _checker is None and os.path.exists(BREACH_FILE):
+        _checker = BreachChecker(BREACH_FILE)
+    return _checker
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "build":
+        print(f"Bloom filter written to {build_bloom()}")
+    elif len(sys.argv) > 1 and sys.argv[1] == "audit":
+        import json
+        with open("data.json", "r") as file:
+            vault = json.load(file)
+        with BreachChecker() as checker:
+            for site, count in sorted(checker.audit_vault(vault).items()):
+                print(f"{site}: seen {count} times")
+    else:
+        print("Usage: python breach_check.py build | audit")
@@ -0,0 +1,138 @@
+import pyperclip
+from tkinter import Entry, Frame, Label, Scrollbar, StringVar, messagebox
+from tkinter import ttk
+
+from vault_view import PAGE_ROWS, VaultView
+
+# Vault browser: a Treeview that only ever holds one screenful of rows. The
+# scrollbar is driven by hand, and scrolling refills those rows from the sorted,
+# filtered list of site names, so a 100k-entry vault costs one list of names
+# rather than 100k widget items.
+
+FILTER_DELAY_MS = 150
+WHEEL_ROWS = 3
+
+COLUMNS = ("site", "email", "strength")
+HEADINGS = {"site": "Website", "email": "Email/Username", "strength": "Strength"}
+WIDTHS = {"site": 200, "email": 200, "strength": 90}
+
+
+class VaultBrowser(Frame):
+    """
+    Browse pane: live filter box, sortable columns and a virtual scrollbar.
+    Double-click a row to copy its password to the clipboard.
+    """
+
+    def __init__(self, master, tree, rows=PAGE_ROWS, **kwargs):
+        super().__init__(master, **kwargs)
+        self.tree = tree
+        self.rows = rows
+        self.offset = 0
+        self._shown = []
+        self._filter_job = None
+        self.view = VaultView(tree.data, tree.audit.entries)
+
+        self.filter_var = StringVar()
+        Label(self, text="Filter:").grid(column=0, row=0, sticky="w")
+        Entry(self, textvariable=self.filter_var, width=32).grid(column=1, row=0, sticky="we")
+        self.count_label = Label(self, text="")
+        self.count_label.grid(column=2, row=0, columnspan=2, sticky="e")
+        self.filter_var.trace_add("write", lambda *_: self._schedule_filter())
+
+        self.grid_view = ttk.Treeview(self, columns=COLUMNS, show="headings", height=rows, selectmode="browse")
+        for column in COLUMNS:
+            self.grid_view.heading(column, text=HEADINGS[column], command=lambda c=column: self.sort(c))
+            self.grid_view.column(column, width=WIDTHS[column], stretch=column != "strength")
+        self.grid_view.grid(column=0, row=1, columnspan=3, sticky="nsew", pady=(5, 0))
+
+        self.scrollbar = Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.grid(column=3, row=1, sticky="ns", pady=(5, 0))
+        self.columnconfigure(1, weight=1)
+
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.grid_view.bind(sequence, self._on_wheel)
+        self.grid_view.bind("<Up>", lambda e: self._step(-1))
+        self.grid_view.bind("<Down>", lambda e: self._step(1))
+        self.grid_view.bind("<Prior>", lambda e: self._step(-self.rows))
+        self.grid_view.bind("<Next>", lambda e: self._step(self.rows))
+        self.grid_view.bind("<Double-1>", self._copy_password)
+
+        self._render()
+
+    # --- Data ---
+
+    def reload(self):
+        """Pick up vault changes (e.g. after Add), keeping sort, filter and position."""
+        self.view = VaultView(self.tree.data, self.tree.audit.entries, self.view.sort_column,
+                              self.view.reverse, self.view.filter_text)
+        self._scroll_to(self.offset)
+
+    def sort(self, column):
+        self.view.sort(column)
+        self._scroll_to(0)
+
+    def _schedule_filter(self):
+        # Wait for a pause in typing so a fast typist doesn't filter 100k names per key
+        if self._filter_job is not None:
+            self.after_cancel(self._filter_job)
+        self._filter_job = self.after(FILTER_DELAY_MS, self._apply_filter)
+
+    def _apply_filter(self):
+        self._filter_job = None
+        self.view.filter(self.filter_var.get())
+        self._scroll_to(0)
+
+    # --- Scrolling ---
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self._scroll_to(round(float(amount) * len(self.view)))
+        elif action == "scroll":
+            self._step(int(amount) * (self.rows if unit == "pages" else 1))
+
+    def _on_wheel(self, event):
+        if getattr(event, "num", None) == 4 or event.delta > 0:
+            self._step(-WHEEL_ROWS)
+        else:
+            self._step(WHEEL_ROWS)
+        return "break"
+
+    def _step(self, rows):
+        self._scroll_to(self.offset + rows)
+        return "break"
+
+    def _scroll_to(self, offset):
+        self.offset = max(0, min(offset, len(self.view) - self.rows))
+        self._render()
+
+    def _render(self):
+        """Refill the fixed set of Treeview rows with the current page."""
+        page = self.view.page(self.offset, self.rows)
+        self._shown = [row[0] for row in page]
+        items = self.grid_view.get_children()
+        for i, values in enumerate(page):
+            iid = f"row{i}"
+            if i < len(items):
+                self.grid_view.item(iid, values=values)
+            else:
+                self.grid_view.insert("", "end", iid=iid, values=values)
+        for iid in items[len(page):]:
+            self.grid_view.delete(iid)
+
+        total = len(self.view)
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        arrow = " ▼" if self.view.reverse else " ▲"
+        for column in COLUMNS:
+            self.grid_view.heading(column, text=HEADINGS[column] + (arrow if column == self.view.sort_column else ""))
+        self.count_label["text"] = f"{total:,} of {len(self.view.data):,} sites"
+
+    def _copy_password(self, event):
+        iid = self.grid_view.identify_row(event.y)
+        if not iid:
+            return
+        site = self._shown[self.grid_view.index(iid)]
+        pyperclip.copy(self.view.data[site]["password"])
+        messagebox.showinfo(site, f"Password for {site} copied to the clipboard.")
@@ -1,4 +1,7 @@
-import json
+from audit import AuditIndex
+from storage import VersionConflict, read_json, update_json, write_json
+
+DATA_FILE = "data.json"
 
 ALPH_DICT = {"A": 1, "B": 2, "C": 3, "D": 4, "E": 5, "F": 6, "G": 7, "H": 8, "I": 9, "J": 10,
              "K": 11, "L": 12, "M": 13, "N": 14, "O": 15, "P": 16, "Q": 17, "R": 18, "S": 19,
@@ -6,97 +9,94 @@ ALPH_DICT = {"A": 1, "B": 2, "C": 3, "D": 4, "E": 5, "F": 6, "G": 7, "H": 8, "I"
 
 class BinaryTree:
     def __init__(self):
-        try:
-            with open("data.json", 'r') as file:
-                self.data = json.load(file)
-        except FileNotFoundError:
-            self.data = {}
-            with open("data.json", 'w') as file:
-                json.dump(self.data, file, indent=4)
-
-    def add(self, name, password, email):
+        self.data, version = read_json(DATA_FILE, {})
+        if version is None:
+            try:
+                write_json(DATA_FILE, self.data, expected_version=None)
+            except VersionConflict:
+                self.data, _ = read_json(DATA_FILE, {})
+        self.audit = AuditIndex()
+        if self.data and not self.audit.entries:
+            self.audit.rebuild(self.data)
+
+    @staticmethod
+    def index_for(name):
         try:
             first_letter = ALPH_DICT[name[0].upper()]
             last_letter = ALPH_DICT[name[-1].upper()]
-            index = int(f"{first_letter}{last_letter}")
-        except:
-            index = 27
-            new_data = {
-                name: {
-                    "email": email,
-                    "password": password,
-                    "index": index,
-                    "parent": None,
-                    "left_child": None,
-                    "right_child": None
-                }
+            return int(f"{first_letter}{last_letter}")
+        except (KeyError, IndexError):
+            return 27
+
+    def add(self, name, password, email):
+        index = self.index_for(name)
+        new_data = {
+            name: {
+                "email": email,
+                "password": password,
+                "index": index,
+                "parent": None,
+                "left_child": None,
+                "right_child": None
             }
-        try:
-            with open("data.json", 'r') as file:
-                self.data = json.load(file)
-                self.data.update(new_data)
-        except FileNotFoundError:
-            with open("data.json", "w") as file:
-                json.dump(new_data, file, indent=4)
-        else:
-            with open("data.json", "w") as file:
-                json.dump(self.data, file, indent=4)
-        self.treeify()
+        }
+
+        def _apply(data):
+            data.update(new_data)
+            self._link(data)
+
+        # New entry and relinked tree land in one atomic write
+        self.data = update_json(DATA_FILE, _apply, default={})
+        self.audit.add(name, password)
+
+    def set_passwords(self, passwords):
+        """Replace passwords for existing sites ({name: password}) in a single write."""
+        def _apply(data):
+            for name, password in passwords.items():
+                if name in data:
+                    data[name]["password"] = password
+
+        self.data = update_json(DATA_FILE, _apply, default={})
+        self.audit.add_many({n: p for n, p in passwords.items() if n in self.data})
 
     def treeify(self):
-        try:
-            with open("data.json", 'r') as file:
-                self.data = json.load(file)
-        except FileNotFoundError:
-            return
-        if not self.data:
+        self.data = update_json(DATA_FILE, self._link, default={})
+
+    @staticmethod
+    def _link(data):
+        """Rebuild parent/child links in place, inserting in file order."""
+        if not data:
             return
 
-        for node in self.data.values():
+        for node in data.values():
             node["parent"] = node["left_child"] = node["right_child"] = None
 
-        root_name = next(iter(self.data))
+        root_name = next(iter(data))
 
         def _insert(current_name: str, new_name: str) -> None:
-            cur_idx = self.data[current_name]["index"]
-            new_idx = self.data[new_name]["index"]
-
-            if new_idx < cur_idx:
-                child = self.data[current_name]["left_child"]
+            # Walk down iteratively; long runs of equal indexes would overflow recursion
+            new_idx = data[new_name]["index"]
+            while True:
+                cur_idx = data[current_name]["index"]
+                side = "left_child" if new_idx < cur_idx else "right_child"
+                child = data[current_name][side]
                 if child is None:
-                    self.data[current_name]["left_child"] = new_name
-                    self.data[new_name]["parent"] = current_name
-                else:
-                    _insert(child, new_name)
-            else:
-                child = self.data[current_name]["right_child"]
-                if child is None:
-                    self.data[current_name]["right_child"] = new_name
-                    self.data[new_name]["parent"] = current_name
-                else:
-                    _insert(child, new_name)
+                    data[current_name][side] = new_name
+                    data[new_name]["parent"] = current_name
+                    return
+                current_name = child
 
-        for name in self.data:
+        for name in data:
             if name == root_name:
                 continue
             _insert(root_name, name)
 
-        with open("data.json", "w") as f:
-            json.dump(self.data, f, indent=4)
-
     def search_tree(self, name):
-        try:
-            first_letter = ALPH_DICT[name[0].upper()]
-            last_letter = ALPH_DICT[name[-1].upper()]
-            target_index = int(f"{first_letter}{last_letter}")
-        except (KeyError, IndexError):
+        if not name:
             return None
+        target_index = self.index_for(name)
 
-        try:
-            with open("data.json", "r") as f:
-                self.data = json.load(f)
-        except FileNotFoundError:
-            return None
+        self.data, _ = read_json(DATA_FILE, {})
 
         if not self.data:
             return None
@@ -107,7 +107,7 @@ class BinaryTree:
             current_node = self.data[current_name]
             current_index = current_node["index"]
 
-            if current_index == target_index:
+            if current_index == target_index and current_name == name:
                 return {
                     "email": current_node["email"],
                     "password": current_node["password"],
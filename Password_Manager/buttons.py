@@ -1,30 +1,16 @@
-from random import choice, randint, shuffle
 import pyperclip
 from tkinter import messagebox, END
 
-letters = ['a','b','c','d','e','f','g','h','i','j','k','l','m','n','o','p','q','r','s','t','u',
-           'v','w','x','y','z','A','B','C','D','E','F','G','H','I','J','K','L','M','N','O','P',
-           'Q','R','S','T','U','V','W','X','Y','Z']
-numbers = ['0','1','2','3','4','5','6','7','8','9']
-symbols = ['!','#','$','%','&','(',')','*','+']
+from breach_check import get_checker
+from generator import new_password
 
-def generate_pw(password_entry):
+def generate_pw(password_entry, website_entry=None):
     password_entry.delete(0, END)
 
-    nr_letters = randint(8, 10)
-    nr_upper_letters = randint(2, 4)
-
-    upper_letters_l = [choice(letters).upper() for _ in range(nr_upper_letters)]
-    lower_letters_l = [choice(letters) for _ in range(nr_letters - nr_upper_letters)]
-    symbols_l = [choice(symbols) for _ in range(randint(2, 4))]
-    numbers_l = [choice(numbers) for _ in range(randint(2, 4))]
-
-    password_list = upper_letters_l + lower_letters_l + symbols_l + numbers_l
-    shuffle(password_list)
-    new_password = "".join(password_list)
-
-    password_entry.insert(0, new_password)
-    pyperclip.copy(new_password)
+    site = website_entry.get().strip() if website_entry is not None else None
+    password = new_password(site=site)
+    password_entry.insert(0, password)
+    pyperclip.copy(password)
 
 def info_search(tree, website_entry):
     site = website_entry.get().strip()
@@ -54,7 +40,18 @@ def save(tree, website_entry, email_entry, password_entry):
         messagebox.showerror("Error", "That website already exists.")
         return
 
-    ok = messagebox.askokcancel(title=web, message=f"Is the information correct?\nEmail: {address}\nPassword: {pw}")
+    message = f"Is the information correct?\nEmail: {address}\nPassword: {pw}"
+    checker = get_checker()
+    if checker is not None:
+        seen = checker.check(pw)
+        if seen:
+            message += f"\n\nWarning: this password appears in {seen:,} known breaches."
+
+    reused = tree.audit.shared_with(pw)
+    if reused:
+        message += f"\n\nWarning: this password is already used for {', '.join(reused)}."
+
+    ok = messagebox.askokcancel(title=web, message=message)
     if ok:
         try:
             tree.add(web, pw, address)
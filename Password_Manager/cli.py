@@ -0,0 +1,123 @@
+import argparse
+import json
+import os
+import sys
+
+import vault
+from generator import Policy
+
+
+def _cmd_get(args):
+    result = vault.get(args.site)
+    if result is None:
+        print(f"{args.site} not found.", file=sys.stderr)
+        return 1
+    if args.json:
+        print(json.dumps({"site": args.site, **result}))
+    else:
+        print(result[args.field])
+    return 0
+
+
+def _cmd_add(args):
+    try:
+        password = vault.add(args.site, args.email, args.password)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    if not args.password:
+        print(password)
+    return 0
+
+
+def _cmd_list(args):
+    for site in vault.list_sites():
+        print(site)
+    return 0
+
+
+def _policy(args):
+    if args.length is None and not args.passphrase and not args.no_symbols:
+        return None
+    policy = Policy(passphrase=args.passphrase, words=args.words)
+    if args.length is not None:
+        policy.length = args.length
+    if args.no_symbols:
+        policy.symbols = ""
+    return policy
+
+
+def _cmd_generate(args):
+    try:
+        passwords = vault.generate(args.count, _policy(args))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    for password in passwords:
+        print(password)
+    return 0
+
+
+def _cmd_rotate(args):
+    if not args.sites and not args.all:
+        print("Error: name the sites to rotate or pass --all", file=sys.stderr)
+        return 1
+    try:
+        passwords = vault.rotate(None if args.all else args.sites, _policy(args))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    for site, password in passwords.items():
+        print(f"{site}\t{password}")
+    return 0
+
+
+def _add_policy_args(p):
+    p.add_argument("--length", type=int)
+    p.add_argument("--no-symbols", action="store_true")
+    p.add_argument("--passphrase", action="store_true")
+    p.add_argument("--words", type=int, default=6)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="Headless Password Manager")
+    parser.add_argument("--dir", help="folder holding data.json (default: current folder)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("get", help="print the password (or email) for a site")
+    p.add_argument("site")
+    p.add_argument("--field", choices=["password", "email"], default="password")
+    p.add_argument("--json", action="store_true", help="print site, email and password as JSON")
+    p.set_defaults(func=_cmd_get)
+
+    p = sub.add_parser("add", help="store a site; prints the generated password if none given")
+    p.add_argument("site")
+    p.add_argument("email")
+    p.add_argument("--password")
+    p.set_defaults(func=_cmd_add)
+
+    p = sub.add_parser("list", help="list stored sites")
+    p.set_defaults(func=_cmd_list)
+
+    p = sub.add_parser("generate", help="print new passwords")
+    p.add_argument("-n", "--count", type=int, default=1)
+    _add_policy_args(p)
+    p.set_defaults(func=_cmd_generate)
+
+    p = sub.add_parser("rotate", help="replace passwords in one vault write; prints site<TAB>password")
+    p.add_argument("sites", nargs="*")
+    p.add_argument("--all", action="store_true")
+    _add_policy_args(p)
+    p.set_defaults(func=_cmd_rotate)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.dir:
+        os.chdir(args.dir)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
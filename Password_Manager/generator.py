@@ -0,0 +1,189 @@
+import functools
+import json
+import os
+import secrets
+import string
+
+from breach_check import get_checker
+
+SYMBOLS = "!#$%&()*+"
+MAX_BREACH_RETRIES = 5
+POLICY_FILE = "policies.json"
+# Optional bigger list (one word per line, e.g. the EFF long list) for stronger passphrases
+WORDLIST_FILE = os.getenv("PM_WORDLIST_FILE", "wordlist.txt")
+
+WORDS = """
+able acid aged also area army away baby back ball band bank base bath bear beat been beer bell
+belt best bill bird blow blue boat body bomb bond bone book boom born boss both bowl bulk burn
+bush busy cake call calm came camp card care case cash cast cell chat chip city club coal coat
+code cold come cook cool cope copy core cost crew crop dark data date dawn days dead deal dean
+dear debt deep deny desk dial diet disc disk does done door dose down draw drew drop drug dual
+duke dust duty each earn ease east easy edge else even ever evil exit face fact fail fair fall
+farm fast fate fear feed feel feet fell felt file fill film find fine fire firm fish five flat
+flow food foot ford form fort four free from fuel full fund gain game gate gave gear gene gift
+girl give glad goal goes gold golf gone good gray grew grey grow gulf hair half hall hand hang
+hard harm hate have head hear heat held hell help here hero high hill hire hold hole holy home
+hope host hour huge hung hunt hurt idea inch into iron item jack jane jean john join jump jury
+just keen keep kent kept kick kill kind king knee knew know lack lady laid lake land lane last
+late lead left less life lift like line link list live load loan lock logo long look lord lose
+loss lost love luck made mail main make male many mark mass matt meal mean meat meet menu mere
+mike mile milk mill mind mine miss mode mood moon more most move much must name navy near neck
+need news next nice nick nine none nose note okay once only onto open oral over pace pack page
+""".split()
+
+
+class Policy:
+    """
+    Declarative password rules. Character mode picks `length` characters with at
+    least `min_each` from every enabled class; passphrase mode joins `words` words.
+    """
+
+    def __init__(self, length=16, lower=True, upper=True, digits=True, symbols=SYMBOLS,
+                 min_each=2, passphrase=False, words=6, separator="-"):
+        self.length = length
+        self.lower = lower
+        self.upper = upper
+        self.digits = digits
+        self.symbols = symbols or ""
+        self.min_each = min_each
+        self.passphrase = passphrase
+        self.words = words
+        self.separator = separator
+
+    def classes(self):
+        pools = []
+        if self.lower:
+            pools.append(string.ascii_lowercase)
+        if self.upper:
+            pools.append(string.ascii_uppercase)
+        if self.digits:
+            pools.append(string.digits)
+        if self.symbols:
+            pools.append(self.symbols)
+        if not pools:
+            raise ValueError("Policy must enable at least one character class.")
+        if len(pools) * self.min_each > self.length:
+            raise ValueError("Policy length is too short for its per-class minimums.")
+        return pools
+
+    def replace(self, **changes):
+        unknown = sorted(set(changes) - set(vars(self)))
+        if unknown:
+            raise ValueError(f"Unknown policy setting(s): {', '.join(unknown)}")
+        return Policy(**{**vars(self), **changes})
+
+    def key(self):
+        return tuple(sorted(vars(self).items()))
+
+    def __eq__(self, other):
+        return isinstance(other, Policy) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+
+DEFAULT_POLICY = Policy()
+
+
+def load_site_rules():
+    """
+    policies.json maps a site (or ".suffix") to Policy overrides, e.g. {"bank.com": {"symbols": ""}}.
+    Raises ValueError naming the rule if it uses a setting Policy doesn't have.
+    """
+    try:
+        with open(POLICY_FILE, "r") as file:
+            rules = json.load(file)
+    except FileNotFoundError:
+        return {}
+    settings = set(vars(DEFAULT_POLICY))
+    for site, overrides in rules.items():
+        unknown = sorted(set(overrides) - settings)
+        if unknown:
+            raise ValueError(f"{POLICY_FILE}: rule {site!r} has unknown setting(s): {', '.join(unknown)}")
+    return rules
+
+
+def policy_for(site, base=DEFAULT_POLICY, rules=None):
+    """
+    Apply the first matching per-site rule (exact name, then longest suffix).
+    Pass `rules` (from load_site_rules()) when looking up many sites to read the file once.
+    """
+    if not site:
+        return base
+    rules = load_site_rules() if rules is None else rules
+    site = site.strip().lower()
+    if site in rules:
+        return base.replace(**rules[site])
+    suffixes = sorted((k for k in rules if k.startswith(".") and site.endswith(k)), key=len, reverse=True)
+    return base.replace(**rules[suffixes[0]]) if suffixes else base
+
+
+@functools.lru_cache(maxsize=None)
+def _load_wordlist(path):
+    try:
+        with open(path, "r") as file:
+            words = [line.split()[-1] for line in file if line.strip()]
+        return words or WORDS
+    except FileNotFoundError:
+        return WORDS
+
+
+def _wordlist():
+    # Read once per path, not once per passphrase (generate_many makes thousands)
+    return _load_wordlist(os.path.abspath(WORDLIST_FILE))
+
+
+def make_password(policy=DEFAULT_POLICY):
+    """One candidate from the OS CSPRNG; no breach check."""
+    if policy.passphrase:
+        words = _wordlist()
+        chosen = [secrets.choice(words) for _ in range(policy.words)]
+        # Capitalise one word and add a digit so character-class rules on sites still pass
+        i = secrets.randbelow(len(chosen))
+        chosen[i] = chosen[i].capitalize()
+        return policy.separator.join(chosen) + str(secrets.randbelow(10))
+
+    pools = policy.classes()
+    chars = [secrets.choice(pool) for pool in pools for _ in range(policy.min_each)]
+    everything = "".join(pools)
+    chars += [secrets.choice(everything) for _ in range(policy.length - len(chars))]
+    # Fisher-Yates with the CSPRNG (random.shuffle would reintroduce a non-crypto PRNG)
+    for i in range(len(chars) - 1, 0, -1):
+        j = secrets.randbelow(i + 1)
+        chars[i], chars[j] = chars[j], chars[i]
+    return "".join(chars)
+
+
+def new_password(policy=None, site=None):
+    """Generate a password, rerolling any candidate found in the breach corpus."""
+    policy = policy or policy_for(site)
+    password = make_password(policy)
+    checker = get_checker()
+    if checker is not None:
+        for _ in range(MAX_BREACH_RETRIES):
+            if not checker.check(password):
+                break
+            password = make_password(policy)
+    return password
+
+
+def generate_many(count, policy=DEFAULT_POLICY):
+    """
+    Bulk generation: candidates are breach-checked as one batch and only the
+    offenders are regenerated. Returns a list of `count` unique passwords.
+    Raises ValueError if the policy can't produce that many (too few possible
+    passwords, or too many breached ones).
+    """
+    passwords = set()
+    checker = get_checker()
+    for _ in range(MAX_BREACH_RETRIES + 1):
+        batch = {make_password(policy) for _ in range(count - len(passwords))} - passwords
+        if checker is not None:
+            batch = {pw for pw, seen in checker.check_many(batch).items() if not seen}
+        passwords |= batch
+        if len(passwords) >= count:
+            break
+    if len(passwords) < count:
+        raise ValueError(f"Only {len(passwords)} of {count} unique passwords could be generated; "
+                         "use a longer policy.")
+    return list(passwords)[:count]
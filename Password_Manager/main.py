@@ -1,4 +1,5 @@
 from bst import BinaryTree
+from browser import VaultBrowser
 import buttons as b
 from tkinter import *
 
@@ -39,11 +40,18 @@ password.grid(column=0, row=3)
 password_entry = Entry(width=32)
 password_entry.grid(column=1, row=3, sticky=E)
 
-generator = Button(width=14, text="Generate Password", command=lambda: b.generate_pw(password_entry))
+generator = Button(width=14, text="Generate Password", command=lambda: b.generate_pw(password_entry, website_entry))
 generator.grid(column=2, row=3)
 
-add = Button(width=41, text="Add", command=lambda: b.save(tree, website_entry, email_entry, password_entry))
+def add_entry():
+    b.save(tree, website_entry, email_entry, password_entry)
+    browser.reload()
+
+add = Button(width=41, text="Add", command=add_entry)
 add.grid(column=1, row=4, columnspan=2)
 
+browser = VaultBrowser(window, tree)
+browser.grid(column=0, row=5, columnspan=3, sticky=EW, pady=(20, 0))
+
 
 window.mainloop()
\ No newline at end of file
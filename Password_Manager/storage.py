@@ -0,0 +1,138 @@
+import copy
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+LOCK_SUFFIX = ".lock"
+MAX_RETRIES = 10
+REPLACE_RETRY_DELAY = 0.05
+ANY_VERSION = object()
+# Smallest bump that survives NTFS's 100ns timestamp resolution
+MTIME_STEP_NS = 1000
+
+
+class VersionConflict(Exception):
+    """The file changed between our read and our write."""
+
+
+def _version(st):
+    # write_json keeps mtime strictly increasing, so it doubles as a version counter
+    return f"{st.st_mtime_ns}-{st.st_size}"
+
+
+def current_version(path):
+    try:
+        return _version(os.stat(path))
+    except FileNotFoundError:
+        return None
+
+
+def read_json(path, default=None):
+    """
+    Return (data, version). Never takes the lock: writers only ever swap in a
+    complete file with os.replace, so a reader sees either the old or the new one.
+    """
+    try:
+        with open(path, "r") as file:
+            version = _version(os.fstat(file.fileno()))
+            return json.load(file), version
+    except FileNotFoundError:
+        return default, None
+
+
+@contextmanager
+def locked(path):
+    """Exclusive inter-process lock held on a side file, so readers are never blocked."""
+    with open(path + LOCK_SUFFIX, "a+") as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _replace(tmp, path):
+    # Windows refuses to replace a file another process has open; readers close quickly
+    for attempt in range(MAX_RETRIES):
+        try:
+            os.replace(tmp, path)
+            return
+        except PermissionError:
+            if attempt == MAX_RETRIES - 1:
+                raise
+            time.sleep(REPLACE_RETRY_DELAY)
+
+
+def write_json(path, data, expected_version=ANY_VERSION):
+    """
+    Write data atomically (temp file + fsync + rename) under the lock.
+    If expected_version is given (None meaning "file must not exist yet") and the
+    file has moved on since, raise VersionConflict. Returns the new version.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    with locked(path):
+        try:
+            previous = os.stat(path)
+        except FileNotFoundError:
+            previous = None
+        if expected_version is not ANY_VERSION and \
+                (_version(previous) if previous else None) != expected_version:
+            raise VersionConflict(path)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+        try:
+            with os.fdopen(fd, "w") as file:
+                json.dump(data, file, indent=4)
+                file.flush()
+                os.fsync(file.fileno())
+            stamp = time.time_ns()
+            if previous is not None:
+                stamp = max(stamp, previous.st_mtime_ns + MTIME_STEP_NS)
+            os.utime(tmp, ns=(stamp, stamp))
+            _replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        return current_version(path)
+
+
+def update_json(path, mutate, default=None):
+    """
+    Optimistic read-modify-write: read without locking, apply mutate(data) and
+    write only if nobody else wrote in between; otherwise re-read and retry.
+    mutate edits data in place (or returns a replacement). Returns the written data.
+    """
+    for _ in range(MAX_RETRIES):
+        data, version = read_json(path)
+        if version is None:
+            data = copy.deepcopy(default)
+        result = mutate(data)
+        if result is not None:
+            data = result
+        try:
+            write_json(path, data, expected_version=version)
+            return data
+        except VersionConflict:
+            continue
+    raise VersionConflict(f"{path}: gave up after {MAX_RETRIES} conflicting writes")
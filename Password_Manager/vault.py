@@ -0,0 +1,68 @@
+# Headless API over the vault: same storage as the GUI, no Tkinter imports
+from bst import BinaryTree
+from generator import DEFAULT_POLICY, generate_many, load_site_rules, new_password, policy_for
+
+_tree = None
+
+
+def open_vault():
+    """Load data.json from the working directory (cached for the process)."""
+    global _tree
+    if _tree is None:
+        _tree = BinaryTree()
+    return _tree
+
+
+def get(site):
+    """Return {"email": ..., "password": ...} for a site, or None if it isn't stored."""
+    return open_vault().search_tree(site.strip())
+
+
+def add(site, email, password=None):
+    """
+    Store a new site and return its password (generated when none is given).
+    Raises ValueError if the site is missing info or already exists.
+    """
+    site, email = site.strip(), email.strip()
+    if not site or not email:
+        raise ValueError("Site and email are required.")
+    tree = open_vault()
+    if tree.search_tree(site):
+        raise ValueError(f"{site} already exists.")
+    password = password or new_password(site=site)
+    tree.add(site, password, email)
+    return password
+
+
+def list_sites():
+    """All stored site names, sorted case-insensitively."""
+    return sorted(open_vault().data, key=str.lower)
+
+
+def generate(count=1, policy=None):
+    return generate_many(count, policy or DEFAULT_POLICY)
+
+
+def rotate(sites=None, policy=None):
+    """
+    Give every listed site (default: all) a fresh password in one vault write.
+    Sites with their own rule in policies.json keep using it unless a policy is passed.
+    Returns {site: new_password}.
+    """
+    tree = open_vault()
+    sites = list(sites) if sites is not None else list(tree.data)
+    missing = [s for s in sites if s not in tree.data]
+    if missing:
+        raise ValueError(f"Not in vault: {', '.join(missing)}")
+
+    # Policy compares by its settings, so every site sharing a rule lands in one batch
+    rules = load_site_rules() if policy is None else {}
+    by_policy = {}
+    for site in sites:
+        by_policy.setdefault(policy or policy_for(site, rules=rules), []).append(site)
+    passwords = {}
+    for site_policy, group in by_policy.items():
+        passwords.update(zip(group, generate_many(len(group), site_policy)))
+
+    tree.set_passwords(passwords)
+    return passwords
@@ -0,0 +1,63 @@
+# Tk-free model behind the browse pane (browser.py): a sorted, filtered list of
+# site names over the vault dict, with rows built only for the page on screen.
+# benchmark.py times it directly, so keep Tkinter and pyperclip out of here.
+
+PAGE_ROWS = 12
+
+
+class VaultView:
+    """
+    Sorted, filtered list of site names over the vault dict. Rows are built
+    only for the page being shown. Strength comes from the audit index entries.
+    """
+
+    def __init__(self, data, audit_entries=None, sort_column="site", reverse=False, filter_text=""):
+        self.data = data
+        self.entries = audit_entries or {}
+        self.sort_column = sort_column
+        self.reverse = reverse
+        self.filter_text = ""
+        self._sorted = sorted(data, key=self._key(sort_column), reverse=reverse)
+        self.names = self._sorted
+        if filter_text:
+            self.filter(filter_text)
+
+    def _key(self, column):
+        if column == "email":
+            return lambda name: (self.data[name].get("email", "").lower(), name.lower())
+        if column == "strength":
+            return lambda name: (self.entries.get(name, {}).get("entropy", 0.0), name.lower())
+        return str.lower
+
+    def sort(self, column):
+        """Sort by a column; sorting by the same column again flips the order."""
+        self.reverse = not self.reverse if column == self.sort_column else False
+        self.sort_column = column
+        self._sorted = sorted(self.data, key=self._key(column), reverse=self.reverse)
+        text, self.filter_text = self.filter_text, ""
+        self.names = self._sorted
+        self.filter(text)
+
+    def _matches(self, name, text):
+        return text in name.lower() or text in self.data[name].get("email", "").lower()
+
+    def filter(self, text):
+        """Keep sites whose name or email contains `text` (case-insensitive)."""
+        text = text.strip().lower()
+        if text == self.filter_text:
+            return
+        # Typing one more character can only narrow the last result, so filter that instead
+        source = self.names if self.filter_text and text.startswith(self.filter_text) else self._sorted
+        self.names = [n for n in source if self._matches(n, text)] if text else self._sorted
+        self.filter_text = text
+
+    def __len__(self):
+        return len(self.names)
+
+    def page(self, offset, count):
+        """(site, email, strength) rows for names[offset:offset + count]."""
+        rows = []
+        for name in self.names[offset:offset + count]:
+            strength = self.entries.get(name, {}).get("strength", "")
+            rows.append((name, self.data[name].get("email", ""), strength))
+        return rows